@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
 from pydantic import BaseModel
 
 from components.formats import RequestMessage, ResponseMessage
+from modules import tracing
 
 
 class ComponentType(BaseModel):
@@ -15,11 +17,15 @@ class Component(ABC):
     def __call__(self, request: RequestMessage, *args, **kwargs) -> ResponseMessage:
         res = None
         merged_request = self.merge_upstream_request(request)
-        try:
-            res = self.call(merged_request, *args, **kwargs)
-        except Exception as e:
-            res = ResponseMessage(result="fail")
-            print(f"# [ERROR] {e}")
+        with tracing.span(getattr(self, "alias", self.__class__.__name__)) as span:
+            try:
+                res = self.call(merged_request, *args, **kwargs)
+            except Exception as e:
+                # NOTE: 실패도 응답으로 돌려주되, 원래 예외를 담아 pipeline 등 호출한 쪽에서 다시 raise할 수 있게 한다.
+                res = ResponseMessage.from_exception(e)
+                print(f"# [ERROR] {res.error}")
+                span.set_error(e)  # the traceback is kept in the trace file
+            span.info["result"] = res.result
         return res
 
     def merge_upstream_request(self, request: RequestMessage) -> RequestMessage:
@@ -30,6 +36,14 @@ class Component(ABC):
                     request_data[key] = value
         return request.__class__(**request_data)
 
+    def cache_inputs(self, request: RequestMessage) -> Optional[dict]:
+        # --- state of the input artifacts of a run, None = never cached (external api, side effects) ---
+        return None
+
+    def cache_outputs(self, request: RequestMessage) -> List[str]:
+        # --- files written by a run, a cached run is reused only while they are unchanged ---
+        return []
+
     @abstractmethod
     def init(self, **config):
         pass
@@ -1,6 +1,5 @@
 import os
 import yaml
-import pandas as pd
 from pathlib import Path
 from typing import List
 from datetime import datetime, timedelta
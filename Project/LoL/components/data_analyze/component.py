@@ -1,13 +1,18 @@
 import os
 import yaml
-import pandas as pd
 import numpy as np
-import duckdb
+import pyarrow as pa
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from components import base
+from modules import tracing
 from modules.storage import duckdb
+from modules.storage.run_store import file_states
+from modules.storage.shard_store import MAIN_DATASET
+from modules.data_processing import stats
 from components.formats import RequestDataAnalyze, ResponseDataAnalyze
 
 
@@ -15,6 +20,28 @@ class ComponentType(base.ComponentType):
     pass
 
 
+class Node(NamedTuple):
+    name: str
+    kind: str  # work | metric
+    inputs: Tuple[str, ...]  # work tables that must be created first
+    outputs: Tuple[str, ...]  # created tables
+    run: Callable  # run(cursor)
+
+
+# NOTE: python 가중 통계에서 행 하나가 차지하는 메모리, 2M 행에서 측정한 최대값 (~125 bytes)을 올림
+#       (arrow 입력 3열 24 + weighted_quantile의 정렬 index/정렬된 복사본/longdouble 누적합 등 numpy 최대 ~101, tracemalloc)
+ROW_BYTES = 128
+
+# NOTE: duckdb는 예산의 절반을 쓰며, metadata.csv를 읽는 read_csv가 30.5MiB 블록 하나를 한 번에 잡으므로 64MB 이상이 필요하다.
+MIN_MEMORY_BUDGET_MB = 128
+
+# --- metrics computed in python (weighted statistics), method name -> (inputs, outputs) ---
+PYTHON_METRICS = {
+    "session_length": (["sessions"], ["avg_session_length", "median_session_length"]),
+    "play_per_user": (["users", "play_counts"], ["avg_play_modes", "avg_play_champs"]),
+}
+
+
 class Component(base.Component):
     alias = "data_analyze"
 
@@ -27,206 +54,322 @@ class Component(base.Component):
                 self.config = self.config if self.config is not None else {}
 
     def call(self, message: RequestDataAnalyze, *args, **kwargs) -> ResponseDataAnalyze:
-        # --- load metadata(tier, weight) ---
-        weight_df = pd.read_csv(Path(message.duckdb_filepath).parent / "chunks" / "metadata.csv", keep_default_na=False)
-        weight_df["key"] = list(zip(weight_df["tier"], weight_df["division"].fillna("None")))
-        weight_map = dict(zip(weight_df["key"], weight_df["weight"]))
-
-        # --- load raw_data as dataframe ---
-        conn = duckdb.get_connection(message.duckdb_filepath)
-
-        df = conn.execute("SELECT * FROM raw_summoner_game_logs;").fetchdf()
-        df["timestamp"] = df["game_start_timestamp"].apply(lambda x: x.date())
-        df["division"] = df["rank"].fillna("None")
-        df["w"] = list(df.apply(lambda r: weight_map.get((r["tier"], r["division"]), 1.0), axis=1))
+        # --- selected metrics and the work tables they need ---
+        nodes = self.select(self.registry(), message.metrics)
+        print(f"# [INFO] metrics: {[name for name, node in nodes.items() if node.kind == 'metric']}")
 
-        # --- Replace Corrupted Duration Data ---
-        # NOTE: game_duration 데이터가 오염되었음을 확인, df["game_end_timestamp"] - df["game_start_timestamp"]을 대신 사용해야.
-        df["game_duration"] = df["game_end_timestamp"] - df["game_start_timestamp"]
+        assert (
+            message.memory_budget_mb is None or message.memory_budget_mb >= MIN_MEMORY_BUDGET_MB
+        ), f"# [ERROR] memory_budget_mb must be at least {MIN_MEMORY_BUDGET_MB}: {message.memory_budget_mb}"
 
-        print(f"# [INFO] Load {len(df)} records: {df.summoner_id.nunique()} summoners.")
-
-        conn.close()
-
-        # --- load report connection ---
+        # --- load report connection, raw_data is attached read only ---
         conn = duckdb.get_connection(message.report_filepath)
-
-        # --- 1.1 D-n Retention Rate ---
-        today = df.timestamp.max()
-        target = today - timedelta(days=30)
-
-        target_mask = df["timestamp"] == target
-        target_users_w = df[target_mask].groupby("summoner_id")["w"].mean()
-        target_total_w = len(target_users_w)
-
-        res = []
-        for d in [1, 3, 7, 30]:
-            d_date = target + timedelta(days=d)
-            comeback_mask = df["timestamp"] == d_date
-            comeback_users_w = df[comeback_mask].groupby("summoner_id")["w"].mean()
-
-            inter = target_users_w.index.intersection(comeback_users_w.index)
-            retained_w = len(target_users_w.loc[inter])
-
-            d_retention = retained_w / target_total_w if target_total_w else 0
-            res.append({"day": d, "retention": d_retention})
-            # print(f"# [INFO] D-{d} Weighted Retention = {d_retention:.4f}")
-        retention_df = pd.DataFrame(res)
-        conn.execute("CREATE OR REPLACE TABLE retention AS SELECT * FROM retention_df;")
-        del retention_df
-
-        # --- 1.2 Average / Median Session Length ---
-        g = (
-            df.groupby(["game_mode", "timestamp", "summoner_id"])
-            .agg(session_length=("game_duration", "sum"), w=("w", "mean"))
-            .reset_index()
+        conn.execute(f"ATTACH '{message.duckdb_filepath}' AS raw (READ_ONLY);")
+
+        # --- work tables live in an in-memory database shared by every cursor, reports are written to report.db ---
+        # NOTE: temp 테이블은 만든 connection에서만 보이므로 cursor 간에 공유되지 않는다.
+        #       search_path의 첫 번째가 report.db 이므로, 이름만 쓴 CREATE TABLE은 report.db에 만들어진다.
+        conn.execute("ATTACH ':memory:' AS work;")
+        search_path = f"{conn.execute('SELECT current_database();').fetchone()[0]}.main,work.main"
+        conn.execute(f"SET search_path = '{search_path}';")
+
+        # --- streaming mode: half of the budget for duckdb (spills to {report}.tmp), the rest for python partitions ---
+        self.python_budget = None
+        if message.memory_budget_mb is not None:
+            conn.execute(f"SET memory_limit = '{message.memory_budget_mb // 2}MB';")
+            conn.execute(f"SET temp_directory = '{message.report_filepath}.tmp';")
+            self.python_budget = message.memory_budget_mb * 2**20 // 2 // max(message.metric_workers, 1)
+
+        # --- analysis window by the collection dates, default = the latest collected date ---
+        end_date = (
+            message.end_date
+            or conn.execute("SELECT MAX(collection_date) FROM raw.raw_summoner_game_logs;").fetchone()[0]
         )
+        start_date = message.start_date or end_date
+        print(f"# [INFO] analysis window: 30 days before {start_date} ~ {end_date}")
+
+        # --- weights(metadata.csv) and analysis rows, nothing is materialized in python ---
+        params = {
+            "metadata_filepath": (Path(message.duckdb_filepath).parent / "chunks" / "metadata.csv").as_posix(),
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        for query in self.config["query"]["init"].values():
+            duckdb.excute_query(conn, query.format(**params))
+        n_records, n_days = conn.execute("SELECT COUNT(*), COUNT(DISTINCT timestamp) FROM logs;").fetchone()
+        assert n_records, f"# [ERROR] There is no record from 30 days before {start_date} to {end_date}"
+        print(f"# [INFO] Load {n_records} records: {n_days} days.")
+
+        # --- per day state, only the stale days are aggregated again ---
+        self.update_state(conn, start_date, end_date, message.incremental)
+
+        # --- metrics, independent ones run at the same time ---
+        self.run_nodes(conn, nodes, search_path, message.metric_workers)
+        tracing.count("rows_in", n_records)
+        for table in [x for node in nodes.values() if node.kind == "metric" for x in node.outputs]:
+            tracing.count("rows_out", conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0])
 
-        def w_avg(x: pd.DataFrame) -> float:
-            return np.average(x["session_length"].dt.total_seconds() / 60, weights=x["w"])
-
-        avg_len = (
-            g.groupby(["game_mode", "timestamp"]).apply(w_avg, include_groups=False).reset_index(name="avg_minutes")
-        )
+        # --- close connection ---
+        conn.execute("DETACH work;")
+        conn.execute("DETACH raw;")
+        conn.close()
 
-        def w_median(tbl: pd.DataFrame) -> float:
-            tbl = tbl.assign(m=tbl["session_length"].dt.total_seconds() / 60)
-            tbl = tbl.sort_values("m")
-            cum_w = tbl["w"].cumsum()
-            cutoff = tbl["w"].sum() / 2
-            return tbl.loc[cum_w >= cutoff, "m"].iloc[0]
-
-        median_len = (
-            g.groupby(["game_mode", "timestamp"])
-            .apply(w_median, include_groups=False)
-            .reset_index(name="median_minutes")
+        return ResponseDataAnalyze(
+            **message.model_dump(),
+            result="success",
         )
 
-        conn.execute("CREATE OR REPLACE TABLE avg_session_length AS SELECT * FROM avg_len;")
-        conn.execute("CREATE OR REPLACE TABLE median_session_length AS SELECT * FROM median_len;")
-        del avg_len, median_len
-
-        # --- 1.3 Sessions per User per Day ---
-        per_day = (
-            df.groupby(["game_mode", "timestamp", "summoner_id"])
-            .agg(sess=("summoner_id", "size"), w=("w", "mean"))
-            .reset_index()
+    def cache_inputs(self, message: RequestDataAnalyze) -> dict:
+        # --- raw_data.db and the metadata.csv the weights are read from ---
+        metadata_filepath = (Path(message.duckdb_filepath).parent / "chunks" / "metadata.csv").as_posix()
+        return file_states([message.duckdb_filepath, metadata_filepath])
+
+    def cache_outputs(self, message: RequestDataAnalyze) -> List[str]:
+        return [message.report_filepath]
+
+    def registry(self) -> Dict[str, Node]:
+        # --- work tables and sql metrics from config.yaml, python metrics from PYTHON_METRICS ---
+        nodes = {}
+        for name, item in self.config["query"]["work"].items():
+            run = partial(duckdb.excute_query, query=item["query"])
+            nodes[name] = Node(name, "work", tuple(item.get("inputs", [])), (name,), run)
+        for name, item in self.config["query"]["metrics"].items():
+            run = partial(self.create_table, table=name, query=item["query"])
+            nodes[name] = Node(name, "metric", tuple(item.get("inputs", [])), (name,), run)
+        for name, (inputs, outputs) in PYTHON_METRICS.items():
+            nodes[name] = Node(name, "metric", tuple(inputs), tuple(outputs), getattr(self, name))
+        return nodes
+
+    def select(self, nodes: Dict[str, Node], metrics: Optional[List[str]] = None) -> Dict[str, Node]:
+        # --- metrics are selected by name or by the report table they create ---
+        selected = [
+            name
+            for name, node in nodes.items()
+            if node.kind == "metric" and (metrics is None or name in metrics or set(node.outputs) & set(metrics))
+        ]
+        if metrics is not None:
+            known = {x for name in selected for x in (name, *nodes[name].outputs)}
+            assert set(metrics) <= known, f"# [ERROR] Unknown metrics: {sorted(set(metrics) - known)}"
+
+        # --- work tables needed by the selected metrics ---
+        needed, stack = set(), list(selected)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                assert name in nodes, f"# [ERROR] Unknown input: {name}"
+                needed.add(name)
+                stack.extend(nodes[name].inputs)
+        return {name: node for name, node in nodes.items() if name in needed}
+
+    def run_nodes(self, conn, nodes: Dict[str, Node], search_path: str, workers: int = 4):
+        # NOTE: inputs가 모두 만들어진 작업부터 thread pool에 넣고, 하나가 끝날 때마다 다음에 실행할 수 있는 작업을 찾는다.
+        #       각 작업은 자신의 cursor에서 실행되며, 결과 테이블은 작업이 끝나는 즉시 report.db에 기록된다.
+        pending, running, done = dict(nodes), {}, set()
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    if set(node.inputs) <= done:
+                        running[pool.submit(self.run_node, conn, node, search_path)] = pending.pop(name)
+                assert running, f"# [ERROR] Circular inputs: {sorted(pending)}"
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    future.result()
+                    done.add(node.name)
+
+    def run_node(self, conn, node: Node, search_path: str):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SET search_path = '{search_path}';")
+            node.run(cursor)
+        finally:
+            cursor.close()
+
+    def create_table(self, conn, table: str, query: str):
+        print(f"# [INFO] create table: {table}")
+        conn.execute(f"CREATE OR REPLACE TABLE {table} AS {query}")
+
+    def update_state(self, conn, start_date, end_date, incremental: bool = True):
+        for query in [*self.config["query"]["state"]["create"].values(), self.config["query"]["state"]["shards"]]:
+            duckdb.excute_query(conn, query)
+        # NOTE: loaded_shards가 없는 raw_data.db (shard 파일 단위 적재 이전)는 바뀐 날짜를 알 수 없으므로 모든 날짜를 다시 집계한다.
+        tracked = conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name = 'raw' AND table_name = 'loaded_shards';"
+        ).fetchone()[0]
+        if not incremental or not tracked:
+            for table in [*self.config["query"]["state"]["create"], "state_shards"]:
+                conn.execute(f"DELETE FROM {table};")
+
+        # --- stale days: not aggregated yet or with other weights, in the window of a changed collection date,
+        #     or no longer in the analysis window ---
+        # NOTE: 각 수집일의 행은 그 날짜 이전 30일의 경기이므로, shard가 추가/변경/삭제된 수집일의 30일 구간만 바뀔 수 있다.
+        #       행을 읽지 않고 raw.loaded_shards와 마지막 갱신 때의 목록(state_shards)만 비교한다.
+        shards = f"FROM raw.loaded_shards WHERE dataset = '{MAIN_DATASET}'" if tracked else "FROM state_shards"
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE stale_days AS
+            WITH window_days AS (
+                SELECT CAST(d AS DATE) AS timestamp
+                FROM generate_series(CAST($1 AS DATE) - INTERVAL 30 DAY, CAST($2 AS DATE), INTERVAL 1 DAY) AS t(d)
+            ), shards AS (
+                SELECT date, path, size, mtime_ns {shards}
+            ), changed_dates AS (
+                SELECT DISTINCT CAST(date AS DATE) AS date
+                FROM ((FROM shards EXCEPT FROM state_shards) UNION ALL (FROM state_shards EXCEPT FROM shards))
+            )
+            SELECT w.timestamp, f.fingerprint
+            FROM window_days AS w
+            CROSS JOIN weights_fingerprint AS f
+            LEFT JOIN state_days AS s ON s.timestamp = w.timestamp
+            WHERE s.fingerprint IS DISTINCT FROM f.fingerprint
+                OR EXISTS (SELECT 1 FROM changed_dates AS c WHERE w.timestamp BETWEEN c.date - 30 AND c.date)
+            UNION ALL
+            SELECT s.timestamp, NULL AS fingerprint
+            FROM state_days AS s
+            ANTI JOIN window_days AS w ON w.timestamp = s.timestamp;
+            """,
+            [start_date, end_date],
         )
-
-        def w_avg_sess(x: pd.DataFrame) -> float:
-            return np.average(x["sess"], weights=x["w"])
-
-        tmp = (
-            per_day.groupby(["game_mode", "timestamp"])
-            .apply(w_avg_sess, include_groups=False)
-            .reset_index(name="result")
+        n_stale = conn.execute("SELECT COUNT(*) FROM stale_days;").fetchone()[0]
+        print(f"# [INFO] update state: {n_stale} stale days")
+
+        conn.execute("BEGIN TRANSACTION;")
+        try:
+            if n_stale:
+                for table in self.config["query"]["state"]["create"]:
+                    conn.execute(f"DELETE FROM {table} WHERE timestamp IN (SELECT timestamp FROM stale_days);")
+                for query in self.config["query"]["state"]["update"].values():
+                    duckdb.excute_query(conn, query)
+                conn.execute("INSERT INTO state_days SELECT * FROM stale_days WHERE fingerprint IS NOT NULL;")
+            # NOTE: state에는 현재 구간의 날짜만 남으므로, 구간 밖 수집일의 변경도 함께 반영된 것으로 기록한다.
+            conn.execute("DELETE FROM state_shards;")
+            conn.execute(f"INSERT INTO state_shards SELECT date, path, size, mtime_ns {shards};")
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+
+    def gid_ranges(self, conn, table: str) -> Tuple[List[Tuple[int, int]], List[int], int]:
+        # NOTE: 가중 통계는 그룹(gid)마다 독립이므로, gid 구간별로 나누어 읽고 계산해도 결과가 같다 (구간 간 병합이 필요 없음).
+        #       memory_budget_mb가 주어지면 한 구간의 행이 python 몫의 예산에 들어오도록 나눈다. 그룹 하나는 나눌 수 없으므로
+        #       예산보다 큰 그룹은 python으로 읽지 않고 (large) duckdb에서 계산한다, see large_group_stats.
+        # --- (gid ranges read into python, large gids, number of groups) ---
+        counts = duckdb.fetch_arrays(conn, f"SELECT gid, COUNT(*) AS n FROM {table} GROUP BY gid ORDER BY gid;")["n"]
+        if not len(counts):
+            return [], [], 0
+        if self.python_budget is None:
+            return [(0, len(counts))], [], len(counts)
+        max_rows = max(self.python_budget // ROW_BYTES, 1)
+        large = np.flatnonzero(counts > max_rows)
+        counts = np.where(counts > max_rows, 0, counts)
+        part = (np.cumsum(counts) - counts) // max_rows
+        bounds = np.r_[0, np.flatnonzero(np.diff(part)) + 1, len(counts)]
+        print(f"# [INFO] {table}: {len(bounds) - 1} partitions, {len(large)} groups over {max_rows} rows")
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist())), large.tolist(), len(counts)
+
+    def large_group_stats(self, conn, table: str, column: str, gids: List[int], total_weight: Optional[float] = None):
+        # NOTE: stats.weighted_mean / weighted_quantile(q=0.5)와 같은 값을 duckdb window 집계로 계산한다.
+        #       duckdb는 memory_limit을 넘으면 temp_directory로 spill 하므로, 그룹 크기와 관계없이 예산을 지킨다.
+        #       total_weight가 주어지면 play_count_stats처럼 나머지 가중치를 0회 유저(base)로 본다.
+        if total_weight is None:
+            total, base = "SUM(w) OVER (PARTITION BY gid)", "0"
+        else:
+            total, base = "$2", "GREATEST($2 - SUM(w) OVER (PARTITION BY gid), 0)"
+        cutoff = f"total * 0.5 * (1 - {stats.RTOL})"
+        return duckdb.fetch_arrays(
+            conn,
+            f"""
+            SELECT
+                gid,
+                SUM({column} * w) / ANY_VALUE(total) AS avg_value,
+                CASE
+                    WHEN ANY_VALUE(base) > 0 AND ANY_VALUE(base) >= ANY_VALUE({cutoff}) THEN 0
+                    ELSE MIN({column}) FILTER (WHERE base + cum >= {cutoff})
+                END AS median_value
+            FROM (
+                SELECT
+                    gid,
+                    {column},
+                    w,
+                    SUM(w) OVER (
+                        PARTITION BY gid ORDER BY {column} ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                    ) AS cum,
+                    {total} AS total,
+                    {base} AS base
+                FROM {table}
+                WHERE list_contains($1, gid)
+            )
+            GROUP BY gid
+            ORDER BY gid;
+            """,
+            [gids] if total_weight is None else [gids, total_weight],
         )
 
-        conn.execute("CREATE OR REPLACE TABLE sessions_per_user_per_day AS SELECT * FROM tmp;")
-        del tmp
-
-        # --- 1.4 Churn Rate ---
-        cohort_date = today - timedelta(days=30)
-        cohort_users = df[df["timestamp"] == cohort_date].groupby("summoner_id")["w"].mean()
-        cohort_w = cohort_users.sum()
-
-        res = []
-        for d in [3, 7, 14, 30]:
-            cutoff = cohort_date + timedelta(days=d)
-            returned = (
-                df[(df["timestamp"] > cohort_date) & (df["timestamp"] <= cutoff)].groupby("summoner_id")["w"].mean()
+    def session_length(self, conn):
+        # --- 1.2 Average / Median Session Length per (game_mode, day) ---
+        # NOTE: 문자열 키(game_mode, timestamp)는 duckdb 안에 두고, python에는 gid(정수 코드)와 수치 열만 arrow로 넘긴다.
+        #       결과도 arrow table로 만들어 duckdb가 그대로 scan 하므로 pandas 변환이 없다.
+        ranges, large, n_groups = self.gid_ranges(conn, "sessions")
+        avg, median = np.full(n_groups, np.nan), np.full(n_groups, np.nan)
+        for lo, hi in ranges:
+            x = duckdb.fetch_arrays(
+                conn,
+                "SELECT gid - $1 AS gid, minutes, w FROM sessions "
+                "WHERE gid >= $1 AND gid < $2 AND NOT list_contains($3, gid);",
+                [lo, hi, large],
             )
-            inter = cohort_users.index.intersection(returned.index)
-            retained_w = cohort_users.loc[inter].sum()
-            churn_rate = 1 - retained_w / cohort_w if cohort_w else 0
-            res.append({"day": d, "churn_rate": churn_rate})
-            # print(f"# [INFO] D-{d} Weighted Churn = {churn_rate:.4f}")
-
-        churn_df = pd.DataFrame(res)
-        conn.execute("CREATE OR REPLACE TABLE churn_rate AS SELECT * FROM churn_df;")
-        del churn_df
-
-        # --- 2.1 Access Rate ---
-        target_modes = df.game_mode.unique()
-        target_champs = df.champion_name.unique()
-
-        res_modes = []
-        for mode in target_modes:
-            for d in range(31):
-                day = today - timedelta(days=d)
-                daily = df[df["timestamp"] == day]
-                tot_w = daily.groupby("summoner_id")["w"].mean().sum()
-                play_w = daily[daily["game_mode"] == mode].groupby("summoner_id")["w"].mean().sum()
-                rate = play_w / tot_w if tot_w else 0
-                res_modes.append({"date": day, "mode": mode, "rate": rate, "play": play_w, "total": tot_w})
-                # print(f"# [INFO] {day} Access '{mode}': {rate:.4f}")
-
-        res_champs = []
-        for target_champ in target_champs:
-            for d in range(31):
-                day = today - timedelta(days=d)
-                daily = df[df["timestamp"] == day]
-                tot_w = daily.groupby("summoner_id")["w"].mean().sum()
-                play_w = daily[daily["champion_name"] == target_champ].groupby("summoner_id")["w"].mean().sum()
-                rate = play_w / tot_w if tot_w else 0
-                res_champs.append({"date": day, "champion": target_champ, "rate": rate, "play": play_w, "total": tot_w})
-                # print(f"# [INFO] {day} Access '{target_champ}': {rate:.4f}")
-
-        access_rate_modes_df = pd.DataFrame(res_modes)
-        access_rate_champs_df = pd.DataFrame(res_champs)
-        conn.execute("CREATE OR REPLACE TABLE access_rate_modes AS SELECT * FROM access_rate_modes_df;")
-        conn.execute("CREATE OR REPLACE TABLE access_rate_champs AS SELECT * FROM access_rate_champs_df;")
-        del access_rate_modes_df, access_rate_champs_df
-
-        # --- 2.2 Average / Median Play Count per User to New Content ---
-        res_modes = []
-        for mode in target_modes:
-            pc = df[df["game_mode"] == mode].groupby("summoner_id").agg(plays=("game_mode", "size"), w=("w", "mean"))
-            # NOTE: 0회 유저 포함하기
-            all_w = df.groupby("summoner_id")["w"].mean()
-            pc = pc.reindex(all_w.index, fill_value=0)
-            pc["w"] = all_w
-
-            avg_play = np.average(pc["plays"], weights=pc["w"])
-            pc_sorted = pc.sort_values("plays")
-            cum_w = pc_sorted["w"].cumsum()
-            median_play = pc_sorted.loc[cum_w >= pc_sorted["w"].sum() / 2, "plays"].iloc[0]
-            res_modes.append({"mode": mode, "avg_play_per_user": avg_play, "median_play_per_user": median_play})
-            # print(f"# [INFO] {mode}  Weighted Avg Play = {avg_play:.2f} | Weighted Median = {median_play}")
-
-        res_champs = []
-        for target_champ in target_champs:
-            pc = (
-                df[df["champion_name"] == target_champ]
-                .groupby("summoner_id")
-                .agg(plays=("champion_name", "size"), w=("w", "mean"))
+            avg[lo:hi] = stats.weighted_mean(x["gid"], x["minutes"], x["w"], hi - lo)
+            median[lo:hi] = stats.weighted_quantile(x["gid"], x["minutes"], x["w"], 0.5, hi - lo)
+        if large:
+            x = self.large_group_stats(conn, "sessions", "minutes", large)
+            avg[x["gid"]], median[x["gid"]] = x["avg_value"], x["median_value"]
+        res = pa.table({"gid": np.arange(n_groups), "avg_minutes": avg, "median_minutes": median})
+        for table, column in [("avg_session_length", "avg_minutes"), ("median_session_length", "median_minutes")]:
+            print(f"# [INFO] create table: {table}")
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TABLE {table} AS
+                SELECT k.game_mode, k.timestamp, r.{column}
+                FROM (SELECT DISTINCT gid, game_mode, timestamp FROM sessions) AS k
+                JOIN res AS r ON r.gid = k.gid
+                ORDER BY k.game_mode, k.timestamp;
+                """
             )
-            all_w = df.groupby("summoner_id")["w"].mean()
-            pc = pc.reindex(all_w.index, fill_value=0)
-            pc["w"] = all_w
-
-            avg_play = np.average(pc["plays"], weights=pc["w"])
-            pc_sorted = pc.sort_values("plays")
-            cum_w = pc_sorted["w"].cumsum()
-            median_play = pc_sorted.loc[cum_w >= pc_sorted["w"].sum() / 2, "plays"].iloc[0]
-            res_champs.append(
-                {"champion": target_champ, "avg_play_per_user": avg_play, "median_play_per_user": median_play}
-            )
-            # print(f"# [INFO] {target_champ} Weighted Avg Play = {avg_play:.2f} | Weighted Median = {median_play}")
-
-        avg_play_modes_df = pd.DataFrame(res_modes)
-        avg_play_champs_df = pd.DataFrame(res_champs)
-        conn.execute("CREATE OR REPLACE TABLE avg_play_modes AS SELECT * FROM avg_play_modes_df;")
-        conn.execute("CREATE OR REPLACE TABLE avg_play_champs AS SELECT * FROM avg_play_champs_df;")
-        del avg_play_modes_df, avg_play_champs_df
 
-        # --- close connection ---
-        conn.close()
-
-        return ResponseDataAnalyze(
-            **message.model_dump(),
-            result="success",
-        )
+    def play_per_user(self, conn):
+        # --- 2.2 Average / Median Play Count per User to New Content (0 plays included) ---
+        ranges, large, n_groups = self.gid_ranges(conn, "play_counts")
+        total_weight = conn.execute("SELECT SUM(w) FROM users;").fetchone()[0]
+        avg, median = np.full(n_groups, np.nan), np.full(n_groups, np.nan)
+        for lo, hi in ranges:
+            x = duckdb.fetch_arrays(
+                conn,
+                "SELECT gid - $1 AS gid, plays, w FROM play_counts "
+                "WHERE gid >= $1 AND gid < $2 AND NOT list_contains($3, gid);",
+                [lo, hi, large],
+            )
+            avg[lo:hi], median[lo:hi] = stats.play_count_stats(x["gid"], x["plays"], x["w"], total_weight, hi - lo)
+        if large:
+            x = self.large_group_stats(conn, "play_counts", "plays", large, total_weight)
+            avg[x["gid"]], median[x["gid"]] = x["avg_value"], x["median_value"]
+        res = pa.table({"gid": np.arange(n_groups), "avg_play_per_user": avg, "median_play_per_user": median})
+        for table, key, alias in [
+            ("avg_play_modes", "game_mode", "mode"),
+            ("avg_play_champs", "champion_name", "champion"),
+        ]:
+            print(f"# [INFO] create table: {table}")
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TABLE {table} AS
+                SELECT
+                    k.{key} AS {alias},
+                    r.avg_play_per_user,
+                    CAST(r.median_play_per_user AS BIGINT) AS median_play_per_user
+                FROM (SELECT DISTINCT gid, {key} FROM play_counts WHERE {key} IS NOT NULL) AS k
+                JOIN res AS r ON r.gid = k.gid
+                ORDER BY {alias};
+                """
+            )
 
 
 if __name__ == "__main__":
@@ -1,18 +1,32 @@
 import os
 import random
+import asyncio
 import yaml
 import pandas as pd
 from pathlib import Path
 from typing import List
+from pydantic import BaseModel
 from datetime import datetime, timedelta
 from components import base
-from modules.storage import duckdb
+from modules import tracing
+from modules.storage.shard_store import MAIN_DATASET, ShardStore
 from modules.data_ingestion import riot_api
+from modules.data_ingestion.riot_api_async import RiotClient
+from modules.data_ingestion.match_cache import MatchCache
+from modules.data_ingestion.matchid_store import MatchIdStore
+from modules.data_ingestion.static_data import StaticData
+from modules.data_processing import transformation
+from modules.data_processing.schema import RAW_MATCH_PARTICIPANTS, RAW_SUMMONER_GAME_LOGS
 from components.formats import RequestDataCollect, ResponseDataCollect
 
 
+class StaticDataConfig(BaseModel):
+    ttl_hours: float = 24
+    locale: str = "en_US"
+
+
 class ComponentType(base.ComponentType):
-    pass
+    static_data: StaticDataConfig = StaticDataConfig()
 
 
 class Component(base.Component):
@@ -24,51 +38,61 @@ class Component(base.Component):
         else:
             with open(os.path.join(Path(__file__).parent, "config.yaml"), "r") as fp:
                 self.config = yaml.safe_load(fp)
-                self.config = self.config if self.config is not None else {}
+                # NOTE: kwargs와 config.yaml 모두 ComponentType으로 읽어, call()에서는 속성으로만 접근한다.
+                self.config = ComponentType(**(self.config if self.config is not None else {}))
 
     def call(self, message: RequestDataCollect, *args, **kwargs) -> ResponseDataCollect:
-        # --- download queue metadata ---
-        global queue_metadata
-        queue_metadata_url = "https://static.developer.riotgames.com/docs/lol/queues.json"
-        queue_metadata_data = riot_api.get(queue_metadata_url)
-        assert queue_metadata_data is not None, f"# [ERROR] Failed to download queue metadata from {queue_metadata_url}"
-        queue_metadata_data += [
-            {"queueId": 480, "map": "Summoner's Rift", "description": "Normal (Quickplay)", "notes": None},
-        ]
-        queue_metadata = pd.DataFrame(queue_metadata_data, columns=["queueId", "map", "description", "notes"])
+        # --- load static data (queues, ...) from the disk cache or riot ---
+        self.static_data = StaticData(
+            Path(message.chunks_dir) / "static",
+            ttl_hours=self.config.static_data.ttl_hours,
+            locale=self.config.static_data.locale,
+        )
+        print(f"# [INFO] load {len(self.static_data.queues)} queues")
+
+        # --- riot api base urls (a local stand-in server for load tests) ---
+        riot_api.set_base_url(message.region_url, message.platform_url)
 
         # --- make chunks directory ---
         chunks_dir = Path(message.chunks_dir) / message.date  # {shard_dir}/{date}
         os.makedirs(chunks_dir, exist_ok=True)
 
+        # --- open match cache, shared by every collection date ---
+        self.match_cache = MatchCache(Path(message.chunks_dir) / "match_cache", message.match_cache_size_mb * 2**20)
+        self.pending_matches = {}
+
+        # --- open match id watermark store ---
+        self.matchid_store = (
+            MatchIdStore(Path(message.chunks_dir) / "matchids.db") if message.incremental_matchids else None
+        )
+        self.sampled_puuids = {}  # puuid -> summoner_id, for full match extraction
+
+        # --- open shard store, {chunks_dir}/{date}/tier=.../division=.../part-N.parquet ---
+        self.shard_store = ShardStore(
+            message.chunks_dir,
+            message.date,
+            part_rows=message.part_rows,
+            row_group_size=message.row_group_size,
+            flush_seconds=message.flush_seconds,
+        )
+        self.shard_store.cleanup()
+
         # --- if resume is true, skip already collected data ---
         if message.resume:
-            # --- get connection ---
-            conn = duckdb.get_connection()
-
-            # --- check loaded chunks ---
-            metadata = pd.read_csv(chunks_dir.parent.parent / "metadata.csv", keep_default_na=False)
-            loaded_data = conn.execute(
-                f"SELECT DISTINCT summoner_id, tier, COALESCE(rank, 'None') AS division FROM '{chunks_dir.as_posix()}/*.parquet'"
-            ).fetchdf()
-            try:
-                metadata = metadata.merge(
-                    # NOTE: group by 함수는 null 값이 포함되면 해당 행을 삭제하므로 COALESCE를 사용하여 null 값을 'None'으로 대체함
-                    loaded_data.groupby(["tier", "division"]).size().reset_index(name="cnt"),
-                    how="left",
-                    on=["tier", "division"],
-                )
-            except Exception as e:
+            # --- check loaded chunks from the shard manifest, no parquet scan ---
+            metadata = pd.read_csv(chunks_dir.parent / "metadata.csv", keep_default_na=False)
+            counts = self.shard_store.counts()
+            if not counts:
                 print(f"# [ERROR] There is no data, try `resume: false`")
-            metadata.fillna({"cnt": 0}, inplace=True)
+            # NOTE: manifest는 null division을 'None'으로 기록하므로 metadata.csv와 그대로 비교할 수 있음
+            metadata["cnt"] = [counts.get((x.tier, x.division), 0) for x in metadata.itertuples()]
 
             # --- make resume recipe ---
             resume_recipe = metadata[["tier", "division", "weight"]].copy()
             resume_recipe["sample_size"] = metadata.apply(lambda x: x.sample_size - x.cnt, axis=1)
 
-            # --- free memory & close connection ---
+            # --- free memory ---
             del metadata
-            conn.close()
             print(f"# [INFO] resume recipe: \n{resume_recipe}")
         else:
             # --- init metadata ---
@@ -76,6 +100,7 @@ class Component(base.Component):
                 fp.write("tier,division,weight,sample_size\n")
 
         # --- sampling summoners ---
+        plans = []
         for recipe in message.recipe:
             recipe.division = "None" if recipe.division is None else recipe.division
 
@@ -103,79 +128,233 @@ class Component(base.Component):
 
             # --- remove loaded chunks if over sample_size ---
             if sample_size < 0:
-                # --- get parquet file list ---
-                remove_list = loaded_data[
-                    (loaded_data.tier == recipe.tier) & (loaded_data.division == recipe.division)
-                ].summoner_id.tolist()[:-sample_size]
+                # --- get summoner list from the manifest ---
+                remove_list = self.shard_store.summoners(recipe.tier, recipe.division)[:-sample_size]
                 print(f"\t[INFO] Will Remove {len(remove_list)} chunks: {recipe.tier} {recipe.division}.")
 
-                # --- remove parquet file ---
-                for summoner_id in remove_list:
-                    file_path = chunks_dir / f"{summoner_id}.parquet"
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                        print(f"\t[INFO] Remove {file_path}.")
-
-            # --- data collect --- TODO: league_data의 내용을 바탕으로 removed와 inserted를 구분하고 분기처리
-            page = 0
-            n_loaded = 0
-
-            while n_loaded < sample_size:
-                page += 1
-                league_data = self.get_league_data(
-                    queue=message.queue,
-                    tier=recipe.tier,
-                    division=recipe.division,
-                    page=page,
-                )
-                if len(league_data) == 0:
-                    print(f"# [INFO] no more data: {recipe.tier} {recipe.division if recipe.division else ''} {page}")
-                    break
-                random.shuffle(league_data)  # shuffle to avoid bias
-
-                for summoner_league in league_data:
-                    # --- if summoner is already collected, skip ---
-                    shard_path = chunks_dir / f"{summoner_league['summonerId']}.parquet"
-                    if os.path.exists(shard_path):
-                        continue
-
-                    # --- collect recent 30d match data ---
-                    summoner_matchids = self.get_summoner_matchids_30d(message.date, summoner_league["puuid"])
-                    records = []
-
-                    for summoner_matchid in summoner_matchids:
-                        try:
-                            summoner_match_data = self.get_summoner_match_data(summoner_matchid, summoner_league)
-                        except Exception as e:
-                            # --- log error ---
-                            with open(chunks_dir.parent / "error.log", "a") as fp:
-                                print(f"\t{e}")
-                                fp.write(f"{e}\n")
-                            # --- skip ---
-                            continue
-                        if summoner_match_data is None:
-                            break
-                        summoner_match_data["tier"] = recipe.tier
-                        summoner_match_data["rank"] = recipe.division
-                        records.append(summoner_match_data)
-
-                    # --- save to parquet ---
-                    if len(records) == 0:
-                        continue  # Fail Case, skip
-                    df = pd.DataFrame(records)
-                    df.to_parquet(shard_path, index=False)
-                    print(
-                        f"# [INFO] ({n_loaded+1}/{sample_size}) insert sampled summoner: {summoner_league['summonerId']} ({len(records)})"
-                    )
-                    n_loaded += 1
-                    if n_loaded >= sample_size:
-                        break
+                # --- remove shards of the summoners ---
+                self.shard_store.remove(remove_list)
+                continue
+
+            plans.append((recipe, sample_size))
+
+        # --- data collect --- TODO: league_data의 내용을 바탕으로 removed와 inserted를 구분하고 분기처리
+        try:
+            if message.concurrency > 1:
+                asyncio.run(self.collect_concurrent(message, chunks_dir, plans))
+            else:
+                for recipe, sample_size in plans:
+                    self.collect_recipe(message, chunks_dir, recipe, sample_size)
+        finally:
+            # --- flush buffered shards, even if the collection stopped halfway ---
+            self.shard_store.close()
+            print(f"# [INFO] match cache: {self.match_cache.report()}")
+            if self.matchid_store is not None:
+                self.matchid_store.close()
 
         return ResponseDataCollect(
             **message.model_dump(),
             result="success",
         )
 
+    def collect_recipe(self, message: RequestDataCollect, chunks_dir: Path, recipe, sample_size: int):
+        page = 0
+        n_loaded = 0
+
+        while n_loaded < sample_size:
+            page += 1
+            league_data = self.get_league_data(
+                queue=message.queue,
+                tier=recipe.tier,
+                division=recipe.division,
+                page=page,
+            )
+            if len(league_data) == 0 or (page > 1 and recipe.division == "None"):
+                # NOTE: division이 없는 티어는 페이지 없이 리그 전체를 한 번에 받는다.
+                print(f"# [INFO] no more data: {recipe.tier} {recipe.division if recipe.division else ''} {page}")
+                break
+            random.shuffle(league_data)  # shuffle to avoid bias
+
+            for summoner_league in league_data:
+                # --- if summoner is already collected, skip ---
+                if self.shard_store.contains(summoner_league["summonerId"]):
+                    continue
+
+                # --- collect recent 30d match data ---
+                self.sampled_puuids[summoner_league["puuid"]] = summoner_league["summonerId"]
+                summoner_matchids = self.get_summoner_matchids_30d(message.date, summoner_league["puuid"])
+                summoner_matches = []
+                for summoner_matchid in summoner_matchids:
+                    try:
+                        summoner_matches.append(self.get_match(summoner_matchid))
+                    except Exception as e:
+                        self.log_error(chunks_dir, e)
+                        summoner_matches.append(None)
+                records, participants = self.build_summoner_shards(
+                    chunks_dir, summoner_league, recipe, summoner_matchids, summoner_matches, message.full_match
+                )
+
+                # --- save to parquet ---
+                if records.num_rows == 0:
+                    del self.sampled_puuids[summoner_league["puuid"]]
+                    continue  # Fail Case, skip
+                self.save_shards(summoner_league, recipe, records, participants)
+                print(
+                    f"# [INFO] ({n_loaded+1}/{sample_size}) insert sampled summoner: {summoner_league['summonerId']} ({records.num_rows})"
+                )
+                n_loaded += 1
+                if n_loaded >= sample_size:
+                    break
+
+        # --- a finished recipe is written at once, resume never collects it again ---
+        self.shard_store.flush((recipe.tier, recipe.division))
+
+    async def collect_concurrent(self, message: RequestDataCollect, chunks_dir: Path, plans: list):
+        # NOTE: 모든 recipe를 동시에 진행하되, 동시에 수집 중인 소환사 수는 `concurrency`로 제한한다.
+        #       요청 속도 자체는 RiotClient의 rate limiter가 조절한다.
+        semaphore = asyncio.Semaphore(message.concurrency)
+        async with RiotClient(
+            app_limits=message.app_limits,
+            max_connections=message.concurrency,
+            region_url=message.region_url,
+            platform_url=message.platform_url,
+        ) as client:
+            await asyncio.gather(
+                *[
+                    self.collect_recipe_async(client, semaphore, message, chunks_dir, recipe, sample_size)
+                    for recipe, sample_size in plans
+                ]
+            )
+
+    async def collect_recipe_async(
+        self,
+        client: RiotClient,
+        semaphore: asyncio.Semaphore,
+        message: RequestDataCollect,
+        chunks_dir: Path,
+        recipe,
+        sample_size: int,
+    ):
+        async def collect_summoner(summoner_league: dict) -> bool:
+            async with semaphore:
+                self.sampled_puuids[summoner_league["puuid"]] = summoner_league["summonerId"]
+                summoner_matchids = await self.get_summoner_matchids_30d_async(
+                    client, message.date, summoner_league["puuid"]
+                )
+                summoner_matches = await asyncio.gather(
+                    *[self.get_match_async(client, matchid) for matchid in summoner_matchids]
+                )
+                records, participants = self.build_summoner_shards(
+                    chunks_dir, summoner_league, recipe, summoner_matchids, summoner_matches, message.full_match
+                )
+
+                # --- save to parquet, only after every record of the summoner is ready ---
+                if records.num_rows == 0:
+                    del self.sampled_puuids[summoner_league["puuid"]]
+                    return False  # Fail Case, skip
+                await asyncio.to_thread(self.save_shards, summoner_league, recipe, records, participants)
+                print(f"# [INFO] insert sampled summoner: {summoner_league['summonerId']} ({records.num_rows})")
+                return True
+
+        page = 0
+        n_loaded = 0
+        candidates = []
+        in_flight = set()
+        exhausted = False
+
+        while n_loaded < sample_size:
+            # --- keep at most (sample_size - n_loaded) summoners in flight to avoid over-sampling ---
+            while not exhausted and len(in_flight) < min(message.concurrency, sample_size - n_loaded):
+                if not candidates:
+                    page += 1
+                    league_data = await self.get_league_data_async(
+                        client, queue=message.queue, tier=recipe.tier, division=recipe.division, page=page
+                    )
+                    if len(league_data) == 0 or (page > 1 and recipe.division == "None"):
+                        print(f"# [INFO] no more data: {recipe.tier} {recipe.division} {page}")
+                        exhausted = True
+                        break
+                    random.shuffle(league_data)  # shuffle to avoid bias
+                    candidates = [x for x in league_data if not self.shard_store.contains(x["summonerId"])]
+                    continue
+                in_flight.add(asyncio.create_task(collect_summoner(candidates.pop())))
+
+            if not in_flight:
+                break
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    if task.result():
+                        n_loaded += 1
+                except Exception as e:
+                    self.log_error(chunks_dir, e)
+            print(f"# [INFO] ({n_loaded}/{sample_size}) sampled summoners: {recipe.tier} {recipe.division}")
+
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+        # --- a finished recipe is written at once, resume never collects it again ---
+        await asyncio.to_thread(self.shard_store.flush, (recipe.tier, recipe.division))
+
+    def build_summoner_shards(
+        self,
+        chunks_dir: Path,
+        summoner_league: dict,
+        recipe,
+        summoner_matchids: List[str],
+        summoner_matches: List[dict],
+        full_match: bool = False,
+    ):
+        rows = []
+        participant_rows = []
+        match_times = []
+        for summoner_matchid, summoner_match in zip(summoner_matchids, summoner_matches):
+            try:
+                summoner_index = self.find_summoner_index(summoner_matchid, summoner_match, summoner_league)
+            except Exception as e:
+                self.log_error(chunks_dir, e)
+                continue
+            info = summoner_match["info"]
+            context = {
+                "match_id": summoner_matchid,
+                "summoner_id": summoner_league["summonerId"],
+                "tier": recipe.tier,
+                "rank": recipe.division,
+            }
+            rows.append((context, info, info["participants"][summoner_index]))
+            if "gameStartTimestamp" in info:
+                match_times.append((summoner_matchid, info["gameStartTimestamp"] // 1000))
+            if full_match:
+                participant_rows += self.get_participant_rows(summoner_matchid, summoner_match)
+        if self.matchid_store is not None:
+            self.matchid_store.resolve(summoner_league["puuid"], match_times)
+
+        # --- flatten every match of the summoner at once ---
+        records, failed = transformation.flatten(RAW_SUMMONER_GAME_LOGS, rows, self.static_data)
+        if failed:
+            self.log_error(
+                chunks_dir, ValueError(f"{len(failed)} broken matches of {summoner_league['summonerId']} skipped")
+            )
+        participants = None
+        if full_match:
+            participants, _ = transformation.flatten(RAW_MATCH_PARTICIPANTS, participant_rows, self.static_data)
+        return records, participants
+
+    def save_shards(self, summoner_league: dict, recipe, records, participants=None):
+        # --- a summoner is saved only after every record is ready, participants go into the same part ---
+        batches = {MAIN_DATASET: records}
+        if participants is not None:
+            batches["participants"] = participants
+        self.shard_store.add(summoner_league["summonerId"], recipe.tier, recipe.division, batches)
+        tracing.count("summoners")
+        tracing.count("rows_out", records.num_rows)
+
+    def log_error(self, chunks_dir: Path, e: Exception):
+        # --- log error ---
+        with open(chunks_dir.parent / "error.log", "a") as fp:
+            print(f"\t{e}")
+            fp.write(f"{e}\n")
+
     def get_league_data(self, queue: str, tier: str, division: str, page: int = 1):
         res = riot_api.get_league_by_queue_tier_division(queue=queue, tier=tier, division=division, page=page)
         assert res is not None, f"# [ERROR] Failed to download league data from {queue} {tier} {division}"
@@ -183,6 +362,13 @@ class Component(base.Component):
             return res["entries"]
         return res
 
+    async def get_league_data_async(self, client: RiotClient, queue: str, tier: str, division: str, page: int = 1):
+        res = await client.get_league_by_queue_tier_division(queue=queue, tier=tier, division=division, page=page)
+        assert res is not None, f"# [ERROR] Failed to download league data from {queue} {tier} {division}"
+        if division is None or division == "None":
+            return res["entries"]
+        return res
+
     def get_summoner_league_data(self, summoner_league: dict):
         return {
             "league_id": summoner_league["leagueId"],
@@ -196,32 +382,94 @@ class Component(base.Component):
             "hot_streak": summoner_league["hotStreak"],
         }
 
-    def get_summoner_matchids_30d(self, date: str, puuid: str):
+    def get_30d_window(self, date: str):
         target_date = pd.to_datetime(date)
         assert (
             target_date.date() < datetime.now().date()
         ), "# [ERROR] only data up to the day before today can be collected."
         start_dt = target_date - timedelta(days=30) - datetime(1970, 1, 1)
         end_dt = target_date.replace(hour=23, minute=59, second=59) - datetime(1970, 1, 1)
+        return int(start_dt.total_seconds()), int(end_dt.total_seconds())
+
+    def get_summoner_matchids_30d(self, date: str, puuid: str):
+        start_time, end_time = self.get_30d_window(date)
+        if self.matchid_store is None:
+            return self.get_matchids_in_window(puuid, start_time, end_time)
+
+        # --- only request the part of the window that is not in the watermark store yet ---
+        delta = self.matchid_store.delta(puuid, start_time, end_time)
+        if delta is not None:
+            self.matchid_store.merge(puuid, self.get_matchids_in_window(puuid, *delta), *delta)
+        self.matchid_store.prune(puuid, start_time)
+        return self.matchid_store.get(puuid, start_time, end_time)
+
+    async def get_summoner_matchids_30d_async(self, client: RiotClient, date: str, puuid: str):
+        start_time, end_time = self.get_30d_window(date)
+        if self.matchid_store is None:
+            return await self.get_matchids_in_window_async(client, puuid, start_time, end_time)
+
+        delta = self.matchid_store.delta(puuid, start_time, end_time)
+        if delta is not None:
+            matchids = await self.get_matchids_in_window_async(client, puuid, *delta)
+            self.matchid_store.merge(puuid, matchids, *delta)
+        self.matchid_store.prune(puuid, start_time)
+        return self.matchid_store.get(puuid, start_time, end_time)
+
+    def get_matchids_in_window(self, puuid: str, start_time: int, end_time: int):
         res = riot_api.get_matchids_by_puuid(
             puuid=puuid,
-            startTime=int(start_dt.total_seconds()),
-            endTime=int(end_dt.total_seconds()),
+            startTime=start_time,
+            endTime=end_time,
             count=100,
         )
-        while x := riot_api.get_matchids_by_puuid(
-            puuid=puuid,
-            startTime=int(start_dt.total_seconds()),
-            endTime=int(end_dt.total_seconds()),
-            start=len(res),
-            count=100,
+        assert res is not None, f"# [ERROR] Failed to download match ids from {puuid}"
+        while len(res) % 100 == 0 and (
+            x := riot_api.get_matchids_by_puuid(
+                puuid=puuid,
+                startTime=start_time,
+                endTime=end_time,
+                start=len(res),
+                count=100,
+            )
         ):
             res += x
+        return res
+
+    async def get_matchids_in_window_async(self, client: RiotClient, puuid: str, start_time: int, end_time: int):
+        res = await client.get_matchids_by_puuid(puuid, startTime=start_time, endTime=end_time, count=100)
         assert res is not None, f"# [ERROR] Failed to download match ids from {puuid}"
+        while len(res) % 100 == 0 and (
+            x := await client.get_matchids_by_puuid(
+                puuid, startTime=start_time, endTime=end_time, start=len(res), count=100
+            )
+        ):
+            res += x
         return res
 
-    def get_summoner_match_data(self, matchid: str, summoner_league: dict):
-        summoner_match = riot_api.get_match_by_matchid(matchid=matchid)
+    def get_match(self, matchid: str):
+        res = self.match_cache.get(matchid)
+        if res is None:
+            res = riot_api.get_match_by_matchid(matchid=matchid)
+            self.match_cache.put(matchid, res)
+        return res
+
+    async def get_match_async(self, client: RiotClient, matchid: str):
+        res = self.match_cache.get(matchid)
+        if res is not None:
+            return res
+        # --- another summoner of the same match is already downloading it ---
+        if matchid in self.pending_matches:
+            self.match_cache.hits += 1
+            return await self.pending_matches[matchid]
+        self.pending_matches[matchid] = asyncio.ensure_future(client.get_match_by_matchid(matchid))
+        try:
+            res = await self.pending_matches[matchid]
+        finally:
+            del self.pending_matches[matchid]
+        self.match_cache.put(matchid, res)
+        return res
+
+    def find_summoner_index(self, matchid: str, summoner_match: dict, summoner_league: dict) -> int:
         assert summoner_match is not None, f"# [ERROR] Failed to download match data from {matchid}"
 
         # find summoner index
@@ -231,90 +479,16 @@ class Component(base.Component):
                 summoner_index = i
                 break
         assert summoner_index != -1, f"Summoner ID {summoner_league['summonerId']} not found in match {matchid}"
+        return summoner_index
 
-        try:
-            res = {
-                "match_id": matchid,
-                "summoner_id": summoner_league["summonerId"],
-                "team_id": summoner_match["info"]["participants"][summoner_index]["teamId"],
-                "end_of_game_result": summoner_match["info"]["endOfGameResult"] == "GameComplete",
-                "game_start_timestamp": datetime(1970, 1, 1, 0, 0, 0)
-                + timedelta(milliseconds=summoner_match["info"]["gameStartTimestamp"]),
-                "game_end_timestamp": datetime(1970, 1, 1, 0, 0, 0)
-                + timedelta(milliseconds=summoner_match["info"]["gameEndTimestamp"]),
-                "game_duration": timedelta(milliseconds=summoner_match["info"]["gameEndTimestamp"])
-                - timedelta(milliseconds=summoner_match["info"]["gameStartTimestamp"]),
-                "game_mode": summoner_match["info"]["gameMode"],
-                "queue_id": summoner_match["info"]["queueId"],
-                "queue_description": queue_metadata.loc[
-                    queue_metadata["queueId"] == summoner_match["info"]["queueId"], "description"
-                ].values[0],
-                "champion_id": summoner_match["info"]["participants"][summoner_index]["championId"],
-                "champion_name": summoner_match["info"]["participants"][summoner_index]["championName"],
-                "individual_position": summoner_match["info"]["participants"][summoner_index]["individualPosition"],
-                "team_position": summoner_match["info"]["participants"][summoner_index]["teamPosition"],
-                "summoner_spell1_id": summoner_match["info"]["participants"][summoner_index]["summoner1Id"],
-                "summoner_spell2_id": summoner_match["info"]["participants"][summoner_index]["summoner2Id"],
-                "summoner_spell1_casts": summoner_match["info"]["participants"][summoner_index]["summoner1Casts"],
-                "summoner_spell2_casts": summoner_match["info"]["participants"][summoner_index]["summoner2Casts"],
-                "kills": summoner_match["info"]["participants"][summoner_index]["kills"],
-                "deaths": summoner_match["info"]["participants"][summoner_index]["deaths"],
-                "assists": summoner_match["info"]["participants"][summoner_index]["assists"],
-                "longest_time_living": summoner_match["info"]["participants"][summoner_index]["longestTimeSpentLiving"],
-                "magic_damage_to_champion": summoner_match["info"]["participants"][summoner_index][
-                    "magicDamageDealtToChampions"
-                ],
-                "physical_damage_to_champion": summoner_match["info"]["participants"][summoner_index][
-                    "physicalDamageDealtToChampions"
-                ],
-                "vision_score": summoner_match["info"]["participants"][summoner_index]["visionScore"],
-                "wards_placed": summoner_match["info"]["participants"][summoner_index]["wardsPlaced"],
-                "wards_killed": summoner_match["info"]["participants"][summoner_index]["wardsKilled"],
-                "baron_kills": summoner_match["info"]["participants"][summoner_index]["baronKills"],
-                "dragon_kills": summoner_match["info"]["participants"][summoner_index]["dragonKills"],
-                "voidmonster_kills": summoner_match["info"]["participants"][summoner_index]["challenges"][
-                    "voidMonsterKill"
-                ],
-                "gold_earned": summoner_match["info"]["participants"][summoner_index]["goldEarned"],
-                "item0_id": summoner_match["info"]["participants"][summoner_index]["item0"],
-                "item1_id": summoner_match["info"]["participants"][summoner_index]["item1"],
-                "item2_id": summoner_match["info"]["participants"][summoner_index]["item2"],
-                "item3_id": summoner_match["info"]["participants"][summoner_index]["item3"],
-                "item4_id": summoner_match["info"]["participants"][summoner_index]["item4"],
-                "item5_id": summoner_match["info"]["participants"][summoner_index]["item5"],
-                "item6_id": summoner_match["info"]["participants"][summoner_index]["item6"],
-                "minion_cs": summoner_match["info"]["participants"][summoner_index]["totalMinionsKilled"],
-                "jungle_cs": summoner_match["info"]["participants"][summoner_index]["neutralMinionsKilled"],
-                "game_ended_early_surrender": summoner_match["info"]["participants"][summoner_index][
-                    "gameEndedInEarlySurrender"
-                ],
-                "game_ended_surrender": summoner_match["info"]["participants"][summoner_index]["gameEndedInSurrender"],
-                "kda": summoner_match["info"]["participants"][summoner_index]["challenges"]["kda"],
-                "total_ping_count": sum(
-                    [v for k, v in summoner_match["info"]["participants"][summoner_index].items() if "Pings" in k]
-                ),
-                "primary_perk_style": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][0][
-                    "style"
-                ],
-                "primary_perk1": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][0][
-                    "selections"
-                ][0]["perk"],
-                "primary_perk2": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][0][
-                    "selections"
-                ][1]["perk"],
-                "primary_perk3": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][0][
-                    "selections"
-                ][2]["perk"],
-                "sub_perk_style": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][1]["style"],
-                "sub_perk1": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][1]["selections"][
-                    0
-                ]["perk"],
-                "sub_perk2": summoner_match["info"]["participants"][summoner_index]["perks"]["styles"][1]["selections"][
-                    1
-                ]["perk"],
-            }
-        except Exception as e:
-            print(f"# [ERROR] {e}")
-            print(summoner_match)
-            return None
-        return res
+    def get_participant_rows(self, matchid: str, summoner_match: dict):
+        # --- every participant of the match, with the sampled summoner id if the puuid was sampled ---
+        info = summoner_match["info"]
+        return [
+            (
+                {"match_id": matchid, "puuid": puuid, "sampled_summoner_id": self.sampled_puuids.get(puuid)},
+                info,
+                participant,
+            )
+            for puuid, participant in zip(summoner_match["metadata"]["participants"], info["participants"])
+        ]
@@ -1,11 +1,10 @@
 import os
 import yaml
-import pandas as pd
 from pathlib import Path
 from typing import List
 from datetime import datetime, timedelta
 from components import base
-from modules.storage import duckdb
+from modules.storage.shard_store import ShardStore
 from components.formats import RequestDataDelete, ResponseDataDelete
 
 
@@ -26,26 +25,19 @@ class Component(base.Component):
 
     def call(self, message: RequestDataDelete, *args, **kwargs) -> ResponseDataDelete:
         # 만약 이전 collect component에서 실패, 어디서? 를 받으면 해당 티어의 유저 데이터(parquet)를 삭제
-        # --- get duckdb connection ---
-        conn = duckdb.get_connection()
-
-        # --- get parquet file list ---
-        remove_list = (
-            conn.execute(
-                f"SELECT summoner_id FROM '{message.chunks_dir}/*.parquet' WHERE tier='{message.tier}' AND rank='{message.division}'"
-            )
-            .fetchdf()
-            .summoner_id.unique()
-            .tolist()
-        )
-        print(f"[INFO] Will Remove {len(remove_list)} chunks: {message.tier} {message.division}.")
-
-        # --- remove parquet file ---
-        for summoner_id in remove_list:
-            file_path = Path(message.chunks_dir) / f"{summoner_id}.parquet"
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"[INFO] Remove {file_path}.")
+        # NOTE: chunks_dir = {shard_dir}/{date}
+        assert message.tier is not None, "# [ERROR] tier is not given"
+        # NOTE: division이 없는 티어(MASTER 이상)는 'None'으로 기록되므로, division=None은 그 행만 지운다 (이전과 같음).
+        #       티어의 모든 division을 지우려면 all_divisions를 켠다.
+        division = None if message.all_divisions else ("None" if message.division is None else message.division)
+        chunks_dir = Path(message.chunks_dir)
+        with ShardStore(chunks_dir.parent, chunks_dir.name) as shard_store:
+            # --- summoners of the tier, from the manifest ---
+            remove_list = shard_store.summoners(message.tier, division)
+            print(f"[INFO] Will Remove {len(remove_list)} chunks: {message.tier} {division or 'every division'}.")
+
+            # --- rewrite parts ---
+            shard_store.remove(remove_list)
 
         return ResponseDataDelete(
             **message.model_dump(),
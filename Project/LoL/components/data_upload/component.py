@@ -1,11 +1,15 @@
 import os
 import yaml
-import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Set
 from datetime import datetime, timedelta
 from components import base
+from modules import tracing
 from modules.storage import duckdb
+from modules.storage.shard_store import MAIN_DATASET, ShardStore
+from modules.storage.run_store import file_states
+from modules.data_processing.schema import RAW_MATCH_PARTICIPANTS, RAW_SUMMONER_GAME_LOGS
 from components.formats import RequestDuckdbDataUpload, ResponseDuckdbDataUpload
 
 
@@ -25,19 +29,71 @@ class Component(base.Component):
                 self.config = self.config if self.config is not None else {}
 
     def call(self, message: RequestDuckdbDataUpload, *args, **kwargs) -> ResponseDuckdbDataUpload:
+        assert message.date is not None, "# [ERROR] date is not given and there is no upstream data_collect"
+
         # --- get duckdb connection ---
         conn = duckdb.get_connection(message.duckdb_filepath)
 
-        # --- init database ---
-        table = "raw_summoner_game_logs"
+        # --- list shard files of the date (partitioned parts + legacy per summoner files) ---
+        with ShardStore(message.chunks_dir, message.date) as shard_store:
+            files = {dataset: shard_store.files(dataset) for dataset in [MAIN_DATASET, "participants"]}
+        assert files[MAIN_DATASET], f"# [ERROR] There is no shard in {message.chunks_dir}/{message.date}"
+
+        # --- init database, drop tables of the previous single date layout (no collection_date) ---
         tables = duckdb.ls_table(conn)
-        if table in tables:
-            print(f"# [INFO] drop table: {table}")
-            conn.execute(f"DROP TABLE {table};")
-        print(f"# [INFO] create table: {table}")
-        duckdb.excute_query(conn, self.config["query"]["create"]["table"][table])
-        duckdb.excute_query(conn, self.config["query"]["insert"][table].format(f"{message.chunks_dir}/{message.date}/*.parquet"))
-        
+        if RAW_SUMMONER_GAME_LOGS.name in tables and "collection_date" not in [
+            x[0] for x in duckdb.excute_query(conn, f"DESCRIBE {RAW_SUMMONER_GAME_LOGS.name};")
+        ]:
+            for table in [RAW_SUMMONER_GAME_LOGS.name, RAW_MATCH_PARTICIPANTS.name, *self.config["query"]["create"]]:
+                if table in tables:
+                    print(f"# [INFO] drop table: {table}")
+                    conn.execute(f"DROP TABLE {table};")
+        duckdb.excute_query(conn, RAW_SUMMONER_GAME_LOGS.create_table_query())
+        for query in self.config["query"]["create"].values():
+            duckdb.excute_query(conn, query)
+
+        # --- older dates whose shard files must be loaded again, see release_older ---
+        released = {MAIN_DATASET: set(), "participants": set()}
+
+        # --- not incremental: drop the partition of the date and load every shard again ---
+        if not message.incremental:
+            print(f"# [INFO] drop partition: {message.date}")
+            self.drop_partitions(conn, "=", message.date, released)
+
+        # --- raw_summoner_game_logs ---
+        n_changed = self.load_shards(
+            conn, message.date, MAIN_DATASET, files[MAIN_DATASET], RAW_SUMMONER_GAME_LOGS, released
+        )
+
+        # --- retention: prune partitions older than retention_days ---
+        cutoff = None
+        if message.retention_days is not None:
+            cutoff = (datetime.strptime(message.date, "%Y-%m-%d") - timedelta(days=message.retention_days)).date()
+            n_expired = duckdb.excute_query(
+                conn, "SELECT COUNT(DISTINCT date) FROM loaded_shards WHERE date < ?;", [str(cutoff)]
+            )[0][0]
+            if n_expired:
+                print(f"# [INFO] prune {n_expired} partitions before {cutoff}")
+                self.drop_partitions(conn, "<", str(cutoff), released)
+                n_changed += n_expired
+        n_changed += self.reload_released(
+            conn, message.chunks_dir, MAIN_DATASET, RAW_SUMMONER_GAME_LOGS, released, cutoff
+        )
+
+        # --- full match extraction: every participant of the collected matches ---
+        table = RAW_MATCH_PARTICIPANTS.name
+        if files["participants"] or table in duckdb.ls_table(conn):
+            duckdb.excute_query(conn, RAW_MATCH_PARTICIPANTS.create_table_query())
+            n_changed += self.load_shards(
+                conn, message.date, "participants", files["participants"], RAW_MATCH_PARTICIPANTS, released
+            )
+            n_changed += self.reload_released(
+                conn, message.chunks_dir, "participants", RAW_MATCH_PARTICIPANTS, released, cutoff
+            )
+            if n_changed:
+                duckdb.excute_query(conn, self.config["query"]["delete"][table])
+                duckdb.excute_query(conn, self.config["query"]["update"][table])
+
         # --- close connection ---
         conn.close()
 
@@ -46,13 +102,163 @@ class Component(base.Component):
             result="success",
         )
 
+    def cache_inputs(self, message: RequestDuckdbDataUpload) -> Optional[dict]:
+        # --- shard manifest of the date: every shard file with its (size, mtime), no date = never cached ---
+        if message.date is None:
+            return None
+        with ShardStore(message.chunks_dir, message.date) as shard_store:
+            files = [x for dataset in [MAIN_DATASET, "participants"] for x in shard_store.files(dataset)]
+        return file_states(files)
+
+    def cache_outputs(self, message: RequestDuckdbDataUpload) -> List[str]:
+        return [message.duckdb_filepath]
+
+    def drop_partitions(self, conn, op: str, date: str, released: Dict[str, Set[str]]):
+        # --- delete rows and loaded shard records of the partitions `collection_date {op} date` ---
+        tables = duckdb.ls_table(conn)
+        conn.execute("BEGIN TRANSACTION;")
+        try:
+            for dataset, table in [(MAIN_DATASET, RAW_SUMMONER_GAME_LOGS), ("participants", RAW_MATCH_PARTICIPANTS)]:
+                if table.name in tables:
+                    where = f"collection_date {op} CAST(? AS DATE)"
+                    released[dataset] |= self.release_older(conn, dataset, table, where, [date])
+                    conn.execute(f"DELETE FROM {table.name} WHERE {where};", [date])
+            for table in ["loaded_shard_summoners", "loaded_shard_puuids"]:
+                conn.execute(
+                    f"""
+                    DELETE FROM {table} WHERE path IN (
+                        SELECT path FROM loaded_shards WHERE CAST(date AS DATE) {op} CAST(? AS DATE)
+                    );
+                    """,
+                    [date],
+                )
+            conn.execute(f"DELETE FROM loaded_shards WHERE CAST(date AS DATE) {op} CAST(? AS DATE);", [date])
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+
+    def load_shards(self, conn, date: str, dataset: str, files: List[str], table, released: Dict[str, Set[str]]) -> int:
+        # --- compare (size, mtime) of the shard files with the loaded ones of the date ---
+        loaded = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in duckdb.excute_query(
+                conn, "SELECT path, size, mtime_ns FROM loaded_shards WHERE date = ? AND dataset = ?;", [date, dataset]
+            )
+        }
+        current = {path: (os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in files}
+        new_files = [path for path in files if loaded.get(path) != current[path]]
+        stale_files = [path for path in loaded if current.get(path) != loaded[path]]
+        print(f"# [INFO] {table.name}: {len(new_files)} new, {len(stale_files)} stale, {len(files)} shard files")
+        if not new_files and not stale_files:
+            return 0
+
+        conn.execute("BEGIN TRANSACTION;")
+        try:
+            # --- delete rows of changed or removed files, by the summoners they held ---
+            # NOTE: participants 행은 여러 소환사가 공유하므로, 고아가 된 match 단위로 config의 delete 쿼리에서 지운다.
+            if stale_files:
+                if dataset == MAIN_DATASET:
+                    where = """
+                        collection_date = ? AND summoner_id IN (
+                            SELECT summoner_id FROM loaded_shard_summoners WHERE list_contains(?, path)
+                        )
+                    """
+                    released[dataset] |= self.release_older(conn, dataset, table, where, [date, stale_files])
+                    conn.execute(f"DELETE FROM {table.name} WHERE {where};", [date, stale_files])
+                    conn.execute("DELETE FROM loaded_shard_summoners WHERE list_contains(?, path);", [stale_files])
+                else:
+                    conn.execute("DELETE FROM loaded_shard_puuids WHERE list_contains(?, path);", [stale_files])
+                conn.execute(
+                    "DELETE FROM loaded_shards WHERE dataset = ? AND list_contains(?, path);", [dataset, stale_files]
+                )
+
+            # --- insert rows of new or changed files ---
+            if new_files:
+                # NOTE: 30일 구간이 겹치는 날짜 간 중복 행은 primary key로 합쳐지고, 더 최근 수집일의 행이 남는다.
+                res = duckdb.excute_query(
+                    conn,
+                    table.insert_query(
+                        duckdb.read_parquet_query(new_files), newer="collection_date", collection_date=date
+                    ),
+                )
+                tracing.count("rows_in", sum(pq.read_metadata(path).num_rows for path in new_files))
+                tracing.count("rows_out", res[0][0] if res else 0)
+                source = duckdb.read_parquet_query(new_files, filename=True, hive_partitioning=False)
+                if dataset == MAIN_DATASET:
+                    conn.execute(
+                        f"INSERT INTO loaded_shard_summoners SELECT DISTINCT filename, summoner_id FROM {source};"
+                    )
+                else:
+                    conn.execute(
+                        f"""
+                        INSERT INTO loaded_shard_puuids
+                        SELECT filename, puuid, MAX(sampled_summoner_id) FROM {source}
+                        WHERE sampled_summoner_id IS NOT NULL
+                        GROUP BY filename, puuid;
+                        """
+                    )
+                conn.executemany(
+                    "INSERT INTO loaded_shards VALUES (?, ?, ?, ?, ?);",
+                    [(date, dataset, path, *current[path]) for path in new_files],
+                )
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+        return len(new_files) + len(stale_files)
+
+    def release_older(self, conn, dataset: str, table, where: str, params: list) -> Set[str]:
+        # --- forget the loaded shard files of older dates that hold keys of the rows about to be deleted ---
+        # NOTE: 날짜 간 중복 키는 가장 최근 수집일의 행 하나만 남으므로, 그 행을 지우면 같은 키를 가진 이전 수집일의 행도 함께 사라진다.
+        #       이전 수집일의 shard 파일을 적재 목록에서 빼서 다시 적재되게 한다. (main은 summoner_id, participants는 샘플 소환사의
+        #       puuid로 찾는다. 경기를 가진 소환사의 participants 파일에는 그 경기의 참가자가 모두 들어 있다.)
+        index, column = {
+            MAIN_DATASET: ("loaded_shard_summoners", "summoner_id"),
+            "participants": ("loaded_shard_puuids", "puuid"),
+        }[dataset]
+        rows = duckdb.excute_query(
+            conn,
+            f"""
+            SELECT DISTINCT l.date, l.path
+            FROM loaded_shards AS l
+            JOIN {index} AS i ON i.path = l.path
+            JOIN (SELECT DISTINCT {column}, collection_date FROM {table.name} WHERE {where}) AS r
+                ON r.{column} = i.{column} AND CAST(l.date AS DATE) < r.collection_date
+            WHERE l.dataset = ?;
+            """,
+            [*params, dataset],
+        )
+        paths = [path for _, path in rows]
+        if paths:
+            conn.execute(f"DELETE FROM {index} WHERE list_contains(?, path);", [paths])
+            conn.execute("DELETE FROM loaded_shards WHERE dataset = ? AND list_contains(?, path);", [dataset, paths])
+        return {date for date, _ in rows}
+
+    def reload_released(
+        self, conn, chunks_dir: str, dataset: str, table, released: Dict[str, Set[str]], cutoff=None
+    ) -> int:
+        # --- load the released files again, newest date first, rows of newer dates keep their keys ---
+        n_changed = 0
+        while released[dataset]:
+            date = max(released[dataset])
+            released[dataset].discard(date)
+            if cutoff is not None and datetime.strptime(date, "%Y-%m-%d").date() < cutoff:
+                continue  # pruned by retention
+            print(f"# [INFO] reload {dataset} of {date}: older rows of deleted keys")
+            with ShardStore(chunks_dir, date) as shard_store:
+                files = shard_store.files(dataset)
+            n_changed += self.load_shards(conn, date, dataset, files, table, released)
+        return n_changed
+
 
 if __name__ == "__main__":
     # test
     component = Component()
     message = RequestDuckdbDataUpload(
+        date="2025-05-14",
         duckdb_filepath="data/raw_data.db",
-        chunks_dir="data/chunks/2025-05-14",
+        chunks_dir="data/chunks",
     )
     response = component(message)
     print(response)
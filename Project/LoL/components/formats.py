@@ -1,9 +1,26 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from typing import List, Dict, Union, Optional
 
 
 class ResponseMessage(BaseModel):
     result: str  # "success" or "fail"
+    error: Optional[str] = None  # "{type}: {message}" of a failed call, the traceback is in the trace file
+    _exception: Optional[BaseException] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_exception(cls, e: BaseException) -> "ResponseMessage":
+        res = cls(result="fail", error=f"{type(e).__name__}: {e}")
+        res._exception = e
+        return res
+
+    @property
+    def exception(self) -> Optional[BaseException]:
+        # --- the exception of a failed call in this process, not serialized ---
+        return self._exception
+
+
+class ResponseCached(ResponseMessage):
+    model_config = ConfigDict(extra="allow")  # every field of the recorded response message
 
 
 class RequestMessage(BaseModel):
@@ -23,6 +40,16 @@ class RequestDataCollect(RequestMessage):
     sample_size: int
     recipe: List[RecipeItem]
     resume: bool = False
+    concurrency: int = 1  # number of summoners collected at once, 1 = sequential
+    match_cache_size_mb: int = 4096  # size limit of {chunks_dir}/match_cache, 0 = disabled
+    incremental_matchids: bool = True  # request only match ids newer than {chunks_dir}/matchids.db watermark
+    full_match: bool = False  # also write every participant of a match to {chunks_dir}/{date}/participants
+    part_rows: int = 100000  # buffered rows per (tier, division) before a part file is written
+    flush_seconds: float = 300  # or when the oldest buffered summoner is this old, a crash loses at most this much work
+    row_group_size: int = 100000
+    region_url: Optional[str] = None  # riot api base urls, default = RIOT_REGION_URL / RIOT_PLATFORM_URL or riot
+    platform_url: Optional[str] = None
+    app_limits: Optional[str] = None  # app rate limit of the key ("500:10,30000:600"), default = RIOT_APP_LIMITS
 
 
 class ResponseDataCollect(ResponseMessage, RequestDataCollect):
@@ -32,7 +59,8 @@ class ResponseDataCollect(ResponseMessage, RequestDataCollect):
 class RequestDataDelete(RequestMessage):
     chunks_dir: Optional[str] = None
     tier: Optional[str] = None
-    division: Optional[str] = None
+    division: Optional[str] = None  # None = the tier without divisions (MASTER and above)
+    all_divisions: bool = False  # delete every division of the tier, division is ignored
 
 
 class ResponseDataDelete(ResponseMessage, RequestDataDelete):
@@ -40,9 +68,11 @@ class ResponseDataDelete(ResponseMessage, RequestDataDelete):
 
 
 class RequestDuckdbDataUpload(RequestMessage):
-    date: str
+    date: Optional[str] = None  # default = the date of the upstream data_collect
     chunks_dir: Optional[str] = None
     duckdb_filepath: Optional[str] = None
+    incremental: bool = True  # load only new or changed shard files, false = drop and reload the date's partition
+    retention_days: Optional[int] = None  # prune partitions collected more than retention_days before date
 
 
 class ResponseDuckdbDataUpload(ResponseMessage, RequestDuckdbDataUpload):
@@ -52,6 +82,12 @@ class ResponseDuckdbDataUpload(ResponseMessage, RequestDuckdbDataUpload):
 class RequestDataAnalyze(RequestMessage):
     duckdb_filepath: Optional[str] = None
     report_filepath: Optional[str] = None
+    start_date: Optional[str] = None  # games from 30 days before start_date to end_date, default = the latest date
+    end_date: Optional[str] = None
+    incremental: bool = True  # keep per day state in report.db and aggregate only the changed days again
+    metrics: Optional[List[str]] = None  # metric names or report tables to create, default = every metric
+    metric_workers: int = 4  # number of duckdb cursors running independent metrics at the same time
+    memory_budget_mb: Optional[int] = None  # streaming mode, at least 128: duckdb spills to disk, python in partitions
 
 
 class ResponseDataAnalyze(ResponseMessage, RequestDataAnalyze):
@@ -0,0 +1,18 @@
+# component alias -> module, 파이프라인은 설정된 stage의 component만 실행 시점에 import 한다
+from importlib import import_module
+
+COMPONENTS = {
+    "data_collect": "components.data_collect.component",
+    "data_delete": "components.data_delete.component",
+    "data_upload": "components.data_upload.component",
+    "data_analyze": "components.data_analyze.component",
+    "dashboard_run": "components.dashboard_run.component",
+}
+
+
+def load(alias: str) -> type:
+    # NOTE: import된 module은 sys.modules에 남으므로 두 번째 호출부터는 비용이 없다.
+    assert alias in COMPONENTS, f"# [ERROR] Unknown component: {alias}"
+    component = import_module(COMPONENTS[alias]).Component
+    assert component.alias == alias, f"# [ERROR] {COMPONENTS[alias]} has alias {component.alias}, not {alias}"
+    return component
@@ -0,0 +1,88 @@
+# match-v5 응답 캐시 (matchId -> gzip json)
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+class MatchCache:
+    # NOTE: 한 경기는 최대 10명의 소환사가 공유하므로, 한 번 받은 match 데이터는 날짜/resume 여부와 관계없이 재사용한다.
+    #       파일 mtime을 마지막 접근 시각으로 사용하며, 전체 크기가 max_bytes를 넘으면 오래된 것부터 지운다(LRU).
+    def __init__(self, cache_dir, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.size = sum(entry.stat().st_size for entry in self.scan())
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path(self, matchid: str) -> Path:
+        # --- fan out by the last 2 digits so a directory does not hold every match ---
+        return self.cache_dir / matchid[-2:] / f"{matchid}.json.gz"
+
+    def scan(self):
+        for sub in os.scandir(self.cache_dir):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(".json.gz"):
+                        yield entry
+
+    def get(self, matchid: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        path = self.path(matchid)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fp:
+                res = json.load(fp)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, EOFError, json.JSONDecodeError, gzip.BadGzipFile):
+            return None
+        self.hits += 1
+        return res
+
+    def put(self, matchid: str, match: dict):
+        if match is None:
+            return  # failed download, nothing was fetched
+        self.misses += 1
+        if not self.enabled:
+            return
+        path = self.path(matchid)
+        os.makedirs(path.parent, exist_ok=True)
+        # --- an existing entry (two summoners of the same match missed at once) is replaced, not added ---
+        try:
+            old_size = path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+        tmp_path = path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as fp:
+            json.dump(match, fp, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.size += path.stat().st_size - old_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        # --- remove least recently used entries until 90% of max_bytes ---
+        entries = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self.scan()))
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return f"hits={self.hits}, misses={self.misses}, hit_rate={rate:.2%}, size={self.size / 2**20:.1f}MB"
@@ -0,0 +1,83 @@
+# 소환사별 match id 목록과 수집 구간(watermark) 저장소
+from typing import List, Optional, Tuple
+
+from modules.storage import sqlite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    puuid TEXT PRIMARY KEY,
+    covered_from INTEGER NOT NULL,
+    covered_to INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matchids (
+    puuid TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    lo INTEGER NOT NULL,
+    hi INTEGER NOT NULL,
+    PRIMARY KEY (puuid, match_id)
+);
+"""
+
+
+class MatchIdStore:
+    # NOTE: 각 match id는 [lo, hi] 구간(초 단위 epoch) 안에서 시작된 경기임을 뜻한다.
+    #       처음에는 요청한 조회 구간 전체로 저장되고, match 데이터를 받은 뒤 resolve()로 실제 시작 시각에 고정된다.
+    #       매일 수집하면 [covered_to + 1, endTime] 구간만 새로 요청하고, 30일 구간을 벗어난 id는 prune으로 지운다.
+    def __init__(self, db_path):
+        self.conn = sqlite.get_connection(db_path)
+        sqlite.excute_script(self.conn, SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def delta(self, puuid: str, start_time: int, end_time: int) -> Optional[Tuple[int, int]]:
+        # --- window that still has to be requested from the api, None if already covered ---
+        res = sqlite.excute_query(
+            self.conn, "SELECT covered_from, covered_to FROM watermarks WHERE puuid = ?;", (puuid,)
+        )
+        if not res or start_time < res[0][0]:
+            return start_time, end_time
+        covered_to = res[0][1]
+        if end_time > covered_to:
+            return covered_to + 1, end_time
+        return None
+
+    def merge(self, puuid: str, matchids: List[str], start_time: int, end_time: int):
+        with self.conn:
+            res = sqlite.excute_query(
+                self.conn, "SELECT covered_from, covered_to FROM watermarks WHERE puuid = ?;", (puuid,)
+            )
+            if not res or start_time < res[0][0]:
+                # --- full fetch: forget previous history of the puuid ---
+                self.conn.execute("DELETE FROM matchids WHERE puuid = ?;", (puuid,))
+                covered_from, covered_to = start_time, end_time
+            else:
+                covered_from, covered_to = res[0][0], max(res[0][1], end_time)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO matchids VALUES (?, ?, ?, ?);",
+                [(puuid, matchid, start_time, end_time) for matchid in matchids],
+            )
+            self.conn.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?);", (puuid, covered_from, covered_to))
+
+    def get(self, puuid: str, start_time: int, end_time: int) -> List[str]:
+        # NOTE: resolve되지 않은 채 start_time에 걸쳐 있는 id도 포함한다 (누락보다 중복 확인이 싸다).
+        res = sqlite.excute_query(
+            self.conn,
+            "SELECT match_id FROM matchids WHERE puuid = ? AND hi >= ? AND lo <= ? ORDER BY hi DESC, match_id DESC;",
+            (puuid, start_time, end_time),
+        )
+        return [x[0] for x in res]
+
+    def resolve(self, puuid: str, match_times: List[Tuple[str, int]]):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE matchids SET lo = ?, hi = ? WHERE puuid = ? AND match_id = ?;",
+                [(ts, ts, puuid, matchid) for matchid, ts in match_times],
+            )
+
+    def prune(self, puuid: str, start_time: int):
+        with self.conn:
+            self.conn.execute("DELETE FROM matchids WHERE puuid = ? AND hi < ?;", (puuid, start_time))
+            self.conn.execute(
+                "UPDATE watermarks SET covered_from = MAX(covered_from, ?) WHERE puuid = ?;", (start_time, puuid)
+            )
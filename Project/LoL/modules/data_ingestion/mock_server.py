@@ -0,0 +1,225 @@
+# 로컬 Riot API 대역 서버 (가상 데이터 + Riot 방식의 rate limit, 지연, 5xx 오류 주입)
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter
+from functools import partial
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from modules.data_ingestion.rate_limit import parse_limits
+from modules.data_ingestion.synthetic import SyntheticRiot
+
+DEV_KEY_APP_LIMITS = "20:1,100:120"
+# --- method limits of a production key (requests:seconds) ---
+METHOD_LIMITS = {
+    "league-v4.getLeagueEntries": "50:10",
+    "league-v4.getChallengerLeague": "30:10",
+    "league-v4.getGrandmasterLeague": "30:10",
+    "league-v4.getMasterLeague": "30:10",
+    "match-v5.getMatchIdsByPUUID": "2000:10",
+    "match-v5.getMatch": "2000:10",
+}
+
+
+class FixedWindowLimiter:
+    # NOTE: Riot처럼 각 윈도우는 그 윈도우의 첫 요청 시점에 시작하고, 한도를 넘은 요청은 카운트하지 않는다.
+    def __init__(self, limits: str):
+        self.limits = limits
+        # --- [limit, period, start, count] of each window ---
+        self.windows = [[limit, period, 0.0, 0] for limit, period in parse_limits(limits)]
+
+    def hit(self, now: float) -> Optional[int]:
+        # --- retry after (seconds) if any window is full, otherwise count the request ---
+        retry_after = 0
+        for window in self.windows:
+            limit, period, start, count = window
+            if now - start >= period:
+                window[2], window[3] = now, 0
+            elif count >= limit:
+                retry_after = max(retry_after, math.ceil(start + period - now))
+        if retry_after:
+            return retry_after
+        for window in self.windows:
+            window[3] += 1
+        return None
+
+    def counts(self) -> str:
+        return ",".join(f"{count}:{period}" for _, period, _, count in self.windows)
+
+
+class MockRiotServer:
+    # NOTE: league / match id / match endpoint를 SyntheticRiot 데이터로 응답한다. region, platform 두 base url을 하나로 대신한다.
+    #       latency_ms: 평균 응답 지연(±50% 균등 분포), error_rate: 500/503 응답 비율 (rate limit 카운트에는 포함)
+    def __init__(
+        self,
+        riot: SyntheticRiot,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        app_limits: Optional[str] = DEV_KEY_APP_LIMITS,
+        method_limits: Optional[Dict[str, str]] = None,
+        latency_ms: float = 0,
+        error_rate: float = 0,
+        seed: int = 0,
+    ):
+        self.riot = riot
+        self.host = host
+        self.port = port
+        self.app_limiter = FixedWindowLimiter(app_limits or "")
+        self.method_limiters = {k: FixedWindowLimiter(v) for k, v in (method_limits or METHOD_LIMITS).items()}
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = Counter()  # "{method} {status}" -> count
+        self.runner: Optional[web.AppRunner] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- app ---
+    def app(self) -> web.Application:
+        routes = [
+            ("/lol/league/v4/entries/{queue}/{tier}/{division}", "league-v4.getLeagueEntries", self.league_entries),
+            ("/lol/league/v4/challengerleagues/by-queue/{queue}", "league-v4.getChallengerLeague", self.apex_league),
+            ("/lol/league/v4/grandmasterleagues/by-queue/{queue}", "league-v4.getGrandmasterLeague", self.apex_league),
+            ("/lol/league/v4/masterleagues/by-queue/{queue}", "league-v4.getMasterLeague", self.apex_league),
+            ("/lol/match/v5/matches/by-puuid/{puuid}/ids", "match-v5.getMatchIdsByPUUID", self.matchids),
+            ("/lol/match/v5/matches/{matchid}", "match-v5.getMatch", self.match),
+        ]
+        app = web.Application()
+        app.add_routes([web.get(path, partial(self.handle, method, handler)) for path, method, handler in routes])
+        app.add_routes([web.get("/mock/stats", self.get_stats)])
+        return app
+
+    async def handle(self, method: str, handler, request: web.Request) -> web.Response:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms * self.random.uniform(0.5, 1.5) / 1000)
+
+        # --- rate limits: application first, then method ---
+        now = time.monotonic()
+        method_limiter = self.method_limiters.setdefault(method, FixedWindowLimiter(""))
+        headers = {}
+        for limit_type, limiter in [("application", self.app_limiter), ("method", method_limiter)]:
+            retry_after = limiter.hit(now)
+            if retry_after is not None:
+                headers.update({"Retry-After": str(retry_after), "X-Rate-Limit-Type": limit_type})
+                break
+        headers.update(
+            {
+                "X-App-Rate-Limit": self.app_limiter.limits,
+                "X-App-Rate-Limit-Count": self.app_limiter.counts(),
+                "X-Method-Rate-Limit": method_limiter.limits,
+                "X-Method-Rate-Limit-Count": method_limiter.counts(),
+            }
+        )
+        if "Retry-After" in headers:
+            response = self.status(429, "Rate limit exceeded", headers)
+        elif self.error_rate and self.random.random() < self.error_rate:
+            response = self.status(self.random.choice([500, 503]), "Injected error", headers)
+        else:
+            response = await handler(request)
+            response.headers.update(headers)
+        self.stats[f"{method} {response.status}"] += 1
+        return response
+
+    def status(self, code: int, message: str, headers: Optional[dict] = None) -> web.Response:
+        return web.json_response({"status": {"message": message, "status_code": code}}, status=code, headers=headers)
+
+    # --- endpoints ---
+    async def league_entries(self, request: web.Request):
+        q = request.match_info
+        page = int(request.query.get("page", 1))
+        return web.json_response(self.riot.league_entries(q["queue"], q["tier"], q["division"], page))
+
+    async def apex_league(self, request: web.Request):
+        tier = request.path.split("/")[4].replace("leagues", "").upper()
+        return web.json_response(
+            {
+                "tier": tier,
+                "leagueId": f"mock-{tier.lower()}",
+                "queue": request.match_info["queue"],
+                "name": f"Mock {tier.title()}",
+                "entries": self.riot.leagues.get((tier, "None"), []),
+            }
+        )
+
+    async def matchids(self, request: web.Request):
+        query = {k: int(v) for k, v in request.query.items() if k in ("startTime", "endTime", "start", "count")}
+        # NOTE: riot_api는 startTime/endTime이 없을 때 0을 보낸다.
+        query = {k: v for k, v in query.items() if not (k in ("startTime", "endTime") and v == 0)}
+        return web.json_response(self.riot.matchids_by_puuid(request.match_info["puuid"], **query))
+
+    async def match(self, request: web.Request):
+        res = self.riot.match(request.match_info["matchid"])
+        if res is None:
+            return self.status(404, "Data not found - match file not found")
+        return web.json_response(res)
+
+    async def get_stats(self, request: web.Request):
+        return web.json_response(dict(self.stats))
+
+    # --- run in a background thread (tests, benchmarks) ---
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.runner = web.AppRunner(self.app(), access_log=None)
+            self.loop.run_until_complete(self.runner.setup())
+            self.loop.run_until_complete(web.TCPSite(self.runner, self.host, self.port).start())
+            self.port = self.runner.addresses[0][1]  # port=0 -> the bound port
+            ready.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.runner.cleanup())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        ready.wait()
+        print(f"# [INFO] mock riot server: {self.url}")
+        return self
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Riot API stand-in server with synthetic data")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--date", type=str, default="2025-05-14")
+    parser.add_argument("--summoners", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--matches_per_day", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app_limits", type=str, default=DEV_KEY_APP_LIMITS)
+    parser.add_argument("--latency_ms", type=float, default=0)
+    parser.add_argument("--error_rate", type=float, default=0)
+    args = parser.parse_args()
+
+    riot = SyntheticRiot(args.date, args.summoners, args.days, args.matches_per_day, seed=args.seed)
+    server = MockRiotServer(
+        riot, args.host, args.port, args.app_limits, latency_ms=args.latency_ms, error_rate=args.error_rate
+    )
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
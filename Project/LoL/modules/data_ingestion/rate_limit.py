@@ -0,0 +1,122 @@
+# Riot API rate limit 관련 기능 함수
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_limits(header: Optional[str]) -> List[Tuple[int, int]]:
+    # "20:1,100:120" -> [(20, 1), (100, 120)]  (requests:seconds)
+    if not header:
+        return []
+    res = []
+    for item in header.split(","):
+        limit, period = item.strip().split(":")
+        res.append((int(limit), int(period)))
+    return res
+
+
+# NOTE: Riot은 첫 요청 시점부터 시작하는 고정 윈도우로 카운트하므로, 버스트 후 연속 리필되는 일반적인 token bucket은
+#       윈도우가 끝나기 전에 429를 받게 된다. 소모한 토큰이 정확히 `period`초 뒤에 반환되도록 하여
+#       어떤 길이 `period`의 구간에서도 `limit`을 넘지 않게 한다.
+class TokenBucket:
+    def __init__(self, limit: int, period: int):
+        self.limit = limit
+        self.period = period
+        self.spent = deque()  # monotonic timestamps of spent tokens
+
+    def _expire(self, now: float):
+        while self.spent and now - self.spent[0] >= self.period:
+            self.spent.popleft()
+
+    def delay(self, now: float) -> float:
+        self._expire(now)
+        if len(self.spent) < self.limit:
+            return 0.0
+        return self.period - (now - self.spent[0])
+
+    def consume(self, now: float):
+        self.spent.append(now)
+
+    def sync(self, count: int, now: float):
+        # --- server saw more requests than we did (other processes, restarts) ---
+        self._expire(now)
+        while len(self.spent) < min(count, self.limit):
+            self.spent.append(now)
+
+
+class RateLimiter:
+    def __init__(self, limits: Optional[str] = None):
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.blocked_until = 0.0
+        self.update(limits)
+
+    def update(self, limits: Optional[str], counts: Optional[str] = None, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        parsed = parse_limits(limits)
+        if parsed:
+            # --- adapt to the limits reported by the server, keep already spent tokens ---
+            buckets = {}
+            for limit, period in parsed:
+                bucket = self.buckets.get(period, TokenBucket(limit, period))
+                bucket.limit = limit
+                buckets[period] = bucket
+            self.buckets = buckets
+        for count, period in parse_limits(counts):
+            if period in self.buckets:
+                self.buckets[period].sync(count, now)
+
+    def block(self, seconds: float, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def delay(self, now: float) -> float:
+        res = max(0.0, self.blocked_until - now)
+        for bucket in self.buckets.values():
+            res = max(res, bucket.delay(now))
+        return res
+
+    def consume(self, now: float):
+        for bucket in self.buckets.values():
+            bucket.consume(now)
+
+
+# NOTE: app limit(라우팅 호스트 단위)과 method limit(호스트 + 엔드포인트 단위)을 함께 만족할 때까지 대기한다.
+class RateLimiterGroup:
+    def __init__(self, app_limits: Optional[str] = None):
+        self.app_limits = app_limits
+        self.app: Dict[str, RateLimiter] = {}
+        self.method: Dict[Tuple[str, str], RateLimiter] = {}
+        self.lock = asyncio.Lock()
+
+    def get_limiters(self, host: str, method: str) -> Tuple[RateLimiter, RateLimiter]:
+        if host not in self.app:
+            self.app[host] = RateLimiter(self.app_limits)
+        if (host, method) not in self.method:
+            self.method[(host, method)] = RateLimiter()
+        return self.app[host], self.method[(host, method)]
+
+    async def acquire(self, host: str, method: str):
+        limiters = self.get_limiters(host, method)
+        while True:
+            async with self.lock:
+                now = time.monotonic()
+                delay = max(limiter.delay(now) for limiter in limiters)
+                if delay <= 0:
+                    for limiter in limiters:
+                        limiter.consume(now)
+                    return
+            await asyncio.sleep(delay)
+
+    def update(self, host: str, method: str, headers):
+        app, method_limiter = self.get_limiters(host, method)
+        app.update(headers.get("X-App-Rate-Limit"), headers.get("X-App-Rate-Limit-Count"))
+        method_limiter.update(headers.get("X-Method-Rate-Limit"), headers.get("X-Method-Rate-Limit-Count"))
+
+    def block(self, host: str, method: str, seconds: float, limit_type: Optional[str] = None):
+        app, method_limiter = self.get_limiters(host, method)
+        if limit_type == "method":
+            method_limiter.block(seconds)
+        else:
+            # --- "application" or "service"(unknown) -> stop every request to the host ---
+            app.block(seconds)
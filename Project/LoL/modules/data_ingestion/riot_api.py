@@ -3,78 +3,96 @@ import time
 import os
 import json
 
+from modules import tracing
 
-def get(url: str):
+# NOTE: 로컬 대역 서버(mock_server.py) 등으로 바꿀 수 있도록 환경 변수 또는 set_base_url()로 설정한다.
+DEFAULT_REGION_URL = "https://asia.api.riotgames.com"
+DEFAULT_PLATFORM_URL = "https://kr.api.riotgames.com"
+REGION_URL = os.getenv("RIOT_REGION_URL", DEFAULT_REGION_URL)
+PLATFORM_URL = os.getenv("RIOT_PLATFORM_URL", DEFAULT_PLATFORM_URL)
+
+
+def set_base_url(region_url: str = None, platform_url: str = None):
+    # --- None = RIOT_REGION_URL / RIOT_PLATFORM_URL or riot servers, urls of a previous call are not kept ---
+    global REGION_URL, PLATFORM_URL
+    REGION_URL = (region_url or os.getenv("RIOT_REGION_URL", DEFAULT_REGION_URL)).rstrip("/")
+    PLATFORM_URL = (platform_url or os.getenv("RIOT_PLATFORM_URL", DEFAULT_PLATFORM_URL)).rstrip("/")
+
+
+def request(url: str, method: str):
+    # --- every attempt is counted in the trace by method (endpoint) and status ---
+    start = time.perf_counter()
     response = requests.get(url)
+    tracing.api_call(method, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def get(url: str, method: str = "unknown"):
+    response = request(url, method)
     if response.status_code == 429:
         retry_after = response.headers.get("Retry-After", 60)
         print(f"# [ERROR:429] Too many requests, wait {retry_after} sec...")
         time.sleep(int(retry_after) + 1)
-        return get(url)
+        return get(url, method)
     elif response.status_code == 403:
         print(f"# [ERROR:403] Forbidden, check your API key or other issues.")
         return None
     while response.status_code != 200:
         print(f"# [ERROR:{response.status_code}] Error, after 30 seconds, retrying")
         time.sleep(30)
-        response = requests.get(url)
+        response = request(url, method)
     return response.json()
 
 
 def get_account_by_puuid(puuid: str):
-    url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-puuid/{puuid}?api_key=" + os.getenv("RIOT_KEY")
-    return get(url)
+    url = f"{REGION_URL}/riot/account/v1/accounts/by-puuid/{puuid}?api_key=" + os.getenv("RIOT_KEY", "")
+    return get(url, "account-v1.getByPuuid")
 
 
 def get_account_by_name_n_tag(name: str, tag: str):
-    url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{name}/{tag}?api_key=" + os.getenv(
-        "RIOT_KEY"
-    )
-    return get(url)
+    url = f"{REGION_URL}/riot/account/v1/accounts/by-riot-id/{name}/{tag}?api_key=" + os.getenv("RIOT_KEY", "")
+    return get(url, "account-v1.getByRiotId")
 
 
 def get_summoner_by_puuid(puuid: str):
-    url = f"https://kr.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}?api_key=" + os.getenv("RIOT_KEY")
-    return get(url)
+    url = f"{PLATFORM_URL}/lol/summoner/v4/summoners/by-puuid/{puuid}?api_key=" + os.getenv("RIOT_KEY", "")
+    return get(url, "summoner-v4.getByPUUID")
 
 
 def get_matchids_by_puuid(puuid: str, *, startTime: int = 0, endTime: int = 0, start: int = 0, count: int = 20):
     url = (
-        f"https://asia.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?startTime={startTime}&endTime={endTime}&start={start}&count={count}&api_key="
-        + os.getenv("RIOT_KEY")
+        f"{REGION_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids?startTime={startTime}&endTime={endTime}&start={start}&count={count}&api_key="
+        + os.getenv("RIOT_KEY", "")
     )
-    return get(url)
+    return get(url, "match-v5.getMatchIdsByPUUID")
 
 
 def get_match_by_matchid(matchid: str):
-    url = f"https://asia.api.riotgames.com/lol/match/v5/matches/{matchid}?api_key=" + os.getenv("RIOT_KEY")
-    return get(url)
+    url = f"{REGION_URL}/lol/match/v5/matches/{matchid}?api_key=" + os.getenv("RIOT_KEY", "")
+    return get(url, "match-v5.getMatch")
 
 
 def get_matchtimeline_by_matchid(matchid: str):
-    url = f"https://asia.api.riotgames.com/lol/match/v5/matches/{matchid}/timeline?api_key=" + os.getenv("RIOT_KEY")
-    return get(url)
+    url = f"{REGION_URL}/lol/match/v5/matches/{matchid}/timeline?api_key=" + os.getenv("RIOT_KEY", "")
+    return get(url, "match-v5.getTimeline")
 
 
 def get_league_by_queue_tier_division(queue: str, tier: str, division: str, page: int = 1):
     if tier == "CHALLENGER":
-        url = f"https://kr.api.riotgames.com/lol/league/v4/challengerleagues/by-queue/{queue}?api_key=" + os.getenv(
-            "RIOT_KEY"
-        )
+        method = "league-v4.getChallengerLeague"
+        url = f"{PLATFORM_URL}/lol/league/v4/challengerleagues/by-queue/{queue}?api_key=" + os.getenv("RIOT_KEY", "")
     elif tier == "GRANDMASTER":
-        url = f"https://kr.api.riotgames.com/lol/league/v4/grandmasterleagues/by-queue/{queue}?api_key=" + os.getenv(
-            "RIOT_KEY"
-        )
+        method = "league-v4.getGrandmasterLeague"
+        url = f"{PLATFORM_URL}/lol/league/v4/grandmasterleagues/by-queue/{queue}?api_key=" + os.getenv("RIOT_KEY", "")
     elif tier == "MASTER":
-        url = f"https://kr.api.riotgames.com/lol/league/v4/masterleagues/by-queue/{queue}?api_key=" + os.getenv(
-            "RIOT_KEY"
-        )
+        method = "league-v4.getMasterLeague"
+        url = f"{PLATFORM_URL}/lol/league/v4/masterleagues/by-queue/{queue}?api_key=" + os.getenv("RIOT_KEY", "")
     else:
-        url = (
-            f"https://kr.api.riotgames.com/lol/league/v4/entries/{queue}/{tier}/{division}?page={page}&api_key="
-            + os.getenv("RIOT_KEY")
+        method = "league-v4.getLeagueEntries"
+        url = f"{PLATFORM_URL}/lol/league/v4/entries/{queue}/{tier}/{division}?page={page}&api_key=" + os.getenv(
+            "RIOT_KEY", ""
         )
-    return get(url)
+    return get(url, method)
 
 
 def export_json(json_data, output_path):
@@ -0,0 +1,164 @@
+# Riot API 비동기 클라이언트 (aiohttp + rate limiter)
+import asyncio
+import os
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from modules import tracing
+from modules.data_ingestion.rate_limit import RateLimiterGroup
+
+REGION_URL = os.getenv("RIOT_REGION_URL", "https://asia.api.riotgames.com")
+PLATFORM_URL = os.getenv("RIOT_PLATFORM_URL", "https://kr.api.riotgames.com")
+DEV_KEY_APP_LIMITS = "20:1,100:120"
+
+
+class RiotClient:
+    # NOTE: `async with RiotClient() as client:` 로 세션(커넥션 풀)을 열고 닫는다.
+    #       rate limit은 응답 헤더(X-App-Rate-Limit, X-Method-Rate-Limit)를 읽어 실행 중에 갱신된다.
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        app_limits: Optional[str] = None,
+        max_connections: int = 50,
+        max_retries: int = 5,
+        timeout: float = 30,
+        region_url: Optional[str] = None,
+        platform_url: Optional[str] = None,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("RIOT_KEY")
+        self.region_url = (region_url or REGION_URL).rstrip("/")
+        self.platform_url = (platform_url or PLATFORM_URL).rstrip("/")
+        # --- limits of the key until the first response reports them, default = RIOT_APP_LIMITS or a dev key ---
+        self.limiter = RateLimiterGroup(app_limits or os.getenv("RIOT_APP_LIMITS", DEV_KEY_APP_LIMITS))
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"X-Riot-Token": self.api_key or ""},
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url: str, method: Optional[str] = None, params: Optional[dict] = None):
+        host = urlsplit(url).netloc
+        method = method if method is not None else urlsplit(url).path
+        if self.session is None:
+            await self.open()
+        backoff, attempts = 1, 0
+        while attempts <= self.max_retries:
+            await self.limiter.acquire(host, method)
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    tracing.api_call(method, response.status, time.perf_counter() - start)
+                    self.limiter.update(host, method, response.headers)
+                    if response.status == 200:
+                        return await response.json()
+                    if response.status == 429:
+                        retry_after = int(response.headers.get("Retry-After", 10))
+                        limit_type = response.headers.get("X-Rate-Limit-Type")
+                        print(f"# [ERROR:429] Too many requests ({limit_type}), wait {retry_after} sec...")
+                        self.limiter.block(host, method, retry_after, limit_type)
+                        continue
+                    if response.status in (400, 401, 403, 404):
+                        print(f"# [ERROR:{response.status}] {method}, check your API key or request.")
+                        return None
+                    print(f"# [ERROR:{response.status}] {method}, after {backoff} seconds, retrying")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                tracing.api_call(method, type(e).__name__, time.perf_counter() - start)
+                print(f"# [ERROR] {method}: {e!r}, after {backoff} seconds, retrying")
+            # --- 429 is not counted, only server/network errors consume retries ---
+            attempts += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+        return None
+
+    async def gather(self, coros):
+        return await asyncio.gather(*coros)
+
+    # --- single request helpers (same names as riot_api) ---
+    async def get_account_by_puuid(self, puuid: str):
+        url = f"{self.region_url}/riot/account/v1/accounts/by-puuid/{puuid}"
+        return await self.get(url, "account-v1.getByPuuid")
+
+    async def get_account_by_name_n_tag(self, name: str, tag: str):
+        url = f"{self.region_url}/riot/account/v1/accounts/by-riot-id/{name}/{tag}"
+        return await self.get(url, "account-v1.getByRiotId")
+
+    async def get_summoner_by_puuid(self, puuid: str):
+        url = f"{self.platform_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        return await self.get(url, "summoner-v4.getByPUUID")
+
+    async def get_matchids_by_puuid(
+        self, puuid: str, *, startTime: int = 0, endTime: int = 0, start: int = 0, count: int = 20
+    ):
+        url = f"{self.region_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
+        params = {"startTime": startTime, "endTime": endTime, "start": start, "count": count}
+        return await self.get(url, "match-v5.getMatchIdsByPUUID", params=params)
+
+    async def get_match_by_matchid(self, matchid: str):
+        url = f"{self.region_url}/lol/match/v5/matches/{matchid}"
+        return await self.get(url, "match-v5.getMatch")
+
+    async def get_matchtimeline_by_matchid(self, matchid: str):
+        url = f"{self.region_url}/lol/match/v5/matches/{matchid}/timeline"
+        return await self.get(url, "match-v5.getTimeline")
+
+    async def get_league_by_queue_tier_division(self, queue: str, tier: str, division: str, page: int = 1):
+        if tier == "CHALLENGER":
+            url = f"{self.platform_url}/lol/league/v4/challengerleagues/by-queue/{queue}"
+            return await self.get(url, "league-v4.getChallengerLeague")
+        elif tier == "GRANDMASTER":
+            url = f"{self.platform_url}/lol/league/v4/grandmasterleagues/by-queue/{queue}"
+            return await self.get(url, "league-v4.getGrandmasterLeague")
+        elif tier == "MASTER":
+            url = f"{self.platform_url}/lol/league/v4/masterleagues/by-queue/{queue}"
+            return await self.get(url, "league-v4.getMasterLeague")
+        url = f"{self.platform_url}/lol/league/v4/entries/{queue}/{tier}/{division}"
+        return await self.get(url, "league-v4.getLeagueEntries", params={"page": page})
+
+    # --- batch helpers ---
+    async def get_accounts_by_puuids(self, puuids: List[str]):
+        return await self.gather(self.get_account_by_puuid(puuid) for puuid in puuids)
+
+    async def get_summoners_by_puuids(self, puuids: List[str]):
+        return await self.gather(self.get_summoner_by_puuid(puuid) for puuid in puuids)
+
+    async def get_matchids_by_puuids(self, puuids: List[str], **kwargs):
+        return await self.gather(self.get_matchids_by_puuid(puuid, **kwargs) for puuid in puuids)
+
+    async def get_matches_by_matchids(self, matchids: List[str]):
+        return await self.gather(self.get_match_by_matchid(matchid) for matchid in matchids)
+
+    async def get_matchtimelines_by_matchids(self, matchids: List[str]):
+        return await self.gather(self.get_matchtimeline_by_matchid(matchid) for matchid in matchids)
+
+
+# if __name__ == "__main__":
+#     async def main():
+#         async with RiotClient() as client:
+#             x = await client.get_league_by_queue_tier_division("RANKED_SOLO_5x5", "DIAMOND", "I")
+#             z = await client.get_matchids_by_puuids([entry["puuid"] for entry in x[:10]])
+#             k = await client.get_matches_by_matchids([ids[0] for ids in z if ids])
+#             print(len(k))
+#
+#     asyncio.run(main())
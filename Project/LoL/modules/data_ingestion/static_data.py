@@ -0,0 +1,102 @@
+# Riot 정적 데이터(queues, champions, items, perks) 디스크 캐시 및 조회
+import json
+import os
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+QUEUES_URL = "https://static.developer.riotgames.com/docs/lol/queues.json"
+DDRAGON_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+DDRAGON_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/{locale}/{name}.json"
+
+# NOTE: queues.json에 누락된 큐
+EXTRA_QUEUES = [
+    {"queueId": 480, "map": "Summoner's Rift", "description": "Normal (Quickplay)", "notes": None},
+]
+
+
+class StaticData:
+    # NOTE: 다운로드한 json은 cache_dir에 저장하고 ttl_hours 동안 재사용한다.
+    #       다운로드에 실패하면 ttl이 지난 캐시라도 사용하므로, 한 번 받아둔 뒤에는 오프라인에서도 동작한다.
+    def __init__(self, cache_dir, ttl_hours: float = 24, locale: str = "en_US", timeout: float = 10):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl_hours * 3600
+        self.locale = locale
+        self.timeout = timeout
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def load_json(self, name: str, url: str):
+        path = self.cache_dir / f"{name}.json"
+        if path.exists() and time.time() - path.stat().st_mtime < self.ttl:
+            with open(path, "r", encoding="utf-8") as fp:
+                return json.load(fp)
+        try:
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            res = response.json()
+        except (requests.RequestException, ValueError) as e:
+            assert path.exists(), f"# [ERROR] Failed to download static data from {url}: {e}"
+            print(f"# [WARN] Failed to download {name}, use stale cache {path}: {e}")
+            with open(path, "r", encoding="utf-8") as fp:
+                return json.load(fp)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(res, fp, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return res
+
+    # --- data ---
+    @cached_property
+    def version(self) -> str:
+        return self.load_json("versions", DDRAGON_VERSIONS_URL)[0]
+
+    def load_ddragon(self, name: str):
+        return self.load_json(
+            f"{name}_{self.locale}", DDRAGON_DATA_URL.format(version=self.version, locale=self.locale, name=name)
+        )
+
+    @cached_property
+    def queues(self) -> Dict[int, dict]:
+        res = {x["queueId"]: x for x in self.load_json("queues", QUEUES_URL)}
+        for x in EXTRA_QUEUES:
+            res.setdefault(x["queueId"], x)
+        return res
+
+    @cached_property
+    def champions(self) -> Dict[int, dict]:
+        return {int(x["key"]): x for x in self.load_ddragon("champion")["data"].values()}
+
+    @cached_property
+    def items(self) -> Dict[int, dict]:
+        return {int(k): v for k, v in self.load_ddragon("item")["data"].items()}
+
+    @cached_property
+    def perks(self) -> Dict[int, dict]:
+        # --- runesReforged: styles -> slots -> runes, flattened into one id lookup ---
+        res = {}
+        for style in self.load_ddragon("runesReforged"):
+            res[style["id"]] = style
+            for slot in style["slots"]:
+                for rune in slot["runes"]:
+                    res[rune["id"]] = rune
+        return res
+
+    # --- lookups ---
+    def queue_description(self, queue_id: int) -> Optional[str]:
+        queue = self.queues.get(queue_id)
+        return queue["description"] if queue is not None else None
+
+    def champion_name(self, champion_id: int) -> Optional[str]:
+        champion = self.champions.get(champion_id)
+        return champion["id"] if champion is not None else None
+
+    def item_name(self, item_id: int) -> Optional[str]:
+        item = self.items.get(item_id)
+        return item["name"] if item is not None else None
+
+    def perk_name(self, perk_id: int) -> Optional[str]:
+        perk = self.perks.get(perk_id)
+        return perk["name"] if perk is not None else None
@@ -0,0 +1,180 @@
+# 벤치마크용 가상 Riot 데이터 (league entry, match id, match.json 형태의 match)
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_DIR = Path(__file__).parent / "output"
+LEAGUE_PAGE_SIZE = 205  # league-v4 entries 한 페이지의 크기
+
+# --- (gameMode, queueId, description), 비율은 MODE_RATIO ---
+MODES = [
+    ("CLASSIC", 420, "5v5 Ranked Solo games"),
+    ("CLASSIC", 440, "5v5 Ranked Flex games"),
+    ("CLASSIC", 490, "Normal (Quickplay)"),
+    ("ARAM", 450, "5v5 ARAM games"),
+    ("CHERRY", 1700, "Arena"),
+]
+MODE_RATIO = [0.5, 0.1, 0.15, 0.2, 0.05]
+N_CHAMPIONS = 170
+
+
+class SyntheticRiot:
+    # NOTE: n_summoners명의 표본 소환사와 그 9배의 다른 소환사가 days일 동안 하루 평균 matches_per_day 경기를 한다.
+    #       경기 참가자는 전체 소환사에서 무작위로 뽑으므로, 표본 소환사끼리 같은 경기에 들어가는 경우도 생긴다.
+    #       경기는 (시작 시각, 길이, 모드, 참가자, 챔피언) 배열로만 들고 있다가, match()가 호출될 때 payload를 만든다.
+    def __init__(
+        self,
+        date: str,
+        n_summoners: int,
+        days: int = 30,
+        matches_per_day: float = 3.0,
+        recipe: Optional[List[dict]] = None,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        self.date = date
+        self.days = days
+
+        # --- templates from the sample responses ---
+        with open(SAMPLE_DIR / "match.json", "r") as fp:
+            self.match_template = json.load(fp)
+        with open(SAMPLE_DIR / "league.json", "r") as fp:
+            self.league_template = json.load(fp)[0]
+
+        # --- summoners: sampled ones first, split into (tier, division) by the recipe ratio ---
+        recipe = recipe or [{"tier": "GOLD", "division": "I", "ratio": 1.0}]
+        total_ratio = sum(x["ratio"] for x in recipe)
+        self.leagues: Dict[tuple, List[dict]] = {}
+        n_players = n_summoners * 10
+        self.puuids = [f"puuid-{i:08d}" for i in range(n_players)]
+        i = 0
+        for k, x in enumerate(recipe):
+            n = n_summoners - i if k == len(recipe) - 1 else round(n_summoners * x["ratio"] / total_ratio)
+            # NOTE: recipe/manifest는 division이 없는 티어를 'None'으로 쓰고, league entry의 rank는 'I'이다.
+            division = "None" if x["division"] is None else x["division"]
+            self.leagues[(x["tier"], division)] = [
+                dict(
+                    self.league_template,
+                    tier=x["tier"],
+                    rank="I" if division == "None" else division,
+                    summonerId=f"summoner-{j:08d}",
+                    puuid=self.puuids[j],
+                    leaguePoints=int(rng.integers(0, 100)),
+                    wins=int(rng.integers(0, 300)),
+                    losses=int(rng.integers(0, 300)),
+                )
+                for j in range(i, min(i + n, n_summoners))
+            ]
+            i += n
+
+        # --- matches: every player plays `matches_per_day` games a day on average ---
+        end = datetime.strptime(date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        self.end_time = int((end - datetime(1970, 1, 1)).total_seconds())
+        n_matches = max(int(n_summoners * days * matches_per_day), 1)
+        self.start = np.sort(rng.integers(self.end_time - days * 86400, self.end_time - 3600, n_matches))[::-1]
+        self.duration = rng.integers(900, 2400, n_matches)
+        self.mode = rng.choice(len(MODES), n_matches, p=MODE_RATIO)
+        self.players = self.draw_players(rng, n_matches, n_players)
+        self.champions = rng.integers(1, N_CHAMPIONS + 1, (n_matches, 10))
+        self.winner = rng.integers(0, 2, n_matches)
+        self.matchids = [f"KR_{9000000000 + i}" for i in range(n_matches)]
+        self.match_index = {x: i for i, x in enumerate(self.matchids)}
+
+        # --- match ids of each sampled summoner, newest first ---
+        rows, _ = np.nonzero(self.players < n_summoners)
+        order = np.argsort(self.players[self.players < n_summoners], kind="stable")
+        owners = self.players[self.players < n_summoners][order]
+        rows = rows[order]
+        bounds = np.searchsorted(owners, np.arange(n_summoners + 1))
+        self.player_matches = {self.puuids[j]: rows[bounds[j] : bounds[j + 1]] for j in range(n_summoners)}
+
+    @staticmethod
+    def draw_players(rng, n_matches: int, n_players: int) -> np.ndarray:
+        # --- 10 distinct players per match ---
+        if n_players <= 100:
+            return rng.permuted(np.tile(np.arange(n_players), (n_matches, 1)), axis=1)[:, :10]
+        players = rng.integers(0, n_players, (n_matches, 10))
+        while (dup := (np.diff(np.sort(players, axis=1), axis=1) == 0).any(axis=1)).any():
+            players[dup] = rng.integers(0, n_players, (int(dup.sum()), 10))
+        return players
+
+    # --- riot api responses ---
+    @property
+    def queues(self) -> List[dict]:
+        return [
+            {"queueId": queue_id, "map": "Summoner's Rift", "description": description, "notes": None}
+            for _, queue_id, description in MODES
+        ]
+
+    @property
+    def n_matches(self) -> int:
+        return len(self.matchids)
+
+    def league_entries(self, queue: str, tier: str, division: str, page: int = 1) -> List[dict]:
+        entries = self.leagues.get((tier, "None" if division is None else division), [])
+        return entries[(page - 1) * LEAGUE_PAGE_SIZE : page * LEAGUE_PAGE_SIZE]
+
+    def matchids_by_puuid(
+        self,
+        puuid: str,
+        startTime: Optional[int] = None,
+        endTime: Optional[int] = None,
+        start: int = 0,
+        count: int = 20,
+        **kwargs,
+    ) -> List[str]:
+        rows = self.player_matches.get(puuid, np.array([], dtype=np.int64))
+        times = self.start[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        if startTime is not None:
+            mask &= times >= startTime
+        if endTime is not None:
+            mask &= times <= endTime
+        return [self.matchids[i] for i in rows[mask][start : start + count]]
+
+    def match(self, matchid: str) -> Optional[dict]:
+        i = self.match_index.get(matchid)
+        if i is None:
+            return None
+        game_mode, queue_id, _ = MODES[self.mode[i]]
+        start = int(self.start[i]) * 1000
+        duration = int(self.duration[i])
+        participants = []
+        for k, (player, champion) in enumerate(zip(self.players[i], self.champions[i])):
+            team_id = 100 if k < 5 else 200
+            participants.append(
+                dict(
+                    self.match_template["info"]["participants"][k],
+                    puuid=self.puuids[player],
+                    summonerId=f"summoner-{player:08d}",
+                    championId=int(champion),
+                    championName=f"Champion{champion}",
+                    teamId=team_id,
+                    win=bool((k < 5) == (self.winner[i] == 0)),
+                    timePlayed=duration,
+                )
+            )
+        info = dict(
+            self.match_template["info"],
+            gameId=int(matchid.split("_")[1]),
+            gameCreation=start - 30000,
+            gameStartTimestamp=start,
+            gameEndTimestamp=start + duration * 1000,
+            gameDuration=duration,
+            gameMode=game_mode,
+            queueId=queue_id,
+            participants=participants,
+            teams=[
+                dict(team, win=bool((team["teamId"] == 100) == (self.winner[i] == 0)))
+                for team in self.match_template["info"]["teams"]
+            ],
+        )
+        return {
+            "metadata": dict(
+                self.match_template["metadata"], matchId=matchid, participants=[x["puuid"] for x in participants]
+            ),
+            "info": info,
+        }
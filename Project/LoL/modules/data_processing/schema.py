@@ -0,0 +1,197 @@
+# 수집 테이블 스키마 정의 (match-v5 json -> 컬럼 매핑, DuckDB DDL)
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+ARROW_TYPES = {
+    "VARCHAR": pa.string(),
+    "INTEGER": pa.int32(),
+    "BOOLEAN": pa.bool_(),
+    "FLOAT": pa.float32(),
+    "TIMESTAMP": pa.timestamp("ms"),  # epoch milliseconds, as in the match payload
+    "INTERVAL": pa.duration("ms"),
+    "DATE": pa.date32(),
+}
+
+
+class Field(NamedTuple):
+    name: str
+    sql_type: str
+    nullable: bool = False
+    # ("info" | "participant", key, ...) path of the value in the match payload, ints index lists, a key with * matches
+    # every key of the payload like it (into a struct), None = provided by the collector (match_id, tier, ...)
+    source: Optional[Tuple] = None
+    # sql type of the payload value when derive converts it, None = sql_type
+    source_type: Optional[str] = None
+    # (source values, columns built so far, static_data) -> pa.Array, whole columns at once
+    derive: Optional[Callable] = None
+    # expression used instead of the column when loading shards into DuckDB, formatted with the insert params
+    insert_sql: Optional[str] = None
+    # False = not written to the shard files, only insert_sql provides it (collection_date, ...)
+    in_shard: bool = True
+
+
+class Table(NamedTuple):
+    name: str
+    fields: List[Field]
+    primary_key: Tuple[str, ...]
+
+    @property
+    def shard_fields(self) -> List[Field]:
+        return [f for f in self.fields if f.in_shard]
+
+    @property
+    def arrow_schema(self) -> pa.Schema:
+        return pa.schema([pa.field(f.name, ARROW_TYPES[f.sql_type], nullable=f.nullable) for f in self.shard_fields])
+
+    def create_table_query(self) -> str:
+        columns = [f"    {f.name} {f.sql_type}{'' if f.nullable else ' NOT NULL'}," for f in self.fields]
+        return "\n".join(
+            [
+                f"CREATE TABLE IF NOT EXISTS {self.name} (",
+                *columns,
+                f"    PRIMARY KEY ({', '.join(self.primary_key)})",
+                ");",
+            ]
+        )
+
+    def insert_query(self, source: str, newer: Optional[str] = None, **params) -> str:
+        # NOTE: newer가 주어지면 primary key가 겹칠 때 newer 컬럼 값이 같거나 큰 행만 기존 행을 덮어쓴다.
+        #       한 INSERT 안에 같은 key가 두 번 있으면 duckdb 1.2는 조건부 DO UPDATE를 처리하지 못하므로, source에서 key당 한 행만 남긴다.
+        #       (participants shard는 같은 match의 참가자를 여러 소환사의 part에 중복해서 담는다. 중복 행은 같은 match payload에서
+        #       나온 값이고, 달라질 수 있는 sampled_summoner_id는 적재 후 puuid로 다시 채워진다.)
+        keys = ", ".join(self.primary_key)
+        columns = [f"    CAST({(f.insert_sql or f.name).format(**params)} AS {f.sql_type})," for f in self.fields]
+        columns[-1] = columns[-1].rstrip(",")
+        dedupe = f"QUALIFY row_number() OVER (PARTITION BY {keys} ORDER BY {keys}) = 1"
+        if newer is None:
+            return "\n".join(
+                [f"INSERT OR REPLACE INTO {self.name}", "SELECT", *columns, f"FROM {source}", f"{dedupe};"]
+            )
+        updates = [f"    {f.name} = EXCLUDED.{f.name}," for f in self.fields if f.name not in self.primary_key]
+        updates[-1] = updates[-1].rstrip(",")
+        return "\n".join(
+            [
+                f"INSERT INTO {self.name}",
+                "SELECT",
+                *columns,
+                f"FROM {source}",
+                dedupe,
+                f"ON CONFLICT ({keys}) DO UPDATE SET",
+                *updates,
+                f"WHERE EXCLUDED.{newer} >= {self.name}.{newer};",
+            ]
+        )
+
+
+def perk(style: int, selection: Optional[int] = None) -> Tuple:
+    if selection is None:
+        return ("participant", "perks", "styles", style, "style")
+    return ("participant", "perks", "styles", style, "selections", selection, "perk")
+
+
+def queue_descriptions(queue_ids: pa.Array, static_data) -> pa.Array:
+    # --- one static data lookup per distinct queue ---
+    queues = pc.unique(queue_ids)
+    descriptions = pa.array([static_data.queue_description(x) for x in queues.to_pylist()], type=pa.string())
+    return pc.take(descriptions, pc.index_in(queue_ids, value_set=queues))
+
+
+def sum_fields(values: pa.StructArray) -> pa.Array:
+    # --- a key missing from a payload counts as 0 ---
+    total = pa.repeat(0, len(values))
+    for i in range(values.type.num_fields):
+        total = pc.add(total, pc.struct_field(values, [i]).fill_null(0))
+    return total
+
+
+# --- collection date of the shard, the warehouse keeps every date in the same table ---
+COLLECTION_DATE = Field("collection_date", "DATE", insert_sql="DATE '{collection_date}'", in_shard=False)
+
+# --- per participant columns, shared by every table built from a match ---
+PARTICIPANT_FIELDS = [
+    Field("team_id", "INTEGER", source=("participant", "teamId")),
+    Field(
+        "end_of_game_result",
+        "BOOLEAN",
+        source=("info", "endOfGameResult"),
+        source_type="VARCHAR",
+        derive=lambda v, c, s: pc.equal(v, "GameComplete"),
+    ),
+    Field("game_start_timestamp", "TIMESTAMP", source=("info", "gameStartTimestamp")),
+    Field("game_end_timestamp", "TIMESTAMP", True, source=("info", "gameEndTimestamp")),
+    # NOTE: 이전 shard의 game_duration 단위(ns/us)가 pandas 버전에 따라 달라 오염되었으므로, 적재 시 시각 차이로 다시 계산한다.
+    Field(
+        "game_duration",
+        "INTERVAL",
+        True,
+        derive=lambda v, c, s: pc.subtract(c["game_end_timestamp"], c["game_start_timestamp"]),
+        insert_sql="game_end_timestamp - game_start_timestamp",
+    ),
+    Field("game_mode", "VARCHAR", source=("info", "gameMode")),
+    Field("queue_id", "INTEGER", source=("info", "queueId")),
+    Field("queue_description", "VARCHAR", True, derive=lambda v, c, s: queue_descriptions(c["queue_id"], s)),
+    Field("champion_id", "INTEGER", source=("participant", "championId")),
+    Field("champion_name", "VARCHAR", source=("participant", "championName")),
+    Field("individual_position", "VARCHAR", source=("participant", "individualPosition")),
+    Field("team_position", "VARCHAR", source=("participant", "teamPosition")),
+    Field("summoner_spell1_id", "INTEGER", source=("participant", "summoner1Id")),
+    Field("summoner_spell2_id", "INTEGER", source=("participant", "summoner2Id")),
+    Field("summoner_spell1_casts", "INTEGER", source=("participant", "summoner1Casts")),
+    Field("summoner_spell2_casts", "INTEGER", source=("participant", "summoner2Casts")),
+    Field("kills", "INTEGER", source=("participant", "kills")),
+    Field("deaths", "INTEGER", source=("participant", "deaths")),
+    Field("assists", "INTEGER", source=("participant", "assists")),
+    Field("longest_time_living", "INTEGER", source=("participant", "longestTimeSpentLiving")),
+    Field("magic_damage_to_champion", "INTEGER", source=("participant", "magicDamageDealtToChampions")),
+    Field("physical_damage_to_champion", "INTEGER", source=("participant", "physicalDamageDealtToChampions")),
+    Field("vision_score", "INTEGER", source=("participant", "visionScore")),
+    Field("wards_placed", "INTEGER", source=("participant", "wardsPlaced")),
+    Field("wards_killed", "INTEGER", source=("participant", "wardsKilled")),
+    Field("baron_kills", "INTEGER", source=("participant", "baronKills")),
+    Field("dragon_kills", "INTEGER", source=("participant", "dragonKills")),
+    Field("voidmonster_kills", "INTEGER", source=("participant", "challenges", "voidMonsterKill")),
+    Field("gold_earned", "INTEGER", source=("participant", "goldEarned")),
+    *[Field(f"item{i}_id", "INTEGER", True, source=("participant", f"item{i}")) for i in range(7)],
+    Field("minion_cs", "INTEGER", source=("participant", "totalMinionsKilled")),
+    Field("jungle_cs", "INTEGER", source=("participant", "neutralMinionsKilled")),
+    Field("game_ended_early_surrender", "BOOLEAN", source=("participant", "gameEndedInEarlySurrender")),
+    Field("game_ended_surrender", "BOOLEAN", source=("participant", "gameEndedInSurrender")),
+    Field("kda", "FLOAT", source=("participant", "challenges", "kda")),
+    Field("total_ping_count", "INTEGER", source=("participant", "*Pings*"), derive=lambda v, c, s: sum_fields(v)),
+    Field("primary_perk_style", "INTEGER", source=perk(0)),
+    Field("primary_perk1", "INTEGER", source=perk(0, 0)),
+    Field("primary_perk2", "INTEGER", source=perk(0, 1)),
+    Field("primary_perk3", "INTEGER", source=perk(0, 2)),
+    Field("sub_perk_style", "INTEGER", source=perk(1)),
+    Field("sub_perk1", "INTEGER", source=perk(1, 0)),
+    Field("sub_perk2", "INTEGER", source=perk(1, 1)),
+]
+
+RAW_SUMMONER_GAME_LOGS = Table(
+    name="raw_summoner_game_logs",
+    fields=[
+        COLLECTION_DATE,
+        Field("match_id", "VARCHAR"),
+        Field("summoner_id", "VARCHAR"),
+        Field("tier", "VARCHAR"),
+        Field("rank", "VARCHAR", True),
+        *PARTICIPANT_FIELDS,
+    ],
+    primary_key=("match_id", "summoner_id"),
+)
+
+RAW_MATCH_PARTICIPANTS = Table(
+    name="raw_match_participants",
+    fields=[
+        COLLECTION_DATE,
+        Field("match_id", "VARCHAR"),
+        Field("puuid", "VARCHAR"),
+        Field("sampled_summoner_id", "VARCHAR", True),
+        *PARTICIPANT_FIELDS,
+    ],
+    primary_key=("match_id", "puuid"),
+)
+
+TABLES = {table.name: table for table in [RAW_SUMMONER_GAME_LOGS, RAW_MATCH_PARTICIPANTS]}
@@ -0,0 +1,82 @@
+# 그룹별 가중 통계 (weighted mean / quantile / 0회 포함 play count)
+from typing import Optional, Tuple
+
+import numpy as np
+
+# NOTE: 누적 가중치가 정확히 분위 지점에 걸리는 경우(같은 가중치의 유저 2명 중 1명 등)를 '도달'로 보기 위한 상대 오차.
+#       cutoff(전체 합 * q)와 누적합은 서로 다른 순서로 더해지므로, 수학적으로 같은 값이 몇 ulp 차이로 엇갈려 중앙값이
+#       다음 값으로 넘어갈 수 있다. float64 합산 오차(~1e-16 * 행 수)보다 충분히 크고, 가중치 비율의 실제 차이보다는
+#       충분히 작은 값이다 (누적합이 분위 지점보다 그 1e-9배 이내로 모자란 경우에만 결과가 한 값 앞당겨진다).
+RTOL = 1e-9
+
+
+def n_groups_of(groups: np.ndarray, n_groups: Optional[int] = None) -> int:
+    return int(groups.max()) + 1 if n_groups is None and len(groups) else (n_groups or 0)
+
+
+def weighted_mean(groups: np.ndarray, values: np.ndarray, weights: np.ndarray, n_groups: Optional[int] = None):
+    # --- sum(value * w) / sum(w) per group, groups = 0 ~ n_groups-1 ---
+    n_groups = n_groups_of(groups, n_groups)
+    total = np.bincount(groups, weights=weights, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.bincount(groups, weights=values * weights, minlength=n_groups) / total
+
+
+def segmented_cumsum(groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    # --- cumulative sum restarting at every group, rows must be sorted by group ---
+    # NOTE: 전체 누적합에서 그룹 시작점의 누적합을 빼는 방식이므로, 상쇄 오차를 줄이기 위해 longdouble로 누적한다.
+    cum = np.cumsum(weights, dtype=np.longdouble)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    offsets = np.repeat(cum[starts] - weights[starts], np.diff(np.r_[starts, len(groups)]))
+    return (cum - offsets).astype(np.float64)
+
+
+def weighted_quantile(
+    groups: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    q: float = 0.5,
+    n_groups: Optional[int] = None,
+    base_weights: Optional[np.ndarray] = None,
+    base_value=0,
+):
+    # NOTE: 그룹별로 값을 정렬했을 때 누적 가중치가 전체의 q 이상이 되는 첫 값 (q=0.5: weighted lower median).
+    #       base_weights가 주어지면 각 그룹에 base_value 값을 가진 행이 그만큼의 가중치로 더 있는 것으로 본다 (0회 유저 등).
+    #       base 행은 누적합의 맨 앞에 더해지므로, base_value는 그룹의 모든 값보다 작거나 같아야 한다.
+    #       정렬은 전체에 대해 한 번만 하고, 그룹 경계에서 다시 시작하는 누적합으로 모든 그룹을 함께 계산한다.
+    n_groups = n_groups_of(groups, n_groups)
+    base_weights = np.zeros(n_groups) if base_weights is None else base_weights
+    res = np.full(n_groups, np.nan)
+    totals = np.bincount(groups, weights=weights, minlength=n_groups) + base_weights
+    cutoff = totals * q * (1 - RTOL)
+
+    # --- groups reaching the quantile with the base value alone ---
+    by_base = (base_weights > 0) & (base_weights >= cutoff)
+    res[by_base] = base_value
+    if not len(groups):
+        return res
+
+    order = np.lexsort((values, groups))
+    groups, values, weights = groups[order], values[order], weights[order]
+    cum = segmented_cumsum(groups, weights) + base_weights[groups]
+    hit = np.flatnonzero(cum >= cutoff[groups])
+    found, first = np.unique(groups[hit], return_index=True)
+    found_values = values[hit[first]]
+    keep = ~by_base[found]
+    res[found[keep]] = found_values[keep]
+    return res
+
+
+def play_count_stats(
+    groups: np.ndarray, plays: np.ndarray, weights: np.ndarray, total_weight: float, n_groups: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    # NOTE: 행 = (group, user) 중 1회 이상 플레이한 경우만, total_weight = 전체 유저의 가중치 합.
+    #       플레이하지 않은 유저는 0회로 포함되며, 그 가중치는 total_weight - (플레이한 유저의 가중치 합)이다.
+    #       0회 유저는 base_value=0으로 정렬 순서의 맨 앞에 놓이므로, plays는 모두 1 이상이어야 한다.
+    n_groups = n_groups_of(groups, n_groups)
+    played_weight = np.bincount(groups, weights=weights, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.bincount(groups, weights=plays * weights, minlength=n_groups) / total_weight
+    zero_weight = np.maximum(total_weight - played_weight, 0)
+    median = weighted_quantile(groups, plays, weights, 0.5, n_groups, base_weights=zero_weight, base_value=0)
+    return avg, median
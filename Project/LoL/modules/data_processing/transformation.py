@@ -1 +1,110 @@
 # 데이터 변환 및 정제
+from fnmatch import fnmatchcase
+from typing import List, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules.data_processing.schema import ARROW_TYPES, Table
+
+ROOTS = ("context", "info", "participant")
+LIST = "[]"  # list elements of a payload path share one type
+
+
+def flatten(table: Table, rows: List[Tuple[dict, dict, dict]], static_data=None) -> Tuple[pa.RecordBatch, List[int]]:
+    # NOTE: rows = [(context, info, participant), ...], context는 collector가 채우는 컬럼(match_id, tier, ...)이다.
+    #       필요한 key만 담은 struct 타입으로 payload 전체를 한 번에 Arrow 배열로 바꾸고, 컬럼은 struct/list 연산으로 꺼낸다.
+    #       값의 타입이 맞지 않는 행과 NOT NULL 필드(nullable=False)가 비어 있는 행은 제외하고, 그 인덱스를 함께 반환한다.
+    payloads = dict(zip(ROOTS, map(list, zip(*rows)))) if rows else {root: [] for root in ROOTS}
+    sources = {}
+    for field in table.shard_fields:
+        if field.source is not None:
+            sources[field.name] = field.source
+        elif field.derive is None:
+            sources[field.name] = ("context", field.name)
+    fields = {root: [] for root in ROOTS}
+    for field in table.shard_fields:
+        if field.name in sources:
+            fields[sources[field.name][0]].append((field, sources[field.name]))
+    failed = set()
+    arrays = {root: to_arrow(root, payloads, fields[root], failed) for root in ROOTS}
+
+    columns = {}
+    for field in table.shard_fields:
+        values = None
+        if field.name in sources:
+            values = get_path(arrays[sources[field.name][0]], sources[field.name][1:])
+        if field.derive is not None:
+            values = field.derive(values, columns, static_data)
+        columns[field.name] = pc.cast(values, ARROW_TYPES[field.sql_type])
+
+    # --- NOT NULL fields: a missing value drops the row ---
+    for field in table.shard_fields:
+        if field.nullable:
+            continue
+        for i in pc.indices_nonzero(pc.is_null(columns[field.name])).to_pylist():
+            if i not in failed:
+                print(f"# [ERROR] {field.name}: missing value ({rows[i][0].get('match_id')})")
+                failed.add(i)
+
+    if failed:
+        keep = pa.array([i not in failed for i in range(len(rows))])
+        columns = {name: values.filter(keep) for name, values in columns.items()}
+    batch = pa.RecordBatch.from_arrays([columns[f.name] for f in table.shard_fields], schema=table.arrow_schema)
+    return batch, sorted(failed)
+
+
+def to_arrow(root: str, payloads: dict, fields: list, failed: set) -> pa.StructArray:
+    # --- struct type of the keys the fields read, keys of the payloads not in it are never converted ---
+    tree = {}
+    for field, path in fields:
+        node = tree
+        for key in path[1:-1]:
+            node = node.setdefault(LIST if isinstance(key, int) else key, {})
+        leaf = ARROW_TYPES[field.source_type or field.sql_type]
+        if "*" in path[-1]:
+            # --- a pattern is matched against the top level keys of the payloads ---
+            assert len(path) == 2, f"# [ERROR] {field.name}: key patterns are only supported at the top level"
+            keys = set().union(*[x.keys() for x in payloads[root] if isinstance(x, dict)])
+            node.update({key: leaf for key in sorted(keys) if fnmatchcase(key, path[-1])})
+        else:
+            node[path[-1]] = leaf
+    payload_type = arrow_type(tree)
+
+    values = payloads[root]
+    try:
+        return pa.array(values, type=payload_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # --- slow path: find the broken rows, then convert the others ---
+        for i, x in enumerate(values):
+            try:
+                pa.array([x], type=payload_type)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as e:
+                print(f"# [ERROR] {root}: {e!r} ({payloads['context'][i].get('match_id')})")
+                failed.add(i)
+        return pa.array([None if i in failed else x for i, x in enumerate(values)], type=payload_type)
+
+
+def arrow_type(tree) -> pa.DataType:
+    if isinstance(tree, pa.DataType):
+        return tree
+    if LIST in tree:
+        return pa.list_(arrow_type(tree[LIST]))
+    return pa.struct([(key, arrow_type(node)) for key, node in tree.items()])
+
+
+def get_path(values: pa.Array, path: Tuple) -> pa.Array:
+    if path and "*" in str(path[-1]):
+        # --- every key matched by the pattern, as one struct ---
+        names = [f.name for f in values.type if fnmatchcase(f.name, path[-1])]
+        return pa.StructArray.from_arrays([get_path(values, (*path[:-1], x)) for x in names], names=names)
+    for key in path:
+        values = list_element(values, key) if isinstance(key, int) else pc.struct_field(values, key)
+    return values
+
+
+def list_element(values: pa.ListArray, index: int) -> pa.Array:
+    # --- null where the list is missing or shorter, pc.list_element raises instead ---
+    positions = pc.add(values.offsets[:-1], index)
+    positions = pc.if_else(pc.greater(pc.list_value_length(values), index), positions, pa.scalar(None, pa.int32()))
+    return values.values.take(positions)
@@ -1,5 +1,4 @@
 # DuckDB 관련 기능 함수
-import duckdb
 import subprocess
 import os
 from pathlib import Path
@@ -8,6 +7,8 @@ from urllib.request import urlretrieve
 
 # Base Functions
 def get_connection(db_path=None):
+    import duckdb  # NOTE: docker 함수만 쓰는 dashboard_run은 duckdb를 import 하지 않는다.
+
     conn = duckdb.connect(db_path) if db_path else duckdb.connect(":memory:")
     return conn
 
@@ -79,6 +80,19 @@ def docker_run_metabase(container_name="metabase-duck", port=3000):
         )
 
 
+def read_parquet_query(files, union_by_name=True, **options):
+    # --- explicit file list instead of a glob, so mixed shard layouts can be read together ---
+    paths = ", ".join([f"'{x}'" for x in files])
+    options = "".join([f", {k}={str(v).lower()}" for k, v in options.items()])
+    return f"read_parquet([{paths}], union_by_name={str(union_by_name).lower()}{options})"
+
+
+def fetch_arrays(conn, query, params=None):
+    # --- query result as {column: numpy array} through arrow, numeric columns without nulls are not copied again ---
+    table = conn.execute(query, params).fetch_arrow_table().combine_chunks()
+    return {name: table[name].to_numpy() for name in table.column_names}
+
+
 def create_insert_query(table_name, columns):
     # 참고: DuckDB는 Python API에서 %s 대신 ? 또는 :param 형태의 placeholder를 사용합니다.
     query = f"""
@@ -1,21 +1,68 @@
+import argparse
+import io
 import os
+import queue
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
 import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from psycopg2.pool import ThreadedConnectionPool
+
+from modules.data_processing.schema import RAW_MATCH_PARTICIPANTS, RAW_SUMMONER_GAME_LOGS, Field, Table
+
+PG_TYPES = {
+    "VARCHAR": "TEXT",
+    "INTEGER": "INTEGER",
+    "BOOLEAN": "BOOLEAN",
+    "FLOAT": "REAL",
+    "TIMESTAMP": "TIMESTAMP",
+    "INTERVAL": "INTERVAL",
+    "DATE": "DATE",
+}
 
 
 # Base Functions
-def get_connection():
-    conn = psycopg2.connect(
-        host="localhost",
-        port="5432",
+def connection_params():
+    return dict(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
         dbname=os.getenv("DB_NAME", "dbname"),
         user=os.getenv("DB_USER", "user"),
         password=os.getenv("DB_PSWD", "password"),
     )
+
+
+def get_connection():
+    conn = psycopg2.connect(**connection_params())
     conn.autocommit = True
     return conn
 
 
+def get_pool(maxconn=4):
+    return ThreadedConnectionPool(1, maxconn, **connection_params())
+
+
+@contextmanager
+def pooled_connection(pool):
+    # --- one transaction on a pooled connection, committed on success ---
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
 def excute_query(conn, query, params=None):
     cur = conn.cursor()
     if params:
@@ -51,3 +98,186 @@ def create_insert_query(table_name, columns, primary_keys):
     ON CONFLICT ({", ".join(primary_keys)}) DO NOTHING;
     """
     return query
+
+
+# Bulk Loading
+# NOTE: 행 단위 INSERT 대신 shard(Arrow)를 CSV로 COPY FROM STDIN 하여 unlogged staging 테이블에 넣고,
+#       한 번의 merge 문으로 collection_date 파티션 테이블에 반영한다.
+#       Postgres 파티션 테이블의 primary key에는 파티션 키가 있어야 하므로 키는 (primary_key, collection_date)이다.
+#       DuckDB 적재와 같이 (primary_key)마다 가장 최근 수집일의 행 하나만 남도록, merge가 더 오래된 날짜의 행을 지운다.
+def partitioned_table_query(table: Table) -> str:
+    columns = [f"    {f.name} {PG_TYPES[f.sql_type]}{'' if f.nullable else ' NOT NULL'}," for f in table.fields]
+    return "\n".join(
+        [
+            f"CREATE TABLE IF NOT EXISTS {table.name} (",
+            *columns,
+            f"    PRIMARY KEY ({', '.join([*table.primary_key, 'collection_date'])})",
+            ") PARTITION BY RANGE (collection_date);",
+        ]
+    )
+
+
+def partition_query(table: Table, date: str) -> str:
+    next_date = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table.name}_{date.replace('-', '')} PARTITION OF {table.name} "
+        f"FOR VALUES FROM ('{date}') TO ('{next_date}');"
+    )
+
+
+def staging_fields(table: Table) -> List[Field]:
+    # --- shard columns copied as they are, columns with insert_sql are computed in the merge ---
+    return [f for f in table.shard_fields if f.insert_sql is None]
+
+
+def staging_table_query(table: Table, staging: str) -> str:
+    # NOTE: 이전 shard에는 없는 컬럼이 있을 수 있으므로 staging은 모두 nullable이고, NOT NULL은 merge에서 확인된다.
+    columns = ",\n".join([f"    {f.name} {PG_TYPES[f.sql_type]}" for f in staging_fields(table)])
+    return f"CREATE UNLOGGED TABLE IF NOT EXISTS {staging} (\n{columns}\n);"
+
+
+def merge_query(table: Table, staging: str, date: str) -> str:
+    # --- staging -> partition of the date, rows of older dates are replaced, rows of newer dates are kept ---
+    keys = ", ".join(table.primary_key)
+    match = " AND ".join([f"t.{k} = s.{k}" for k in table.primary_key])
+    columns = [
+        f"    CAST({(f.insert_sql or f.name).format(collection_date=date)} AS {PG_TYPES[f.sql_type]})"
+        for f in table.fields
+    ]
+    keys_all = [*table.primary_key, "collection_date"]
+    updates = [f"    {f.name} = EXCLUDED.{f.name}" for f in table.fields if f.name not in keys_all]
+    return "\n".join(
+        [
+            "WITH replaced AS (",
+            f"    DELETE FROM {table.name} AS t USING {staging} AS s",
+            f"    WHERE {match} AND t.collection_date < DATE '{date}'",
+            ")",
+            f"INSERT INTO {table.name} ({', '.join([f.name for f in table.fields])})",
+            f"SELECT DISTINCT ON ({keys})",
+            ",\n".join(columns),
+            f"FROM {staging} AS s",
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table.name} AS t WHERE {match} AND t.collection_date > DATE '{date}')",
+            f"ORDER BY {keys}",
+            f"ON CONFLICT ({keys}, collection_date) DO UPDATE SET",
+            ",\n".join(updates) + ";",
+        ]
+    )
+
+
+def copy_arrow(conn, table: Table, staging: str, batch: pa.Table) -> int:
+    # --- arrow -> csv in memory (pyarrow writer) -> COPY FROM STDIN, columns missing in the batch stay NULL ---
+    columns = [f.name for f in staging_fields(table) if f.name in batch.column_names]
+    buffer = io.BytesIO()
+    pa_csv.write_csv(batch.select(columns), buffer)
+    buffer.seek(0)
+    with conn.cursor() as cur:
+        cur.copy_expert(f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, HEADER true)", buffer)
+    return batch.num_rows
+
+
+# --- tables whose shard part files share keys: the participants of a match are in every sampled summoner's part ---
+SHARED_KEY_TABLES = {RAW_MATCH_PARTICIPANTS.name}
+
+
+class PostgresLoader:
+    # NOTE: 로더마다 자신의 staging 테이블({table}_staging_{n})과 pool의 connection 하나를 쓴다.
+    #       raw_summoner_game_logs의 part 파일은 서로 다른 소환사의 행을 담으므로, 파일마다 동시에 merge 해도 같은 행을 건드리지 않는다.
+    #       SHARED_KEY_TABLES는 같은 key가 여러 파일에 있어 동시 merge가 서로의 행을 잠그고 deadlock이 날 수 있으므로,
+    #       모든 파일을 staging 테이블 하나에 동시에 COPY 한 뒤 한 번만 merge 한다.
+    def __init__(
+        self, table: Table = RAW_SUMMONER_GAME_LOGS, workers: int = 4, pool: Optional[ThreadedConnectionPool] = None
+    ):
+        self.table = table
+        self.workers = max(workers, 1)
+        # NOTE: ThreadedConnectionPool은 비어 있으면 기다리지 않고 오류를 내므로, 로더 수 + DDL용 connection 하나를 둔다.
+        self.pool = pool if pool is not None else get_pool(self.workers + 1)
+        self.partitions = set()
+        self.lock = threading.Lock()
+        self.slots = queue.Queue()
+        with pooled_connection(self.pool) as conn:
+            excute_query(conn, partitioned_table_query(table))
+            for i in range(self.workers):
+                staging = f"{table.name}_staging_{i}"
+                excute_query(conn, staging_table_query(table, staging))
+                self.slots.put(staging)
+
+    def close(self):
+        self.pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load_arrow(self, date: str, batch: pa.Table) -> int:
+        # --- truncate, copy and merge in one transaction, returns the merged rows ---
+        self.create_partition(date)
+        staging = self.slots.get()
+        try:
+            with pooled_connection(self.pool) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"TRUNCATE {staging};")
+                copy_arrow(conn, self.table, staging, batch)
+                with conn.cursor() as cur:
+                    cur.execute(merge_query(self.table, staging, date))
+                    return cur.rowcount
+        finally:
+            self.slots.put(staging)
+
+    def load_files(self, date: str, files: Iterable[str]) -> int:
+        # NOTE: hive 경로의 tier/division을 컬럼으로 붙이지 않도록 ParquetFile로 파일 하나만 읽는다.
+        self.create_partition(date)
+        if self.table.name in SHARED_KEY_TABLES:
+            return self.load_files_once(date, files)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return sum(pool.map(lambda path: self.load_arrow(date, pq.ParquetFile(path).read()), files))
+
+    def load_files_once(self, date: str, files: Iterable[str]) -> int:
+        # --- copy every file into one staging table at the same time, then merge once ---
+        staging = self.slots.get()
+        try:
+            with pooled_connection(self.pool) as conn:
+                excute_query(conn, f"TRUNCATE {staging};")
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(lambda path: self.copy_file(staging, path), files))
+            with pooled_connection(self.pool) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(merge_query(self.table, staging, date))
+                    return cur.rowcount
+        finally:
+            self.slots.put(staging)
+
+    def copy_file(self, staging: str, path: str) -> int:
+        with pooled_connection(self.pool) as conn:
+            return copy_arrow(conn, self.table, staging, pq.ParquetFile(path).read())
+
+    def create_partition(self, date: str):
+        with self.lock:
+            if date not in self.partitions:
+                with pooled_connection(self.pool) as conn:
+                    excute_query(conn, partition_query(self.table, date))
+                self.partitions.add(date)
+
+
+def main():
+    # --- load the shards of a date into a local postgres (DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PSWD) ---
+    from modules.storage.shard_store import MAIN_DATASET, ShardStore
+
+    parser = argparse.ArgumentParser(description="Load collected shards into postgres with COPY")
+    parser.add_argument("--chunks_dir", type=str, metavar="PATH", default="data/chunks")
+    parser.add_argument("--date", type=str, required=True)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with ShardStore(args.chunks_dir, args.date) as shard_store:
+        files = {dataset: shard_store.files(dataset) for dataset in [MAIN_DATASET, "participants"]}
+    for dataset, table in [(MAIN_DATASET, RAW_SUMMONER_GAME_LOGS), ("participants", RAW_MATCH_PARTICIPANTS)]:
+        if files[dataset]:
+            with PostgresLoader(table, args.workers) as loader:
+                n_rows = loader.load_files(args.date, files[dataset])
+            print(f"# [INFO] {table.name}: {n_rows} rows merged from {len(files[dataset])} shard files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# 파이프라인 stage 실행 기록 저장소 (요청/설정/입력 fingerprint -> 응답, 출력 파일 상태)
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.storage import sqlite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    stage TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def file_states(paths: Iterable[str]) -> Dict[str, Optional[List[int]]]:
+    # --- (size, mtime_ns) of each file and its duckdb/sqlite wal, None if the file does not exist ---
+    res = {}
+    for path in paths:
+        for x in [path, f"{path}.wal"]:
+            if os.path.exists(x):
+                stat = os.stat(x)
+                res[x] = [stat.st_size, stat.st_mtime_ns]
+            elif x == path:
+                res[x] = None
+    return res
+
+
+def fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class RunStore:
+    # NOTE: stage마다 마지막 성공 실행 하나만 기록한다. fingerprint가 같고 출력 파일이 그 실행 직후의 상태 그대로일 때만 재사용한다.
+    #       출력 파일이 바뀌었다면 (다른 실행이 덮어썼거나 지워졌다면) 기록이 있어도 다시 실행한다.
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite.get_connection(db_path, check_same_thread=False)
+        sqlite.excute_script(self.conn, SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, stage: str, key: str) -> Optional[Tuple[dict, dict]]:
+        with self.lock:
+            res = sqlite.excute_query(
+                self.conn, "SELECT response, outputs FROM runs WHERE stage = ? AND fingerprint = ?;", (stage, key)
+            )
+        if not res:
+            return None
+        return json.loads(res[0][0]), json.loads(res[0][1])
+
+    def put(self, stage: str, key: str, response: dict, outputs: dict):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?);",
+                (stage, key, json.dumps(response), json.dumps(outputs), datetime.now().isoformat()),
+            )
+            self.conn.commit()
+
+    def delete(self, stage: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM runs WHERE stage = ?;", (stage,))
+            self.conn.commit()
@@ -0,0 +1,253 @@
+# 수집 shard 저장소 (Hive 파티션 parquet dataset + 소환사별 manifest)
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from modules.storage import duckdb, sqlite
+
+MAIN_DATASET = ""  # raw_summoner_game_logs shards, {chunks_dir}/{date}/tier=.../division=.../part-N.parquet
+PART_PATTERN = re.compile(r"^part-(\d+)\.parquet$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    date TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    summoner_id TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    division TEXT NOT NULL,
+    path TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    PRIMARY KEY (date, dataset, summoner_id)
+);
+CREATE INDEX IF NOT EXISTS shards_path ON shards (path);
+"""
+
+
+class ShardStore:
+    # NOTE: 소환사 한 명당 parquet 파일 하나를 쓰면 하루에 수천 개의 작은 파일이 생긴다.
+    #       완성된 소환사 shard를 (tier, division)별로 모아 두었다가 part_rows 이상이 되면 part 파일 하나로 쓰고,
+    #       어떤 소환사가 어느 part에 들어 있는지는 {chunks_dir}/manifest.db 에 기록한다.
+    #       part 파일은 manifest에 기록된 뒤에만 유효하며, 기록되지 않은 part는 수집 시작 시 cleanup()으로 지운다.
+    #       버퍼의 소환사는 아직 디스크에 없으므로 프로세스가 죽으면 다시 수집해야 한다. 가장 오래된 소환사가 flush_seconds를
+    #       넘기면 part_rows에 못 미쳐도 쓰므로, 잃는 작업은 최대 flush_seconds 동안 완성된 소환사로 제한된다.
+    def __init__(
+        self,
+        chunks_dir,
+        date: str,
+        part_rows: int = 100_000,
+        row_group_size: int = 100_000,
+        flush_seconds: Optional[float] = None,
+    ):
+        self.chunks_dir = Path(chunks_dir)
+        self.date = date
+        self.root = self.chunks_dir / date
+        self.part_rows = part_rows
+        self.row_group_size = row_group_size
+        self.flush_seconds = flush_seconds  # None = only part_rows and close() flush
+        self.lock = threading.RLock()
+        self.buffers: Dict[tuple, dict] = {}
+        os.makedirs(self.root, exist_ok=True)
+        self.conn = sqlite.get_connection(self.chunks_dir / "manifest.db", check_same_thread=False)
+        sqlite.excute_script(self.conn, SCHEMA)
+        self.index_legacy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    # --- paths ---
+    def dataset_dir(self, dataset: str) -> Path:
+        return self.root / dataset if dataset else self.root
+
+    def partition_dir(self, dataset: str, tier: str, division: str) -> Path:
+        return self.dataset_dir(dataset) / f"tier={tier}" / f"division={division}"
+
+    def relpath(self, path: Path) -> str:
+        return path.relative_to(self.chunks_dir).as_posix()
+
+    def index_legacy(self):
+        # NOTE: 이전 layout({date}/{summonerId}.parquet)의 파일도 manifest에 한 번 등록해 두면,
+        #       이후 resume/존재 확인/삭제는 parquet을 읽지 않고 manifest만 조회한다.
+        indexed = {
+            x[0] for x in sqlite.excute_query(self.conn, "SELECT path FROM shards WHERE date = ?;", (self.date,))
+        }
+        legacy = [x for x in self.root.glob("*.parquet") if self.relpath(x) not in indexed]
+        if not legacy:
+            return
+        conn = duckdb.get_connection()
+        source = duckdb.read_parquet_query([x.as_posix() for x in legacy], filename=True, hive_partitioning=False)
+        res = conn.execute(
+            "SELECT filename, ANY_VALUE(summoner_id), ANY_VALUE(tier), ANY_VALUE(COALESCE(rank, 'None')), COUNT(*) "
+            f"FROM {source} GROUP BY filename;"
+        ).fetchall()
+        conn.close()
+        entries = []
+        for filename, summoner_id, tier, division, n_rows in res:
+            entries.append((self.date, MAIN_DATASET, summoner_id, tier, division, self.relpath(Path(filename)), n_rows))
+            participants_path = self.dataset_dir("participants") / Path(filename).name
+            if participants_path.exists():
+                n_participants = pq.ParquetFile(participants_path).metadata.num_rows
+                relpath = self.relpath(participants_path)
+                entries.append((self.date, "participants", summoner_id, tier, division, relpath, n_participants))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO shards VALUES (?, ?, ?, ?, ?, ?, ?);", entries)
+        print(f"# [INFO] index {len(res)} legacy shards: {self.root}")
+
+    def cleanup(self):
+        # --- remove part files that were written but never committed to the manifest ---
+        committed = {
+            x[0]
+            for x in sqlite.excute_query(self.conn, "SELECT DISTINCT path FROM shards WHERE date = ?;", (self.date,))
+        }
+        for path in self.root.glob("**/tier=*/division=*/*"):
+            if path.name.endswith(".tmp") or (PART_PATTERN.match(path.name) and self.relpath(path) not in committed):
+                print(f"# [INFO] remove uncommitted part: {path}")
+                os.remove(path)
+
+    # --- read ---
+    def contains(self, summoner_id: str) -> bool:
+        with self.lock:
+            if any(summoner_id in buffer["summoner_ids"] for buffer in self.buffers.values()):
+                return True
+            res = sqlite.excute_query(
+                self.conn,
+                "SELECT 1 FROM shards WHERE date = ? AND dataset = ? AND summoner_id = ?;",
+                (self.date, MAIN_DATASET, summoner_id),
+            )
+        return bool(res)
+
+    def files(self, dataset: str = MAIN_DATASET) -> List[str]:
+        with self.lock:
+            res = sqlite.excute_query(
+                self.conn,
+                "SELECT DISTINCT path FROM shards WHERE date = ? AND dataset = ? ORDER BY path;",
+                (self.date, dataset),
+            )
+        return [(self.chunks_dir / x[0]).as_posix() for x in res]
+
+    def counts(self) -> Dict[tuple, int]:
+        # --- number of collected summoners per (tier, division), buffered ones included ---
+        with self.lock:
+            res = sqlite.excute_query(
+                self.conn,
+                "SELECT tier, division, COUNT(*) FROM shards WHERE date = ? AND dataset = ? GROUP BY tier, division;",
+                (self.date, MAIN_DATASET),
+            )
+            counts = {(tier, division): n for tier, division, n in res}
+            for key, buffer in self.buffers.items():
+                counts[key] = counts.get(key, 0) + len(buffer["summoner_ids"])
+        return counts
+
+    def summoners(self, tier: Optional[str] = None, division: Optional[str] = None) -> List[str]:
+        query = "SELECT summoner_id FROM shards WHERE date = ? AND dataset = ?"
+        params = [self.date, MAIN_DATASET]
+        if tier is not None:
+            query += " AND tier = ?"
+            params.append(tier)
+        if division is not None:
+            query += " AND division = ?"
+            params.append(division)
+        with self.lock:
+            return [x[0] for x in sqlite.excute_query(self.conn, query + " ORDER BY path, summoner_id;", params)]
+
+    # --- write ---
+    def add(self, summoner_id: str, tier: str, division: str, batches: Dict[str, pa.RecordBatch]):
+        # NOTE: batches = {dataset: record batch}, 한 소환사의 모든 dataset은 같은 part 묶음으로 함께 기록된다.
+        division = "None" if division is None else division
+        with self.lock:
+            buffer = self.buffers.setdefault(
+                (tier, division), {"summoner_ids": [], "batches": {}, "n_rows": 0, "since": time.monotonic()}
+            )
+            buffer["summoner_ids"].append(summoner_id)
+            for dataset, batch in batches.items():
+                if "summoner_id" not in batch.schema.names:
+                    # --- owner of the rows, so the summoner can be removed from the part later ---
+                    batch = batch.append_column("summoner_id", pa.array([summoner_id] * batch.num_rows, pa.string()))
+                buffer["batches"].setdefault(dataset, []).append((summoner_id, batch))
+            buffer["n_rows"] += batches[MAIN_DATASET].num_rows
+            if buffer["n_rows"] >= self.part_rows or (
+                self.flush_seconds is not None and time.monotonic() - buffer["since"] >= self.flush_seconds
+            ):
+                self.flush((tier, division))
+
+    def flush(self, key: Optional[tuple] = None):
+        with self.lock:
+            for tier, division in [key] if key is not None else list(self.buffers):
+                buffer = self.buffers.pop((tier, division), None)
+                if buffer is None or not buffer["summoner_ids"]:
+                    continue
+                entries = []
+                # --- write side datasets first, the main dataset part is written last ---
+                for dataset in sorted(buffer["batches"], key=lambda x: x == MAIN_DATASET):
+                    items = buffer["batches"][dataset]
+                    path = self.write_part(
+                        self.partition_dir(dataset, tier, division),
+                        pa.Table.from_batches([batch for _, batch in items]),
+                    )
+                    for summoner_id, batch in items:
+                        entries.append(
+                            (self.date, dataset, summoner_id, tier, division, self.relpath(path), batch.num_rows)
+                        )
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO shards VALUES (?, ?, ?, ?, ?, ?, ?);", entries)
+                print(f"# [INFO] flush {len(buffer['summoner_ids'])} summoners: {tier} {division}")
+
+    def write_part(self, partition_dir: Path, table: pa.Table) -> Path:
+        os.makedirs(partition_dir, exist_ok=True)
+        numbers = [int(m.group(1)) for x in os.listdir(partition_dir) if (m := PART_PATTERN.match(x))]
+        path = partition_dir / f"part-{max(numbers, default=-1) + 1}.parquet"
+        tmp_path = path.with_suffix(".parquet.tmp")
+        pq.write_table(table, tmp_path, row_group_size=self.row_group_size)
+        os.replace(tmp_path, path)
+        return path
+
+    def remove(self, summoner_ids: List[str]):
+        summoner_ids = list(summoner_ids)
+        if not summoner_ids:
+            return
+        with self.lock:
+            self.flush()
+            placeholders = ", ".join(["?"] * len(summoner_ids))
+            parts = sqlite.excute_query(
+                self.conn,
+                f"SELECT DISTINCT path FROM shards WHERE date = ? AND summoner_id IN ({placeholders});",
+                (self.date, *summoner_ids),
+            )
+            # --- rewrite every part that holds one of the summoners ---
+            for (relpath,) in parts:
+                path = self.chunks_dir / relpath
+                if not path.exists():
+                    continue
+                if not PART_PATTERN.match(path.name):
+                    # --- legacy layout: one file per summoner ---
+                    os.remove(path)
+                    print(f"\t[INFO] Remove {path}.")
+                    continue
+                table = pq.read_table(path)
+                table = table.filter(pc.invert(pc.is_in(table["summoner_id"], pa.array(summoner_ids, pa.string()))))
+                if table.num_rows == 0:
+                    os.remove(path)
+                else:
+                    tmp_path = path.with_suffix(".parquet.tmp")
+                    pq.write_table(table, tmp_path, row_group_size=self.row_group_size)
+                    os.replace(tmp_path, path)
+                print(f"\t[INFO] Rewrite {path} ({table.num_rows} rows left).")
+            with self.conn:
+                self.conn.execute(
+                    f"DELETE FROM shards WHERE date = ? AND summoner_id IN ({placeholders});",
+                    (self.date, *summoner_ids),
+                )
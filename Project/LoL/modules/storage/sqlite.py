@@ -0,0 +1,30 @@
+# SQLite 관련 기능 함수 (수집 상태처럼 작은 로컬 인덱스 저장용)
+import sqlite3
+
+
+# Base Functions
+def get_connection(db_path=None, check_same_thread=True):
+    conn = sqlite3.connect(db_path if db_path else ":memory:", check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+def excute_query(conn, query, params=None):
+    cur = conn.execute(query, params) if params else conn.execute(query)
+    res = cur.fetchall()
+    cur.close()
+    return res
+
+
+def excute_script(conn, script):
+    conn.executescript(script)
+
+
+# Custom Functions
+def ls_table(conn, verbose=False):
+    query = "SELECT name FROM sqlite_master WHERE type='table';"
+    tables = [x[0] for x in excute_query(conn, query)]
+    if verbose:
+        print(tables)
+    return tables
@@ -0,0 +1,140 @@
+# 파이프라인 실행 추적 (component 호출별 wall/cpu 시간, rss, 처리 행 수, Riot API 호출 수를 JSONL로 기록)
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import resource
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+HEARTBEAT_SECONDS = 60  # a long running span writes its counters at most this often
+
+
+class Span:
+    # NOTE: span은 contextvar로 전달되므로 asyncio task와 asyncio.to_thread 안의 호출도 같은 span에 기록된다.
+    #       counter는 여러 thread에서 더해지므로 lock으로 보호한다.
+    def __init__(self, name: str, **info):
+        self.name = name
+        self.info = info
+        self.counters = Counter()  # rows_in, rows_out, ...
+        self.api_calls = Counter()  # "{endpoint} {status}" -> count
+        self.api_seconds = Counter()  # endpoint -> seconds spent in requests, summed over concurrent ones
+        self.error = None
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.last_heartbeat = self.start
+
+    def set_error(self, e: Exception):
+        self.error = {"type": type(e).__name__, "message": str(e), "traceback": traceback.format_exc()}
+
+    def record(self) -> dict:
+        with self.lock:
+            return {
+                "name": self.name,
+                **self.info,
+                "wall_s": round(time.perf_counter() - self.start, 4),
+                "cpu_s": round(time.process_time() - self.cpu_start, 4),  # NOTE: process 전체, duckdb thread 포함
+                "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+                **dict(self.counters),
+                "api_calls": dict(sorted(self.api_calls.items())),
+                "api_seconds": {k: round(v, 4) for k, v in sorted(self.api_seconds.items())},
+            }
+
+
+class Tracer:
+    def __init__(self, path: Optional[str] = None, profile: bool = False):
+        self.path = path
+        self.profile_dir = None
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if profile:
+                self.profile_dir = Path(path).parent / "profiles" / self.run_id
+                os.makedirs(self.profile_dir, exist_ok=True)
+
+    def write(self, kind: str, **record):
+        if not self.path:
+            return
+        ts = datetime.now().isoformat(timespec="milliseconds")
+        line = json.dumps({"ts": ts, "run_id": self.run_id, "event": kind, **record}, default=str) + "\n"
+        with self.lock, open(self.path, "a") as fp:
+            fp.write(line)
+
+    def dump_profile(self, name: str, profiler: cProfile.Profile):
+        # --- {profile_dir}/{name}.prof (snakeviz, pstats) and the top functions by cumulative time as text ---
+        profiler.dump_stats(self.profile_dir / f"{name}.prof")
+        with open(self.profile_dir / f"{name}.txt", "w") as fp:
+            pstats.Stats(profiler, stream=fp).sort_stats("cumulative").print_stats(50)
+        print(f"# [INFO] profile: {self.profile_dir / name}.prof")
+
+
+tracer = Tracer()
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def configure(path: Optional[str] = None, profile: bool = False) -> Tracer:
+    # --- path: JSONL trace file (appended), profile: cProfile every span into {trace dir}/profiles/{run_id} ---
+    global tracer
+    tracer = Tracer(path, profile)
+    return tracer
+
+
+@contextmanager
+def span(name: str, **info):
+    # NOTE: cProfile은 span을 연 thread만 측정한다 (asyncio 이벤트 루프 포함, to_thread 작업과 duckdb 내부 thread 제외).
+    s = Span(name, **info)
+    token = current_span.set(s)
+    profiler = None
+    if tracer.profile_dir is not None:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is already active in this thread
+            profiler = None
+    try:
+        yield s
+    except Exception as e:
+        s.set_error(e)
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            tracer.dump_profile(name, profiler)
+        current_span.reset(token)
+        tracer.write("span", **s.record(), **({"error": s.error} if s.error else {}))
+
+
+def count(key: str, n: int = 1):
+    s = current_span.get()
+    if s is not None:
+        with s.lock:
+            s.counters[key] += int(n)
+
+
+def api_call(endpoint: str, status, seconds: float):
+    # --- a riot api request, status = http status or the exception name ---
+    s = current_span.get()
+    if s is None:
+        return
+    now = time.perf_counter()
+    with s.lock:
+        s.api_calls[f"{endpoint} {status}"] += 1
+        s.api_seconds[endpoint] += seconds
+        heartbeat = now - s.last_heartbeat >= HEARTBEAT_SECONDS
+        if heartbeat:
+            s.last_heartbeat = now
+    if heartbeat:
+        tracer.write("heartbeat", **s.record())
+
+
+def event(kind: str, **record):
+    tracer.write(kind, **record)
@@ -1,12 +1,29 @@
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 from pydantic import BaseModel
 
+from components import registry
+from components.formats import RequestMessage, ResponseCached, ResponseMessage
+from modules import tracing
+from modules.storage.run_store import RunStore, file_states, fingerprint
+
 
 class PipelineType(BaseModel):
     pass
 
 
+class Stage(NamedTuple):
+    name: str
+    component: Union[str, type]  # component alias (imported when the stage runs) or class
+    request: Optional[RequestMessage]  # None = not configured, the stage is skipped
+    depends_on: Tuple[str, ...] = ()
+
+
 class Pipeline(ABC):
+    max_workers: int = 4
+
     def __init__(self, **config):
         self.init(**config)
 
@@ -17,6 +34,106 @@ class Pipeline(ABC):
     def init(self, **config):
         pass
 
-    @abstractmethod
-    def call(self, *args, **kwargs):
-        pass
+    def graph(self) -> List[Stage]:
+        return []
+
+    def call(self, run_store: Optional[str] = None, force: bool = False):
+        # --- run_store: stage run records, an unchanged stage is skipped unless force ---
+        if run_store is None:
+            return self.run(self.graph())
+        with RunStore(run_store) as store:
+            return self.run(self.graph(), store, force)
+
+    def exec_component(
+        self, stage: Stage, upstream_events: List[dict], run_store: Optional[RunStore] = None, force: bool = False
+    ) -> ResponseMessage:
+        print(f"# ===== exec_component: {stage.name} =====")
+        request_message = stage.request.model_copy(update={"upstream_events": upstream_events})
+        print("# [INFO] request_message: ", request_message)
+        component_cls = registry.load(stage.component) if isinstance(stage.component, str) else stage.component
+        component = component_cls()
+
+        # --- fingerprint = merged request + component config.yaml + state of the input artifacts ---
+        # NOTE: upstream_events는 병합된 요청 값으로만 영향을 주므로 fingerprint에서 뺀다.
+        key, merged_request = None, component.merge_upstream_request(request_message)
+        inputs = component.cache_inputs(merged_request) if run_store is not None else None
+        if inputs is not None:
+            request_data = merged_request.model_dump(mode="json", exclude={"upstream_events"})
+            key = fingerprint(request_data, component.config, inputs)
+            cached = None if force else run_store.get(stage.name, key)
+            if cached is not None and cached[1] == file_states(component.cache_outputs(merged_request)):
+                print(f"# [INFO] cache hit: {stage.name} ({key[:12]}), skip")
+                tracing.event("cache_hit", name=stage.name, fingerprint=key)
+                return ResponseCached(**cached[0])
+
+        response_message = component(request_message)
+        print("# [INFO] response_message: ", response_message)
+        if response_message.result != "success":
+            # --- the real error of the component, or an opaque fail returned by the component itself ---
+            if response_message.exception is not None:
+                raise response_message.exception
+            raise AssertionError(f"exec_component failed: {response_message}")
+        if key is not None:
+            outputs = file_states(component.cache_outputs(merged_request))
+            run_store.put(stage.name, key, response_message.model_dump(mode="json"), outputs)
+        return response_message
+
+    def run(
+        self, stages: List[Stage], run_store: Optional[RunStore] = None, force: bool = False
+    ) -> Dict[str, ResponseMessage]:
+        # NOTE: 설정되지 않은 stage는 그래프에서 빠지고, 그 stage에 대한 의존성도 무시한다 (기존의 `if ... is not None` 순서와 동일).
+        #       의존하는 stage가 모두 끝난 stage부터 동시에 실행하며, 실패한 stage의 하위 stage만 취소된다.
+        #       각 stage의 upstream_events = 모든 상위 stage의 response (그래프 순서), 비어 있는 요청 값은 여기서 채워진다.
+        stages = {x.name: x for x in stages if x.request is not None}
+        parents = {name: [x for x in stage.depends_on if x in stages] for name, stage in stages.items()}
+        ancestors = {}
+        for name in stages:
+            ancestors[name] = self.ancestors(name, parents)
+
+        start = time.perf_counter()
+        responses: Dict[str, ResponseMessage] = {}
+        failed, cancelled, errors = [], [], {}
+        pending, running = dict(stages), {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if any(x in failed or x in cancelled for x in parents[name]):
+                        print(f"# [ERROR] cancel {name}: upstream stage failed")
+                        cancelled.append(pending.pop(name).name)
+                    elif all(x in responses for x in parents[name]):
+                        upstream_events = [responses[x].model_dump() for x in stages if x in ancestors[name]]
+                        stage = pending.pop(name)
+                        running[pool.submit(self.exec_component, stage, upstream_events, run_store, force)] = name
+                if not running:
+                    assert not pending, f"# [ERROR] Circular dependencies: {sorted(pending)}"
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        responses[name] = future.result()
+                    except Exception as e:
+                        print(f"# [ERROR] {name}: {type(e).__name__}: {e}")
+                        failed.append(name)
+                        errors[name] = e
+
+        tracing.event(
+            "pipeline",
+            wall_s=round(time.perf_counter() - start, 4),
+            succeeded=list(responses),
+            failed=failed,
+            cancelled=cancelled,
+        )
+        if failed:
+            # --- the error of the first failed stage is chained, the others are printed above ---
+            raise AssertionError(f"pipeline failed: {failed} (cancelled: {cancelled})") from errors[failed[0]]
+        return responses
+
+    def ancestors(self, name: str, parents: Dict[str, List[str]]) -> set:
+        res, stack = set(), list(parents[name])
+        while stack:
+            x = stack.pop()
+            if x not in res:
+                res.add(x)
+                stack.extend(parents.get(x, []))
+        return res
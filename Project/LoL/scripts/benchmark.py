@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import duckdb as duckdb_lib
+import numpy as np
+import pyarrow as pa
+import yaml
+
+from components.data_analyze.component import Component as DataAnalyzeComponent
+from components.data_collect.component import Component as DataCollectComponent
+from components.data_upload.component import Component as DataUploadComponent
+from components.formats import RecipeItem, RequestDataAnalyze, RequestDataCollect, RequestDuckdbDataUpload
+from modules.data_ingestion.mock_server import MockRiotServer
+from modules.data_ingestion.static_data import StaticData
+from modules.data_ingestion.synthetic import SyntheticRiot
+from modules.storage.shard_store import ShardStore
+
+PRODUCTION_APP_LIMITS = "500:10,30000:600"
+
+
+def init():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data")
+    parser.add_argument("--summoners", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--matches_per_day", type=float, default=3.0)
+    parser.add_argument("--date", type=str, default="2025-05-14")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--full_match", action="store_true")
+    parser.add_argument("--config_path", type=str, metavar="PATH", default="pipelines/default/config.yaml")
+    parser.add_argument("--workdir", type=str, metavar="PATH", default=None)
+    parser.add_argument("--output", type=str, metavar="PATH", default="benchmark.json")
+    # --- end to end data_collect against the local riot api stand-in server ---
+    parser.add_argument("--mock", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--app_limits", type=str, default=PRODUCTION_APP_LIMITS)
+    parser.add_argument("--latency_ms", type=float, default=0)
+    parser.add_argument("--error_rate", type=float, default=0)
+    # NOTE: tracemalloc은 python 할당을 모두 추적하므로 시간이 늘어난다. 순수한 시간만 볼 때는 --no-trace_memory
+    parser.add_argument("--trace_memory", action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args()
+
+    return args
+
+
+class Benchmark:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str, **info):
+        # --- wall time, python peak memory (tracemalloc) and process max rss of a stage ---
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        record = {"stage": name, **info}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            if self.trace_memory:
+                record["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+            record["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+            self.stages.append(record)
+            print(f"# [BENCH] {record}")
+
+
+def load_recipe(config_path: str):
+    with open(config_path, "r") as fp:
+        config = yaml.safe_load(fp) or {}
+    recipe = (config.get("data_collect") or {}).get("recipe")
+    return [RecipeItem(**x) for x in recipe] if recipe else [RecipeItem(tier="GOLD", division="I", ratio=1.0)]
+
+
+def check(response, stage: str):
+    # --- components return a failed response instead of raising, a failed stage stops the benchmark ---
+    if response.result != "success":
+        raise RuntimeError(f"# [ERROR] {stage} failed: {response.error}") from response.exception
+
+
+def collect(riot: SyntheticRiot, chunks_dir: Path, date: str, recipe, full_match: bool):
+    # NOTE: 네트워크 없이 data_collect의 소환사 단위 처리(flatten -> shard 저장)만 그대로 실행한다.
+    #       match payload 생성 시간은 가상 데이터의 비용이므로 flatten과 따로 기록한다.
+    collector = DataCollectComponent()
+    collector.static_data = StaticData(chunks_dir / "static")
+    collector.matchid_store = None
+    collector.sampled_puuids = {}
+    collector.shard_store = ShardStore(chunks_dir, date)
+    start_time, end_time = collector.get_30d_window(date)
+
+    seconds = {"generate_matches": 0.0, "flatten": 0.0, "shard_write": 0.0}
+    n_records = n_matches = 0
+    with open(chunks_dir / "metadata.csv", "w") as fp:
+        fp.write("tier,division,weight,sample_size\n")
+    for item in recipe:
+        division = "None" if item.division is None else item.division
+        item = RecipeItem(tier=item.tier, division=division, ratio=item.ratio)
+        leagues = riot.leagues.get((item.tier, division), [])
+        with open(chunks_dir / "metadata.csv", "a") as fp:
+            fp.write(f"{item.tier},{division},{item.ratio / max(len(leagues), 1)},{len(leagues)}\n")
+        for summoner_league in leagues:
+            t = time.perf_counter()
+            collector.sampled_puuids[summoner_league["puuid"]] = summoner_league["summonerId"]
+            matchids = riot.matchids_by_puuid(
+                summoner_league["puuid"], startTime=start_time, endTime=end_time, count=10**6
+            )
+            matches = [riot.match(x) for x in matchids]
+            seconds["generate_matches"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            records, participants = collector.build_summoner_shards(
+                chunks_dir / date, summoner_league, item, matchids, matches, full_match
+            )
+            seconds["flatten"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            collector.save_shards(summoner_league, item, records, participants)
+            seconds["shard_write"] += time.perf_counter() - t
+            n_records += records.num_rows
+            n_matches += len(matchids)
+
+    t = time.perf_counter()
+    collector.shard_store.close()
+    seconds["shard_write"] += time.perf_counter() - t
+    return {"seconds_by_step": {k: round(v, 4) for k, v in seconds.items()}, "records": n_records, "matches": n_matches}
+
+
+def collect_via_mock(args, riot: SyntheticRiot, chunks_dir: Path, recipe):
+    # --- the real data_collect component, every request goes through http to the stand-in server ---
+    os.makedirs(chunks_dir / "static", exist_ok=True)
+    with open(chunks_dir / "static" / "queues.json", "w") as fp:
+        json.dump(riot.queues, fp)
+    server = MockRiotServer(
+        riot, port=0, app_limits=args.app_limits, latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed
+    )
+    with server:
+        start = time.perf_counter()
+        response = DataCollectComponent()(
+            RequestDataCollect(
+                date=args.date,
+                queue="RANKED_SOLO_5x5",
+                chunks_dir=chunks_dir.as_posix(),
+                sample_size=args.summoners,
+                recipe=recipe,
+                concurrency=args.concurrency,
+                region_url=server.url,
+                platform_url=server.url,
+                app_limits=args.app_limits,
+            )
+        )
+        seconds = time.perf_counter() - start
+    check(response, "data_collect")
+    with ShardStore(chunks_dir, args.date) as shard_store:
+        n_summoners = sum(shard_store.counts().values())
+    return {
+        "summoners": n_summoners,
+        "summoners_per_second": round(n_summoners / seconds, 2),
+        "requests": dict(sorted(server.stats.items())),
+    }
+
+
+def main():
+    args = init()
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="lol-benchmark-"))
+    chunks_dir = workdir / "chunks"
+    for path in [chunks_dir, workdir / "mock_chunks"]:
+        if path.exists():
+            shutil.rmtree(path)
+    os.makedirs(chunks_dir / "static", exist_ok=True)
+    duckdb_filepath = (workdir / "raw_data.db").as_posix()
+    report_filepath = (workdir / "report.db").as_posix()
+    for path in [duckdb_filepath, report_filepath]:
+        for x in [path, f"{path}.wal"]:
+            if os.path.exists(x):
+                os.remove(x)
+
+    bench = Benchmark(args.trace_memory)
+    recipe = load_recipe(args.config_path)
+
+    # --- synthetic riot data, static data is seeded so nothing is downloaded ---
+    with bench.stage("generate", summoners=args.summoners, days=args.days) as record:
+        riot = SyntheticRiot(
+            args.date, args.summoners, args.days, args.matches_per_day, [x.model_dump() for x in recipe], args.seed
+        )
+        record["matches"] = riot.n_matches
+    with open(chunks_dir / "static" / "queues.json", "w") as fp:
+        json.dump(riot.queues, fp)
+
+    # --- data_collect: flatten + shard writing ---
+    with bench.stage("data_collect") as record:
+        record.update(collect(riot, chunks_dir, args.date, recipe, args.full_match))
+
+    if args.mock:
+        with bench.stage("data_collect.mock", concurrency=args.concurrency) as record:
+            record.update(collect_via_mock(args, riot, workdir / "mock_chunks", recipe))
+
+    # --- data_upload ---
+    with bench.stage("data_upload") as record:
+        response = DataUploadComponent()(
+            RequestDuckdbDataUpload(date=args.date, chunks_dir=chunks_dir.as_posix(), duckdb_filepath=duckdb_filepath)
+        )
+        check(response, "data_upload")
+
+    # --- data_analyze: every metric at once (cold state), then each metric alone on the warm state ---
+    analyze = DataAnalyzeComponent()
+    with bench.stage("data_analyze") as record:
+        response = analyze(RequestDataAnalyze(duckdb_filepath=duckdb_filepath, report_filepath=report_filepath))
+        check(response, "data_analyze")
+    metrics = [name for name, node in analyze.registry().items() if node.kind == "metric"]
+    for metric in metrics:
+        with bench.stage(f"data_analyze.{metric}"):
+            response = analyze(
+                RequestDataAnalyze(duckdb_filepath=duckdb_filepath, report_filepath=report_filepath, metrics=[metric])
+            )
+            check(response, "data_analyze")
+
+    # --- machine readable report ---
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "duckdb": duckdb_lib.__version__,
+            "pyarrow": pa.__version__,
+            "numpy": np.__version__,
+        },
+        "workdir": workdir.as_posix(),
+        "stages": bench.stages,
+    }
+    with open(args.output, "w") as fp:
+        json.dump(report, fp, indent=2)
+    print(f"# [INFO] benchmark report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,11 @@ import json
 import yaml
 import os
 import subprocess
-import sys
 from importlib.util import spec_from_file_location, module_from_spec
 from dotenv import load_dotenv
 
+from modules import tracing
+
 load_dotenv()  # load .env file in the current environment
 
 
@@ -14,6 +15,12 @@ def init():
     parser = argparse.ArgumentParser(description="Run a pipeline")
     parser.add_argument("--pipeline_path", type=str, metavar="PATH", required=True)
     parser.add_argument("--config_path", type=str, metavar="PATH", required=True)
+    # NOTE: 같은 요청/설정/입력으로 성공한 stage는 다시 실행하지 않는다. --run_store "" 이면 기록하지 않는다.
+    parser.add_argument("--run_store", type=str, metavar="PATH", default="data/run_store.db")
+    parser.add_argument("--force", action="store_true")  # run every stage again
+    # NOTE: component 호출마다 wall/cpu 시간, rss, 행 수, API 호출 수를 JSONL로 남긴다. --trace "" 이면 기록하지 않는다.
+    parser.add_argument("--trace", type=str, metavar="PATH", default="data/trace.jsonl")
+    parser.add_argument("--profile", action="store_true")  # cProfile per stage, {trace dir}/profiles/{run_id}/
     args = parser.parse_args()
 
     return args
@@ -25,22 +32,16 @@ def main():
         config = yaml.safe_load(fp)
         config = config if config is not None else {}
 
-    pipeline_path = os.path.dirname(os.path.abspath(args.pipeline_path))  # full_path/to/pipelines/default
     pipeline_name = os.path.splitext(os.path.basename(args.pipeline_path))[0]  # pipeline
 
-    # 구 버전 동적 로딩 방식
-    sys.path.append(pipeline_path)
-    pipeline = getattr(__import__(pipeline_name), "Pipeline")(**config)
-    sys.path.pop()
-    del sys.modules[pipeline_name]
-
-    # 새로운 방식
-    # spec = spec_from_file_location(pipeline_name, pipeline_path)
-    # module = module_from_spec(spec)
-    # spec.loader.exec_module(module)
-    # pipeline = module.Pipeline(**config)
+    # --- load the pipeline from its file, the components of the configured stages are imported when they run ---
+    spec = spec_from_file_location(pipeline_name, args.pipeline_path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    pipeline = module.Pipeline(**config)
 
-    pipeline()
+    tracing.configure(args.trace or None, args.profile)
+    pipeline(run_store=args.run_store or None, force=args.force)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from components.data_collect.component import Component as DataCollectComponent
+from components.formats import RecipeItem, RequestDataCollect
+from modules.data_ingestion.mock_server import MockRiotServer
+from modules.data_ingestion.synthetic import SyntheticRiot
+
+# --- synthetic games end on this date, every collection date of the tests is on or before it ---
+RIOT_DATE = "2025-05-14"
+APP_LIMITS = "3000:10"  # well above the requests of a test, nothing waits for a window
+
+
+@pytest.fixture
+def collect_chunks(tmp_path):
+    # --- data_collect against the local riot api stand-in server, one call per collection date ---
+    def collect(dates, summoners=10, divisions=("I",), days=3, full_match=False, config=None):
+        recipe = [RecipeItem(tier="GOLD", division=x, ratio=1.0) for x in divisions]
+        riot = SyntheticRiot(
+            RIOT_DATE, summoners, days=days, matches_per_day=3.0, recipe=[x.model_dump() for x in recipe], seed=0
+        )
+        chunks_dir = tmp_path / "chunks"
+        (chunks_dir / "static").mkdir(parents=True, exist_ok=True)
+        with open(chunks_dir / "static" / "queues.json", "w") as fp:
+            json.dump(riot.queues, fp)
+        with MockRiotServer(riot, port=0, app_limits=APP_LIMITS) as server:
+            for date in dates:
+                request = RequestDataCollect(
+                    date=date,
+                    queue="RANKED_SOLO_5x5",
+                    chunks_dir=chunks_dir.as_posix(),
+                    sample_size=summoners,
+                    recipe=recipe,
+                    concurrency=8,
+                    match_cache_size_mb=0,  # every date downloads its matches, gzip writes dominate the run otherwise
+                    full_match=full_match,
+                    region_url=server.url,
+                    platform_url=server.url,
+                    app_limits=APP_LIMITS,
+                )
+                assert DataCollectComponent(**(config or {}))(request).result == "success"
+        return chunks_dir
+
+    return collect
@@ -0,0 +1,124 @@
+import duckdb as duckdb_lib
+import pytest
+
+from components.data_analyze import component as data_analyze
+from components.data_analyze.component import Component as DataAnalyzeComponent
+from components.data_upload.component import Component as DataUploadComponent
+from components.formats import RequestDataAnalyze, RequestDuckdbDataUpload
+
+DATES = ["2025-05-13", "2025-05-14"]
+
+
+def load_dates(collect_chunks, tmp_path, dates, days=5):
+    # --- synthetic shards of each collection date, loaded in order ---
+    chunks_dir = collect_chunks(dates, days=days)
+    duckdb_filepath = (tmp_path / "raw_data.db").as_posix()
+    for date in dates:
+        request = RequestDuckdbDataUpload(date=date, chunks_dir=chunks_dir.as_posix(), duckdb_filepath=duckdb_filepath)
+        assert DataUploadComponent()(request).result == "success"
+    return duckdb_filepath
+
+
+def report_tables(report_filepath):
+    conn = duckdb_lib.connect(report_filepath, read_only=True)
+    tables = [x[0] for x in conn.execute("SHOW TABLES;").fetchall() if not x[0].startswith("state_")]
+    res = {x: conn.execute(f"SELECT * FROM {x} ORDER BY ALL;").fetchall() for x in tables}
+    conn.close()
+    return res
+
+
+@pytest.fixture
+def duckdb_filepath(collect_chunks, tmp_path):
+    # --- two collection dates whose 30 day windows overlap ---
+    return load_dates(collect_chunks, tmp_path, DATES)
+
+
+def test_analyze_older_date_after_newer_load(duckdb_filepath, tmp_path):
+    conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+    n_older = conn.execute("SELECT COUNT(*) FROM raw_summoner_game_logs WHERE collection_date = ?;", [DATES[0]])
+    assert n_older.fetchone()[0] == 0  # every game of the older window was collected again on the newer date
+    conn.close()
+
+    report_filepath = (tmp_path / "report.db").as_posix()
+    request = RequestDataAnalyze(
+        duckdb_filepath=duckdb_filepath, report_filepath=report_filepath, start_date=DATES[0], end_date=DATES[0]
+    )
+    assert DataAnalyzeComponent()(request).result == "success"
+
+    conn = duckdb_lib.connect(report_filepath, read_only=True)
+    assert conn.execute("SELECT MAX(timestamp) FROM state_daily_users;").fetchone()[0].isoformat() <= DATES[0]
+    assert conn.execute("SELECT COUNT(*) FROM avg_session_length;").fetchone()[0] > 0
+    conn.close()
+
+
+def test_analyze_empty_window_fails(duckdb_filepath, tmp_path):
+    report_filepath = (tmp_path / "report.db").as_posix()
+    request = RequestDataAnalyze(
+        duckdb_filepath=duckdb_filepath, report_filepath=report_filepath, start_date="2024-01-01", end_date="2024-01-01"
+    )
+    assert DataAnalyzeComponent()(request).result == "fail"
+
+
+def test_analyze_memory_budget(duckdb_filepath, tmp_path):
+    tables = {}
+    for memory_budget_mb in [None, 64, 128]:
+        report_filepath = (tmp_path / f"report_{memory_budget_mb}.db").as_posix()
+        request = RequestDataAnalyze(
+            duckdb_filepath=duckdb_filepath, report_filepath=report_filepath, memory_budget_mb=memory_budget_mb
+        )
+        response = DataAnalyzeComponent()(request)
+        if memory_budget_mb is not None and memory_budget_mb < 128:  # below the minimum budget
+            assert response.result == "fail"
+            continue
+        assert response.result == "success"
+        conn = duckdb_lib.connect(report_filepath, read_only=True)
+        tables[memory_budget_mb] = conn.execute("SELECT * FROM median_session_length ORDER BY ALL;").fetchall()
+        conn.close()
+    assert tables[128] == tables[None]
+
+
+def test_analyze_incremental_state(collect_chunks, tmp_path, capsys):
+    # --- windows of 2025-05-04 (04-04 ~ 05-04) and 2025-05-14 (04-14 ~ 05-14) share 21 days ---
+    dates = ["2025-05-04", "2025-05-14"]
+    report_filepath = (tmp_path / "report.db").as_posix()
+    request = RequestDataAnalyze(
+        duckdb_filepath=load_dates(collect_chunks, tmp_path, dates[:1], days=40),
+        report_filepath=report_filepath,
+        start_date=dates[0],
+        end_date=dates[0],
+    )
+    for stale in [31, 0]:  # first run, then nothing changed
+        assert DataAnalyzeComponent()(request).result == "success"
+        assert f"update state: {stale} stale days" in capsys.readouterr().out
+
+    # --- a newer collection date: only the days of its window are aggregated again ---
+    load_dates(collect_chunks, tmp_path, dates[1:], days=40)
+    assert DataAnalyzeComponent()(request).result == "success"
+    assert "update state: 21 stale days" in capsys.readouterr().out
+
+    full_filepath = (tmp_path / "report_full.db").as_posix()
+    full_request = request.model_copy(update={"report_filepath": full_filepath, "incremental": False})
+    assert DataAnalyzeComponent()(full_request).result == "success"
+    # NOTE: state에 쌓인 행의 순서에 따라 합산 순서가 달라지므로 실수는 오차를 허용한다.
+    full = report_tables(full_filepath)
+    for table, rows in report_tables(report_filepath).items():
+        assert len(rows) == len(full[table])
+        for row, full_row in zip(rows, full[table]):
+            assert row == pytest.approx(full_row, nan_ok=True)
+
+
+def test_analyze_groups_over_budget(duckdb_filepath, tmp_path, monkeypatch):
+    # --- every group is larger than the python share of the budget: the statistics are computed in duckdb ---
+    tables = {}
+    for name, row_bytes in [("python", data_analyze.ROW_BYTES), ("duckdb", 2**30)]:
+        monkeypatch.setattr(data_analyze, "ROW_BYTES", row_bytes)
+        report_filepath = (tmp_path / f"report_{name}.db").as_posix()
+        request = RequestDataAnalyze(
+            duckdb_filepath=duckdb_filepath, report_filepath=report_filepath, memory_budget_mb=128
+        )
+        assert DataAnalyzeComponent()(request).result == "success"
+        tables[name] = report_tables(report_filepath)
+    for table, rows in tables["duckdb"].items():
+        assert len(rows) == len(tables["python"][table]) > 0
+        for row, expected in zip(rows, tables["python"][table]):
+            assert row == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,16 @@
+from components.data_collect.component import Component as DataCollectComponent
+from modules.storage.shard_store import ShardStore
+
+DATE = "2025-05-14"
+
+
+def test_config_from_kwargs_or_yaml():
+    assert DataCollectComponent().config.static_data.ttl_hours == 24
+    component = DataCollectComponent(static_data={"ttl_hours": 1, "locale": "ko_KR"})
+    assert (component.config.static_data.ttl_hours, component.config.static_data.locale) == (1, "ko_KR")
+
+
+def test_collect_with_config_kwargs(collect_chunks):
+    chunks_dir = collect_chunks([DATE], config={"static_data": {"ttl_hours": 1}})
+    with ShardStore(chunks_dir, DATE) as shard_store:
+        assert len(shard_store.summoners()) == 10
@@ -0,0 +1,44 @@
+import pyarrow as pa
+import pytest
+
+from components.data_delete.component import Component as DataDeleteComponent
+from components.formats import RequestDataDelete
+from modules.storage.shard_store import ShardStore
+
+DATE = "2025-05-14"
+SUMMONERS = {"summoner-1": ("MASTER", None), "summoner-2": ("GOLD", "I"), "summoner-3": ("GOLD", "II")}
+
+
+@pytest.fixture
+def chunks_dir(tmp_path):
+    with ShardStore(tmp_path, DATE) as shard_store:
+        for summoner_id, (tier, division) in SUMMONERS.items():
+            shard_store.add(summoner_id, tier, division, {"": pa.RecordBatch.from_pydict({"match_id": ["KR_1"]})})
+    return tmp_path / DATE
+
+
+def remaining(chunks_dir):
+    with ShardStore(chunks_dir.parent, chunks_dir.name) as shard_store:
+        return sorted(shard_store.summoners())
+
+
+@pytest.mark.parametrize(
+    "tier, division, all_divisions, expected",
+    [
+        ("MASTER", None, False, ["summoner-2", "summoner-3"]),
+        ("GOLD", None, False, ["summoner-1", "summoner-2", "summoner-3"]),  # GOLD has no rows without a division
+        ("GOLD", "II", False, ["summoner-1", "summoner-2"]),
+        ("GOLD", None, True, ["summoner-1"]),
+    ],
+)
+def test_delete_division(chunks_dir, tier, division, all_divisions, expected):
+    request = RequestDataDelete(
+        chunks_dir=chunks_dir.as_posix(), tier=tier, division=division, all_divisions=all_divisions
+    )
+    assert DataDeleteComponent()(request).result == "success"
+    assert remaining(chunks_dir) == expected
+
+
+def test_delete_without_tier_fails(chunks_dir):
+    assert DataDeleteComponent()(RequestDataDelete(chunks_dir=chunks_dir.as_posix())).result == "fail"
+    assert remaining(chunks_dir) == sorted(SUMMONERS)
@@ -0,0 +1,114 @@
+import duckdb as duckdb_lib
+import pytest
+
+from components.data_upload.component import Component as DataUploadComponent
+from components.formats import RequestDuckdbDataUpload
+from modules.storage.shard_store import ShardStore
+
+DATE = "2025-05-14"
+
+
+@pytest.fixture
+def chunks_dir(collect_chunks):
+    # --- synthetic full match shards: sampled summoners share matches, so participants parts repeat keys ---
+    return collect_chunks([DATE], full_match=True)
+
+
+def participant_keys(chunks_dir):
+    with ShardStore(chunks_dir, DATE) as shard_store:
+        files = shard_store.files("participants")
+    paths = ", ".join(f"'{x}'" for x in files)
+    return duckdb_lib.sql(
+        f"SELECT COUNT(*), COUNT(DISTINCT (match_id, puuid)) FROM read_parquet([{paths}], hive_partitioning=false)"
+    ).fetchone()
+
+
+def test_upload_participants_with_overlapping_keys(chunks_dir, tmp_path):
+    n_rows, n_keys = participant_keys(chunks_dir)
+    assert n_rows > n_keys  # the same (match_id, puuid) is in several summoners' parts
+
+    duckdb_filepath = (tmp_path / "raw_data.db").as_posix()
+    for incremental in [True, False]:  # first load, then drop and reload the date's partition
+        request = RequestDuckdbDataUpload(
+            date=DATE, chunks_dir=chunks_dir.as_posix(), duckdb_filepath=duckdb_filepath, incremental=incremental
+        )
+        assert DataUploadComponent()(request).result == "success"
+
+        conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+        assert conn.execute("SELECT COUNT(*) FROM raw_match_participants;").fetchone()[0] == n_keys
+        # --- synthetic puuid-{i} is summoner-{i}, a champion may repeat in a team and must not be used to match ---
+        n_wrong, n_sampled = conn.execute(
+            """
+            SELECT COUNT(*) FILTER (WHERE p.sampled_summoner_id IS DISTINCT FROM s.summoner_id), COUNT(s.summoner_id)
+            FROM raw_match_participants AS p
+            LEFT JOIN (
+                SELECT DISTINCT summoner_id, 'puuid-' || substr(summoner_id, 10) AS puuid FROM raw_summoner_game_logs
+            ) AS s ON s.puuid = p.puuid;
+            """
+        ).fetchone()
+        assert n_wrong == 0 and n_sampled > 0
+        conn.close()
+
+
+def test_upload_date_from_upstream(chunks_dir, tmp_path):
+    # --- the pipeline leaves date empty, it is filled from the data_collect response ---
+    duckdb_filepath = (tmp_path / "raw_data.db").as_posix()
+    request = RequestDuckdbDataUpload(chunks_dir=chunks_dir.as_posix(), duckdb_filepath=duckdb_filepath)
+    assert DataUploadComponent()(request).result == "fail"
+
+    request = request.model_copy(update={"upstream_events": [{"result": "success", "date": DATE}]})
+    assert DataUploadComponent()(request).result == "success"
+    conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+    assert (
+        conn.execute("SELECT DISTINCT collection_date FROM raw_summoner_game_logs;").fetchall()[0][0].isoformat()
+        == DATE
+    )
+    conn.close()
+
+
+def upload_tables(duckdb_filepath):
+    conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+    res = {
+        "raw_summoner_game_logs": conn.execute("SELECT * FROM raw_summoner_game_logs ORDER BY ALL;").fetchall(),
+        # NOTE: participants 행의 collection_date는 그 match를 마지막으로 담았던 shard의 날짜이므로 비교하지 않는다.
+        "raw_match_participants": conn.execute(
+            "SELECT * EXCLUDE (collection_date) FROM raw_match_participants ORDER BY ALL;"
+        ).fetchall(),
+    }
+    conn.close()
+    return res
+
+
+def test_upload_restores_older_rows(collect_chunks, tmp_path):
+    dates = ["2025-05-13", DATE]
+    chunks_dir = collect_chunks(dates, summoners=20, divisions=["I", "II"], full_match=True)
+
+    def upload(duckdb_filepath, date, incremental=True):
+        request = RequestDuckdbDataUpload(
+            date=date, chunks_dir=chunks_dir.as_posix(), duckdb_filepath=duckdb_filepath, incremental=incremental
+        )
+        assert DataUploadComponent()(request).result == "success"
+
+    duckdb_filepath = (tmp_path / "raw_data.db").as_posix()
+    for date in dates:
+        upload(duckdb_filepath, date)
+    conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+    query = "SELECT COUNT(*) FROM raw_summoner_game_logs WHERE collection_date = ? AND rank = 'II';"
+    assert conn.execute(query, [dates[0]]).fetchone()[0] == 0  # every older game was collected again on the newer date
+    conn.close()
+
+    # --- the newer date loses its division II summoners: the older date's rows of those summoners come back ---
+    with ShardStore(chunks_dir, DATE) as shard_store:
+        shard_store.remove(shard_store.summoners("GOLD", "II"))
+    upload(duckdb_filepath, DATE)
+    conn = duckdb_lib.connect(duckdb_filepath, read_only=True)
+    assert conn.execute(query, [dates[0]]).fetchone()[0] > 0
+    conn.close()
+
+    # --- the same as loading both dates from scratch, also after dropping and reloading the newer partition ---
+    fresh_filepath = (tmp_path / "raw_data_fresh.db").as_posix()
+    for date in dates:
+        upload(fresh_filepath, date)
+    assert upload_tables(duckdb_filepath) == upload_tables(fresh_filepath)
+    upload(duckdb_filepath, DATE, incremental=False)
+    assert upload_tables(duckdb_filepath) == upload_tables(fresh_filepath)
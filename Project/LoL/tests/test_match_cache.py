@@ -0,0 +1,30 @@
+from modules.data_ingestion.match_cache import MatchCache
+
+
+def match(n_participants):
+    return {"metadata": {"participants": [f"puuid-{i}" for i in range(n_participants)]}, "info": {}}
+
+
+def test_put_overwrite_keeps_size(tmp_path):
+    cache = MatchCache(tmp_path, 2**20)
+    cache.put("KR_1", match(10))
+    cache.put("KR_2", match(10))
+    size = cache.size
+    for _ in range(5):
+        cache.put("KR_1", match(10))
+    assert cache.size == size == sum(x.stat().st_size for x in cache.scan())
+
+    # --- a larger payload for the same match replaces the old size ---
+    cache.put("KR_1", match(500))
+    assert cache.size == sum(x.stat().st_size for x in cache.scan())
+    assert MatchCache(tmp_path, 2**20).size == cache.size
+
+
+def test_put_none_is_not_a_miss(tmp_path):
+    cache = MatchCache(tmp_path, 2**20)
+    assert cache.get("KR_1") is None
+    cache.put("KR_1", None)
+    assert (cache.hits, cache.misses, cache.size) == (0, 0, 0)
+    cache.put("KR_1", match(10))
+    assert cache.get("KR_1") == match(10)
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,47 @@
+import pytest
+
+from components import base
+from components.formats import RequestMessage, ResponseMessage
+from pipelines.base import Pipeline, Stage
+
+
+class BrokenComponent(base.Component):
+    alias = "broken"
+
+    def init(self, **config):
+        self.config = {}
+
+    def call(self, message: RequestMessage, *args, **kwargs) -> ResponseMessage:
+        raise KeyError("missing column")
+
+
+class OkComponent(BrokenComponent):
+    alias = "ok"
+
+    def call(self, message: RequestMessage, *args, **kwargs) -> ResponseMessage:
+        return ResponseMessage(result="success")
+
+
+class TwoStagePipeline(Pipeline):
+    def init(self, **config):
+        pass
+
+    def graph(self):
+        return [
+            Stage("broken", BrokenComponent, RequestMessage()),
+            Stage("after", OkComponent, RequestMessage(), depends_on=("broken",)),
+        ]
+
+
+def test_failed_call_keeps_the_exception():
+    response = BrokenComponent()(RequestMessage())
+    assert response.result == "fail"
+    assert response.error == "KeyError: 'missing column'"
+    assert isinstance(response.exception, KeyError)
+    assert "error" in response.model_dump(mode="json")
+
+
+def test_pipeline_raises_the_real_error():
+    with pytest.raises(AssertionError, match=r"pipeline failed: \['broken'\] \(cancelled: \['after'\]\)") as info:
+        TwoStagePipeline()()
+    assert isinstance(info.value.__cause__, KeyError)
@@ -0,0 +1,72 @@
+import os
+import uuid
+
+import pytest
+
+from modules.data_processing.schema import RAW_MATCH_PARTICIPANTS, RAW_SUMMONER_GAME_LOGS
+from modules.storage.shard_store import MAIN_DATASET, ShardStore
+
+pytestmark = pytest.mark.skipif(not os.getenv("DB_HOST"), reason="DB_HOST is not set")
+postgres = pytest.importorskip("modules.storage.postgres")
+
+DATES = ["2025-05-13", "2025-05-14"]
+
+
+@pytest.fixture
+def chunks_dir(collect_chunks):
+    # --- full match shards of two collection dates whose 30 day windows overlap, one part file per division ---
+    return collect_chunks(DATES, summoners=40, divisions=["I", "II", "III", "IV"], full_match=True)
+
+
+@pytest.fixture
+def schema(monkeypatch):
+    # --- every table of the test lives in its own schema, dropped afterwards ---
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    conn = postgres.get_connection()
+    postgres.excute_query(conn, f"CREATE SCHEMA {name};")
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={name}")
+    yield name
+    postgres.excute_query(conn, f"DROP SCHEMA {name} CASCADE;")
+    conn.close()
+
+
+def shard_files(chunks_dir, date, dataset):
+    with ShardStore(chunks_dir, date) as shard_store:
+        return shard_store.files(dataset)
+
+
+@pytest.mark.parametrize(
+    "dataset, table", [(MAIN_DATASET, RAW_SUMMONER_GAME_LOGS), ("participants", RAW_MATCH_PARTICIPANTS)]
+)
+def test_load_files_keeps_newest_date(chunks_dir, schema, dataset, table):
+    keys = ", ".join(table.primary_key)
+    with postgres.PostgresLoader(table, workers=4) as loader:
+        # --- the same date twice: the second load replaces the rows in place ---
+        for _ in range(2):
+            loader.load_files(DATES[0], shard_files(chunks_dir, DATES[0], dataset))
+            with postgres.pooled_connection(loader.pool) as conn:
+                n_rows, n_keys = postgres.excute_query(
+                    conn, f"SELECT COUNT(*), COUNT(DISTINCT ({keys})) FROM {table.name};"
+                )[0]
+            assert n_rows == n_keys > 0
+
+        # --- a newer date: shared keys move to the newer partition, one row per key ---
+        loader.load_files(DATES[1], shard_files(chunks_dir, DATES[1], dataset))
+        with postgres.pooled_connection(loader.pool) as conn:
+            n_rows, n_keys, n_newer = postgres.excute_query(
+                conn,
+                f"""
+                SELECT COUNT(*), COUNT(DISTINCT ({keys})), COUNT(*) FILTER (WHERE collection_date = DATE '{DATES[1]}')
+                FROM {table.name};
+                """,
+            )[0]
+            n_older_kept = postgres.excute_query(
+                conn,
+                f"""
+                SELECT COUNT(*) FROM {table.name}_{DATES[0].replace('-', '')} AS o
+                JOIN {table.name}_{DATES[1].replace('-', '')} AS n USING ({keys});
+                """,
+            )[0][0]
+    assert n_rows == n_keys
+    assert n_newer > 0
+    assert n_older_kept == 0
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from modules.data_ingestion import riot_api_async
+from modules.data_ingestion.rate_limit import RateLimiter, RateLimiterGroup, TokenBucket
+from modules.data_ingestion.riot_api_async import RiotClient
+
+HOST = "asia.api.riotgames.com"
+
+
+def test_token_bucket_blocks_once_full():
+    bucket = TokenBucket(3, 10)
+    for now in [0.0, 1.0, 2.0]:
+        assert bucket.delay(now) == 0
+        bucket.consume(now)
+    # --- full until the first token is exactly `period` seconds old ---
+    assert bucket.delay(2.5) == pytest.approx(7.5)
+    assert bucket.delay(10.0) == 0
+    bucket.consume(10.0)
+    assert bucket.delay(10.5) == pytest.approx(0.5)
+
+
+def test_rate_limiter_rebuilds_buckets_from_headers():
+    limiter = RateLimiter("20:1,100:120")
+    for _ in range(20):
+        limiter.consume(0.0)
+    assert limiter.delay(0.0) == pytest.approx(1.0)
+
+    # --- a production key: new windows, spent tokens of a kept window are carried over ---
+    limiter.update("500:10,30000:600,100:120", now=0.0)
+    assert sorted((x.limit, x.period) for x in limiter.buckets.values()) == [(100, 120), (500, 10), (30000, 600)]
+    assert limiter.delay(0.0) == 0
+    assert len(limiter.buckets[120].spent) == 20
+
+    # --- the server counted more requests than we did ---
+    limiter.update("500:10,30000:600,100:120", "100:120,100:10,100:600", now=0.0)
+    assert limiter.delay(0.0) == pytest.approx(120.0)
+
+
+def test_rate_limiter_group_reads_response_headers():
+    group = RateLimiterGroup("20:1,100:120")
+    headers = {
+        "X-App-Rate-Limit": "500:10,30000:600",
+        "X-App-Rate-Limit-Count": "1:10,1:600",
+        "X-Method-Rate-Limit": "2000:10",
+        "X-Method-Rate-Limit-Count": "1:10",
+    }
+    group.update(HOST, "match-v5.getMatch", headers)
+    app, method = group.get_limiters(HOST, "match-v5.getMatch")
+    assert sorted((x.limit, x.period) for x in app.buckets.values()) == [(500, 10), (30000, 600)]
+    assert [(x.limit, x.period) for x in method.buckets.values()] == [(2000, 10)]
+
+
+def test_retry_after_blocks_the_reported_scope():
+    group = RateLimiterGroup("20:1,100:120")
+
+    # --- method limit: only the endpoint waits, other endpoints of the host go on ---
+    group.block(HOST, "match-v5.getMatch", 30, "method")
+    app, match = group.get_limiters(HOST, "match-v5.getMatch")
+    _, matchids = group.get_limiters(HOST, "match-v5.getMatchIdsByPUUID")
+    assert match.blocked_until > app.blocked_until == 0
+    assert matchids.blocked_until == 0
+
+    # --- application or service limit: every endpoint of the host waits ---
+    group.block(HOST, "match-v5.getMatchIdsByPUUID", 60, "application")
+    assert app.blocked_until > match.blocked_until
+    _, other = group.get_limiters("kr.api.riotgames.com", "league-v4.getLeagueEntries")
+    assert other.blocked_until == 0 and group.get_limiters("kr.api.riotgames.com", "x")[0].blocked_until == 0
+
+
+def test_acquire_waits_for_the_blocked_scope():
+    async def run():
+        group = RateLimiterGroup("20:1")
+        group.block(HOST, "match-v5.getMatch", 0.2, "method")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await group.acquire(HOST, "match-v5.getMatchIdsByPUUID")
+        unblocked = loop.time() - start
+        await group.acquire(HOST, "match-v5.getMatch")
+        return unblocked, loop.time() - start
+
+    unblocked, blocked = asyncio.run(run())
+    assert unblocked < 0.1
+    assert blocked >= 0.15
+
+
+def test_client_app_limits(monkeypatch):
+    monkeypatch.delenv("RIOT_APP_LIMITS", raising=False)
+    assert RiotClient().limiter.app_limits == riot_api_async.DEV_KEY_APP_LIMITS
+    assert RiotClient(app_limits="500:10,30000:600").limiter.app_limits == "500:10,30000:600"
+    monkeypatch.setenv("RIOT_APP_LIMITS", "500:10")
+    assert RiotClient().limiter.app_limits == "500:10"
@@ -0,0 +1,16 @@
+from modules.data_ingestion import riot_api
+
+
+def test_set_base_url_resets_to_default(monkeypatch):
+    monkeypatch.delenv("RIOT_REGION_URL", raising=False)
+    monkeypatch.delenv("RIOT_PLATFORM_URL", raising=False)
+    riot_api.set_base_url("http://127.0.0.1:8000/", "http://127.0.0.1:8000/")
+    assert (riot_api.REGION_URL, riot_api.PLATFORM_URL) == ("http://127.0.0.1:8000", "http://127.0.0.1:8000")
+
+    # --- a later run without urls goes back to the riot servers, not the previous mock ---
+    riot_api.set_base_url()
+    assert (riot_api.REGION_URL, riot_api.PLATFORM_URL) == (riot_api.DEFAULT_REGION_URL, riot_api.DEFAULT_PLATFORM_URL)
+
+    monkeypatch.setenv("RIOT_REGION_URL", "http://localhost:9000")
+    riot_api.set_base_url()
+    assert riot_api.REGION_URL == "http://localhost:9000"
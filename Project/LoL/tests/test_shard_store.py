@@ -0,0 +1,29 @@
+import pyarrow as pa
+
+from modules.storage.shard_store import ShardStore
+
+DATE = "2025-05-14"
+
+
+def batch(n_rows):
+    return pa.RecordBatch.from_pydict({"match_id": [f"KR_{i}" for i in range(n_rows)]})
+
+
+def test_flush_by_age(tmp_path, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("modules.storage.shard_store.time.monotonic", lambda: clock[0])
+    with ShardStore(tmp_path, DATE, part_rows=1000, flush_seconds=60) as shard_store:
+        shard_store.add("summoner-1", "GOLD", "I", {"": batch(3)})
+        clock[0] = 30.0
+        shard_store.add("summoner-2", "GOLD", "I", {"": batch(3)})
+        assert shard_store.files() == []  # below part_rows and younger than flush_seconds
+
+        # --- the oldest buffered summoner is 60 seconds old: both are written, before part_rows ---
+        clock[0] = 60.0
+        shard_store.add("summoner-3", "GOLD", "I", {"": batch(3)})
+        assert len(shard_store.files()) == 1
+        assert shard_store.buffers == {}
+
+    # --- a new process only sees what is on disk ---
+    with ShardStore(tmp_path, DATE) as shard_store:
+        assert shard_store.summoners() == ["summoner-1", "summoner-2", "summoner-3"]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_processing import stats
+
+
+@pytest.fixture(params=["random", "dyadic"])
+def sessions(request):
+    # --- (mode, day, summoner) sessions, the weights of a summoner are the same in every group ---
+    # NOTE: dyadic 가중치(1/8 단위)는 누적합이 정확히 절반에 걸리는 경우를 만들고, 이때도 합산 순서와 관계없이 같아야 한다.
+    rng = np.random.default_rng(0)
+    n_summoners = 200
+    if request.param == "random":
+        user_w = rng.uniform(0.1, 2.0, n_summoners)
+    else:
+        user_w = rng.integers(1, 5, n_summoners) / 8
+    n = 5000
+    df = pd.DataFrame(
+        {
+            "game_mode": rng.choice(["CLASSIC", "ARAM", "URF"], n, p=[0.6, 0.3, 0.1]),
+            "timestamp": rng.integers(0, 10, n),
+            "summoner_id": rng.integers(0, n_summoners, n),
+            "champion_name": rng.integers(0, 40, n),
+            "session_length": pd.to_timedelta(rng.integers(900, 2400, n), unit="s"),
+        }
+    )
+    df["w"] = user_w[df["summoner_id"]]
+    return df
+
+
+def test_session_length_matches_pandas(sessions):
+    g = (
+        sessions.groupby(["game_mode", "timestamp", "summoner_id"])
+        .agg(session_length=("session_length", "sum"), w=("w", "mean"))
+        .reset_index()
+    )
+
+    # --- baseline: data_analyze before the stats module ---
+    def w_avg(x: pd.DataFrame) -> float:
+        return np.average(x["session_length"].dt.total_seconds() / 60, weights=x["w"])
+
+    def w_median(tbl: pd.DataFrame) -> float:
+        tbl = tbl.assign(m=tbl["session_length"].dt.total_seconds() / 60)
+        tbl = tbl.sort_values("m")
+        cum_w = tbl["w"].cumsum()
+        cutoff = tbl["w"].sum() / 2
+        return tbl.loc[cum_w >= cutoff, "m"].iloc[0]
+
+    by_group = g.groupby(["game_mode", "timestamp"])
+    expected_avg = by_group.apply(w_avg, include_groups=False)
+    expected_median = by_group.apply(w_median, include_groups=False)
+
+    gid = by_group.ngroup().to_numpy()
+    minutes = (g["session_length"].dt.total_seconds() / 60).to_numpy()
+    avg = stats.weighted_mean(gid, minutes, g["w"].to_numpy(), by_group.ngroups)
+    median = stats.weighted_quantile(gid, minutes, g["w"].to_numpy(), 0.5, by_group.ngroups)
+    np.testing.assert_allclose(avg, expected_avg.to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(median, expected_median.to_numpy(), rtol=0)
+
+
+@pytest.mark.parametrize("key", ["game_mode", "champion_name"])
+def test_play_count_stats_matches_pandas(sessions, key):
+    # --- baseline: every summoner of the data, with 0 plays if the summoner never played the mode / champion ---
+    all_w = sessions.groupby("summoner_id")["w"].mean()
+    targets = np.sort(sessions[key].unique())
+    expected_avg, expected_median = [], []
+    for target in targets:
+        pc = sessions[sessions[key] == target].groupby("summoner_id").agg(plays=(key, "size"), w=("w", "mean"))
+        pc = pc.reindex(all_w.index, fill_value=0)
+        pc["w"] = all_w
+
+        expected_avg.append(np.average(pc["plays"], weights=pc["w"]))
+        pc_sorted = pc.sort_values("plays")
+        cum_w = pc_sorted["w"].cumsum()
+        expected_median.append(pc_sorted.loc[cum_w >= pc_sorted["w"].sum() / 2, "plays"].iloc[0])
+
+    # --- stats module: only (target, summoner) pairs with at least one play ---
+    pc = sessions.groupby([key, "summoner_id"]).agg(plays=("w", "size"), w=("w", "mean")).reset_index()
+    gid = np.searchsorted(targets, pc[key].to_numpy())
+    avg, median = stats.play_count_stats(
+        gid, pc["plays"].to_numpy(), pc["w"].to_numpy(), all_w.sum(), n_groups=len(targets)
+    )
+    np.testing.assert_allclose(avg, expected_avg, rtol=1e-12)
+    np.testing.assert_allclose(median, expected_median, rtol=0)
@@ -0,0 +1,61 @@
+import copy
+
+import pytest
+
+from modules.data_ingestion.synthetic import SyntheticRiot
+from modules.data_processing import transformation
+from modules.data_processing.schema import RAW_MATCH_PARTICIPANTS
+
+RIOT_DATE = "2025-05-14"
+
+
+class StaticData:
+    def queue_description(self, queue_id):
+        return {420: "5v5 Ranked Solo games"}.get(queue_id)
+
+
+def participant_rows(n_matches=3):
+    riot = SyntheticRiot(RIOT_DATE, 5, days=2, matches_per_day=3.0, seed=0)
+    rows = []
+    for matchid in riot.matchids[:n_matches]:
+        info = riot.match(matchid)["info"]
+        for i, participant in enumerate(info["participants"]):
+            context = {"match_id": matchid, "puuid": f"{matchid}-{i}", "sampled_summoner_id": None}
+            rows.append((context, info, copy.deepcopy(participant)))
+    return rows
+
+
+def test_flatten_reads_the_payload():
+    rows = participant_rows()
+    batch, failed = transformation.flatten(RAW_MATCH_PARTICIPANTS, rows, StaticData())
+    assert failed == []
+    assert batch.schema == RAW_MATCH_PARTICIPANTS.arrow_schema
+    columns = batch.to_pydict()
+    for i, (context, info, participant) in enumerate(rows):
+        assert columns["match_id"][i] == context["match_id"]
+        assert columns["kills"][i] == participant["kills"]
+        assert columns["kda"][i] == pytest.approx(participant["challenges"]["kda"], rel=1e-6)  # FLOAT is 32 bit
+        assert columns["item6_id"][i] == participant["item6"]
+        assert columns["sub_perk2"][i] == participant["perks"]["styles"][1]["selections"][1]["perk"]
+        assert columns["end_of_game_result"][i] == (info["endOfGameResult"] == "GameComplete")
+        duration = info["gameEndTimestamp"] - info["gameStartTimestamp"]
+        assert columns["game_duration"][i].total_seconds() * 1000 == duration
+        assert columns["queue_description"][i] == StaticData().queue_description(info["queueId"])
+        assert columns["total_ping_count"][i] == sum([v for k, v in participant.items() if "Pings" in k])
+
+
+def test_flatten_drops_broken_rows():
+    rows = participant_rows(n_matches=1)
+    del rows[0][2]["kills"]  # NOT NULL field missing
+    rows[1][2]["deaths"] = "x"  # wrong type
+    rows[2][2]["perks"]["styles"][1]["selections"] = []  # list shorter than the path
+    rows[3][2]["challenges"] = None
+    del rows[4][2]["item3"]  # nullable field missing: the row is kept
+    batch, failed = transformation.flatten(RAW_MATCH_PARTICIPANTS, rows, StaticData())
+    assert failed == [0, 1, 2, 3]
+    assert batch.num_rows == len(rows) - 4
+    assert batch.column("puuid")[0].as_py() == rows[4][0]["puuid"]
+    assert batch.column("item3_id")[0].as_py() is None
+
+    batch, failed = transformation.flatten(RAW_MATCH_PARTICIPANTS, [], StaticData())
+    assert (batch.num_rows, failed) == (0, [])